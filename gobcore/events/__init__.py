@@ -6,6 +6,12 @@ The definition and characteristics of each event is in the gob_events module.
 """
 
 import json
+import re
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Iterator
+
+from orjson import orjson
 
 from gobcore.exceptions import GOBException
 from gobcore.events import import_events
@@ -26,6 +32,12 @@ GOB_EVENTS = [
     GOB.BULKCONFIRM
 ]
 
+BATCH_SIZE = 10_000  # Number of stored events that is reconstructed at once by database_to_gobevents
+
+# Numbers of 20 or more digits, orjson parses integers outside the 64 bit range as floats
+# (a leading single digit lets the regex engine scan for the first digit fast)
+_LARGE_NUMBER = re.compile(r"[0-9][0-9]{19}")
+
 # Convert GOB_EVENTS to a dictionary indexed by the name of the event
 _gob_events_dict = {event.name: event for event in GOB_EVENTS}
 
@@ -134,6 +146,52 @@ def GobEvent(tid, event_message, metadata):
     return _get_event(event_name)(tid, data, metadata)
 
 
+def _get_contents(event) -> dict:
+    """Return the parsed json data of a stored event.
+
+    The data is parsed by orjson, unless it may contain values that orjson does not parse like json does.
+    """
+    contents = event.contents
+    if isinstance(contents, dict):
+        return contents
+    if isinstance(contents, bytes):
+        contents = contents.decode()
+    if _LARGE_NUMBER.search(contents) is None:
+        try:
+            return orjson.loads(contents)
+        except orjson.JSONDecodeError:
+            # eg NaN or Infinity, that are parsed by json
+            pass
+    return json.loads(contents)
+
+
+def _get_header(event, data) -> dict:
+    """Return the message header of a stored event."""
+    return {
+        "process_id": None,
+        "source": event.source,
+        "application": event.application,
+        "id_column": data.get("id_column"),
+        "catalogue": event.catalogue,
+        "entity": event.entity,
+        "version": event.version,
+        "timestamp": event.timestamp,
+    }
+
+
+def _to_gobevent(event, data, metadata) -> ImportEvent:
+    """Construct the event out of the reconstructed event data."""
+    event_msg = {
+        "event": event.action,
+        "data": data,
+    }
+    gob_event = GobEvent(event.tid, event_msg, metadata)
+
+    # Store the id of the event in the gob_event
+    gob_event.id = event.eventid
+    return gob_event
+
+
 def database_to_gobevent(event) -> ImportEvent:
     """Reconstruct the original event out of the stored event
 
@@ -141,10 +199,7 @@ def database_to_gobevent(event) -> ImportEvent:
     :return: a ADD, MODIFY, CONFIRM or DELETE event
     """
     # Parse the json data of the event
-    if isinstance(event.contents, dict):
-        data = event.contents
-    else:
-        data = json.loads(event.contents)
+    data = _get_contents(event)
 
     # Get the model version to check if the event should be migrated to the correct version.
     # No legacy_mode! -- database_to_gobevent is only used by GOB-Upload.
@@ -154,25 +209,69 @@ def database_to_gobevent(event) -> ImportEvent:
         # Event should be migrated to the correct GOBModel version
         data = GOBMigrations().migrate_event_data(event, data, event.catalogue, event.entity, model_version)
 
-    event_msg = {
-        "event": event.action,
-        "data": data,
-    }
+    return _to_gobevent(event, data, MessageMetaData(_get_header(event, data)))
 
-    msg_header = {
-        "process_id": None,
-        "source": event.source,
-        "application": event.application,
-        "id_column": data.get("id_column"),
-        "catalogue": event.catalogue,
-        "entity": event.entity,
-        "version": event.version,
-        "timestamp": event.timestamp,
-    }
 
-    # Construct the event out of the reconstructed event data
-    gob_event = GobEvent(event.tid, event_msg, MessageMetaData(msg_header))
+def _migrate_batch(events: list, model_versions: dict) -> dict:
+    """Migrate the data of the events in a batch that have an older version than the model.
 
-    # Store the id of the event in the gob_event
-    gob_event.id = event.eventid
-    return gob_event
+    The events are migrated per catalogue - entity.
+
+    :param events: the database events
+    :param model_versions: the model version per (catalogue, entity), is filled when missing
+    :return: the migrated data by index of the event in the batch
+    """
+    to_migrate = defaultdict(list)
+    for i, event in enumerate(events):
+        key = (event.catalogue, event.entity)
+        if key not in model_versions:
+            # No legacy_mode! -- database_to_gobevents is only used by GOB-Upload.
+            model_versions[key] = GOBModel()[event.catalogue]['collections'][event.entity]['version']
+        if event.version != model_versions[key]:
+            to_migrate[key].append(i)
+
+    migrations = GOBMigrations()
+    migrated = {}
+    for key, indexes in to_migrate.items():
+        events_data = migrations.migrate_events_data(
+            ((events[i], _get_contents(events[i])) for i in indexes), *key, model_versions[key])
+        migrated.update(zip(indexes, events_data))
+    return migrated
+
+
+def _batch_to_gobevents(events: list, model_versions: dict) -> Iterator[ImportEvent]:
+    """Reconstruct the original events out of a batch of stored events.
+
+    Only the events that need a migration are parsed in advance, the other events are parsed when yielded.
+    Events with an equal header share their metadata.
+
+    :param events: the database events
+    :param model_versions: the model version per (catalogue, entity)
+    :return:
+    """
+    migrated = _migrate_batch(events, model_versions)
+
+    metadata = {}
+    for i, event in enumerate(events):
+        data = migrated[i] if i in migrated else _get_contents(event)
+        key = (event.source, event.application, data.get("id_column"),
+               event.catalogue, event.entity, event.version, event.timestamp)
+        if key not in metadata:
+            metadata[key] = MessageMetaData(_get_header(event, data))
+        yield _to_gobevent(event, data, metadata[key])
+
+
+def database_to_gobevents(events: Iterable, batch_size: int = BATCH_SIZE) -> Iterator[ImportEvent]:
+    """Reconstruct the original events out of the stored events
+
+    The stored events are reconstructed in batches, eg from a server side cursor.
+    The events are yielded in the order of the stored events.
+
+    :param events: an iterable of database events
+    :param batch_size: the number of events that is reconstructed at once
+    :return: a ADD, MODIFY, CONFIRM or DELETE event for each database event
+    """
+    model_versions = {}
+    events = iter(events)
+    while batch := list(islice(events, batch_size)):
+        yield from _batch_to_gobevents(batch, model_versions)
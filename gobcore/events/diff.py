@@ -0,0 +1,183 @@
+"""GOB Event diffs
+
+Compare the current state of a collection with a new (full) import and write the resulting events.
+
+The current state is a stream of (tid, hash, last_event) tuples, the new entities are a stream of dicts
+with a _tid and a _hash. The streams are hash joined on tid:
+    - a new entity without current state is added
+    - a new entity with an equal hash is confirmed, confirms are collected in BULKCONFIRM events
+    - a new entity with a different hash is compared with its stored entity (MODIFY or CONFIRM)
+    - a current entity without new entity is deleted (only for full imports)
+A tid that occurs more than once in the new entities is an error.
+
+Only the entities with a different hash are read from the database.
+When the current state is too large to be kept in memory, both streams are partitioned on tid in temporary files
+and each partition is joined separately. A partition that is still too large is partitioned again,
+so the number of partitions follows the size of the current state.
+"""
+import pickle
+import tempfile
+from itertools import chain
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from gobcore.events import get_event_for
+from gobcore.exceptions import GOBException
+from gobcore.events.import_events import hash_key
+from gobcore.events.writer import EventWriter
+from gobcore.message_broker.offline_contents import ContentsWriter
+from gobcore.model.metadata import FIELD
+from gobcore.typesystem import get_modifications
+
+CHUNK_SIZE = 10_000         # Max number of confirms in a BULKCONFIRM event, and of entities that is read at once
+MAX_IN_MEMORY = 5_000_000   # Max number of current states that is joined in memory
+SPILL_PARTITIONS = 16       # Number of partitions per level when the current state is joined on disk
+SPILL_LEVELS = 4            # Max number of times that a partition is partitioned again
+SPILL_SIZE = 1_000          # Number of items that is written at once to a partition
+
+
+def _load_all(file) -> Iterator:
+    file.seek(0)
+    while True:
+        try:
+            yield from pickle.load(file)
+        except EOFError:
+            return
+
+
+class EventDiff:
+
+    def __init__(self, writer: ContentsWriter, collection: dict, version: str,
+                 get_entities: Callable[[list[str]], Mapping[str, Any]], full_import: bool = True,
+                 chunk_size: int = CHUNK_SIZE, max_in_memory: int = MAX_IN_MEMORY):
+        """Diff engine that writes the events for a new import of a collection.
+
+        :param writer: the writer for the events
+        :param collection: the model of the collection
+        :param version: the version of the events
+        :param get_entities: returns the stored entities for a list of tids, by tid
+        :param full_import: delete the current entities that are missing in the import
+        :param chunk_size: max number of confirms in a BULKCONFIRM event, and of entities that is read at once
+        :param max_in_memory: max number of current states that is joined in memory
+        """
+        self.writer = EventWriter(writer, chunk_size)
+        self.fields = collection['all_fields']
+        self.version = version
+        self.get_entities = get_entities
+        self.full_import = full_import
+        self.chunk_size = chunk_size
+        self.max_in_memory = max_in_memory
+
+        self._changed = []
+
+    def write_events(self, current: Iterable[tuple], new: Iterable[dict]) -> dict[str, int]:
+        """Write the events that change the current state into the new entities.
+
+        :param current: (tid, hash, last_event) for every current entity
+        :param new: the new entities, each with a _tid and a _hash
+        :return: the number of entities per action (ADD, MODIFY, CONFIRM, DELETE)
+        """
+        self._join_states(iter(current), new, 0)
+        self._flush_changed()
+        self.writer.flush()
+        return self.writer.counts
+
+    def _join_states(self, current: Iterator[tuple], new: Iterable[dict], level: int) -> None:
+        """Join the new entities on the current states, on disk if there are more than max_in_memory states.
+
+        :param current: (tid, hash, last_event) for every current entity
+        :param new: the new entities
+        :param level: the number of times that the streams have been partitioned
+        :return: None
+        """
+        states = {}
+        for tid, hash_, last_event in current:
+            states[tid] = (hash_, last_event)
+            if len(states) > self.max_in_memory and level < SPILL_LEVELS:
+                self._join_on_disk(states, current, new, level)
+                return
+        self._join(states, new)
+
+    def _join_on_disk(self, states: dict, current: Iterator[tuple], new: Iterable[dict], level: int) -> None:
+        """Partition both streams on tid in temporary files and join each partition.
+
+        :param states: the current states that have already been read
+        :param current: the remaining current states
+        :param new: the new entities
+        :param level: the number of times that the streams have been partitioned
+        :return: None
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            current = chain(((tid, *state) for tid, state in states.items()), current)
+            current_files = self._partition(current, lambda state: state[0], tmp_dir, level)
+            states.clear()
+            new_files = self._partition(new, lambda entity: entity[FIELD.TID], tmp_dir, level)
+            for current_file, new_file in zip(current_files, new_files):
+                self._join_states(_load_all(current_file), _load_all(new_file), level + 1)
+                current_file.close()
+                new_file.close()
+
+    @staticmethod
+    def _partition(items: Iterable, get_tid: Callable, tmp_dir: str, level: int) -> list:
+        """Write the items to a temporary file per partition, in pickled lists of at most SPILL_SIZE items.
+
+        The partition of a tid depends on the level, so a partition that is partitioned again is spread.
+        """
+        files = [tempfile.TemporaryFile(dir=tmp_dir) for _ in range(SPILL_PARTITIONS)]
+        buffers = [[] for _ in range(SPILL_PARTITIONS)]
+        for item in items:
+            partition = hash((level, get_tid(item))) % SPILL_PARTITIONS
+            buffers[partition].append(item)
+            if len(buffers[partition]) >= SPILL_SIZE:
+                pickle.dump(buffers[partition], files[partition], protocol=pickle.HIGHEST_PROTOCOL)
+                buffers[partition] = []
+
+        for file, buffer in zip(files, buffers):
+            pickle.dump(buffer, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return files
+
+    def _join(self, states: dict, new: Iterable[dict]) -> None:
+        """Join the new entities on the current states, the states that are not joined are deleted.
+
+        A joined state is removed from states, its tid is kept in a set to detect a duplicate tid.
+        Equal tids are in the same partition, so duplicates are detected per join.
+        """
+        joined = set()
+        for entity in new:
+            tid = entity[FIELD.TID]
+            if tid in joined:
+                raise GOBException(f"Duplicate {FIELD.TID} in the new entities: {tid}")
+            joined.add(tid)
+
+            state = states.pop(tid, None)
+            if state is None:
+                self.writer.write(get_event_for(None, entity, [], self.version))
+            elif state[0] == entity[hash_key]:
+                self.writer.confirm(tid, state[1], self.version)
+            else:
+                self._add_changed(entity)
+
+        if self.full_import:
+            self._delete(states)
+
+    def _delete(self, states: dict) -> None:
+        for tid, (_, last_event) in states.items():
+            state = SimpleNamespace(**{FIELD.TID: tid, FIELD.LAST_EVENT: last_event})
+            self.writer.write(get_event_for(state, None, [], self.version))
+
+    def _add_changed(self, entity: dict) -> None:
+        self._changed.append(entity)
+        if len(self._changed) >= self.chunk_size:
+            self._flush_changed()
+
+    def _flush_changed(self) -> None:
+        """Compare the changed entities with their stored entities."""
+        changed, self._changed = self._changed, []
+        if not changed:
+            return
+
+        entities = self.get_entities([entity[FIELD.TID] for entity in changed])
+        for data in changed:
+            entity = entities[data[FIELD.TID]]
+            modifications = get_modifications(entity, data, self.fields)
+            self.writer.write(get_event_for(entity, data, modifications, self.version))
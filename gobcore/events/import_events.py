@@ -16,8 +16,7 @@ from abc import ABCMeta, abstractmethod
 
 from gobcore.exceptions import GOBException
 from gobcore.model import GOBModel
-from gobcore.typesystem import get_gob_type_from_info
-from gobcore.typesystem.gob_types import get_kwargs_from_type_info
+from gobcore.typesystem import get_db_converter
 
 hash_key = '_hash'
 modifications_key = 'modifications'
@@ -30,6 +29,9 @@ class ImportEvent(metaclass=ABCMeta):
     gob_model = None
     skip = ["_entity_source_id", "_last_event"]
 
+    # DB converters per field by (catalogue, entity) for the last model data, see _get_converters
+    _converters = {'data': None, 'converters': {}}
+
     @classmethod
     @abstractmethod
     def create_event(cls, _tid, data, version):
@@ -100,14 +102,35 @@ class ImportEvent(metaclass=ABCMeta):
             '_source': self._metadata.source
         }
 
+        converters = self._get_converters()
         for key, value in self._data.items():
             if key not in self.skip:
-                type_info = self._model['all_fields'][key]
-                gob_type = get_gob_type_from_info(type_info)
-                entity[key] = gob_type.from_value(value, **get_kwargs_from_type_info(type_info)).to_db
+                entity[key] = converters[key](value)
 
         return entity
 
+    def _get_converters(self):
+        """Return the DB converters for all fields of the collection of this event.
+
+        The converters are built once per collection and shared by all events of the same model data.
+
+        :return: a dict with a DB converter function for each field name
+        """
+        data = getattr(self.gob_model, 'data', None)
+        if data is None:
+            return self._create_converters()
+
+        if ImportEvent._converters['data'] is not data:
+            ImportEvent._converters = {'data': data, 'converters': {}}
+        key = (self._metadata.catalogue, self._metadata.entity)
+        converters = ImportEvent._converters['converters']
+        if key not in converters:
+            converters[key] = self._create_converters()
+        return converters[key]
+
+    def _create_converters(self):
+        return {name: get_db_converter(type_info) for name, type_info in self._model['all_fields'].items()}
+
 
 class ADD(ImportEvent):
     """
@@ -0,0 +1,83 @@
+"""GOB Event writer
+
+Write events to a ContentsWriter and coalesce CONFIRM events into BULKCONFIRM events.
+
+A CONFIRM event is only buffered, the confirms are written in BULKCONFIRM events of at most bulk_size confirms.
+Other events are written unchanged and immediately, so confirms can be written after events that follow them.
+The events of an entity never depend on confirms of other entities.
+"""
+from collections import Counter
+
+from gobcore.events import GOB
+from gobcore.message_broker.offline_contents import ContentsWriter
+from gobcore.model.metadata import FIELD
+
+BULK_SIZE = 10_000  # Max number of confirms in a BULKCONFIRM event
+
+
+class EventWriter:
+
+    def __init__(self, writer: ContentsWriter, bulk_size: int = BULK_SIZE):
+        """Write events to the writer, CONFIRM events are written in BULKCONFIRM events.
+
+        Use as context manager or call flush() after the last event.
+
+        :param writer: an opened ContentsWriter
+        :param bulk_size: max number of confirms in a BULKCONFIRM event
+        """
+        self.writer = writer
+        self.bulk_size = bulk_size
+        self.counts = Counter()
+
+        self._confirms = []
+        self._version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+
+    def write(self, event: dict) -> None:
+        """Write an event, a CONFIRM event is buffered.
+
+        :param event: an event as created by the create_event method of the event class
+        :return: None
+        """
+        if event['event'] == GOB.CONFIRM.name:
+            # The data of a CONFIRM event is the _tid and _last_event of the entity, equal to the confirm
+            self._add_confirm(event['data'], event['version'])
+        else:
+            self.counts[event['event']] += 1
+            self.writer.write(event)
+
+    def confirm(self, tid: str, last_event: int, version: str) -> None:
+        """Write a confirm of an entity, without creating a CONFIRM event first.
+
+        :param tid: the _tid of the entity
+        :param last_event: the _last_event of the entity
+        :param version: the version of the event
+        :return: None
+        """
+        self._add_confirm({FIELD.TID: tid, FIELD.LAST_EVENT: last_event}, version)
+
+    def _add_confirm(self, confirm: dict, version: str) -> None:
+        self.counts[GOB.CONFIRM.name] += 1
+        if version != self._version:
+            # Confirms in a BULKCONFIRM event share their version
+            self.flush()
+            self._version = version
+
+        self._confirms.append(confirm)
+        if len(self._confirms) >= self.bulk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered confirms.
+
+        :return: None
+        """
+        if self._confirms:
+            self.writer.write(GOB.BULKCONFIRM.create_event(self._confirms, self._version))
+            self._confirms = []
@@ -12,6 +12,7 @@ import os
 
 from orjson import orjson
 
+from gobcore.secure.crypto import clear_protected
 from gobcore.typesystem.json import GobTypeORJSONEncoder
 from gobcore.utils import gettotalsizeof, get_filename, get_unique_name
 
@@ -151,6 +152,9 @@ def end_message(msg, unique_name):
         except Exception as e:
             print(f"Remove failed ({str(e)})", filename)
 
+    # Discard any protected values that have not been used
+    clear_protected()
+
     # Clear message and run garbage collection
     msg.clear()
     gc.collect()
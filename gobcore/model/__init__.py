@@ -1,6 +1,7 @@
 import os
 import copy
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor
 
 from gobcore.exceptions import GOBException
 from gobcore.parse import json_to_cached_dict
@@ -11,7 +12,11 @@ from gobcore.model.pydantic import Schema
 from gobcore.model.relations import get_relations, get_inverse_relations
 from gobcore.model.quality import QUALITY_CATALOG, get_quality_assurances
 from gobcore.model.schema import load_schema
+from gobcore.model.snapshot import get_snapshot_key, load_snapshot, save_snapshot
 from gobcore.logging.logger import logger
+from gobcore.typesystem import get_field_spec
+
+_SCHEMA_WORKERS = 8  # Maximum number of schemas that are loaded in parallel
 
 
 class NotInModelException(Exception):
@@ -57,19 +62,12 @@ class GOBModel(UserDict):
             # UserDict (GOBModel classmethod).
             super().__init__(cls)
 
-            cached_data = json_to_cached_dict(os.path.join(os.path.dirname(__file__), 'gobmodel.json'))
-            # Initialise GOBModel.data (leave cached_data untouched).
-            cls.data = copy.deepcopy(cached_data)
-
-            if os.getenv('DISABLE_TEST_CATALOGUE'):
-                # Default is to include the test catalogue.
-                # By setting the DISABLE_TEST_CATALOGUE environment variable
-                # the test catalogue can be removed.
-                del cls.data["test_catalogue"]
-
-            # Proces GOBModel.data.
-            cls._load_schemas(cls.data)
-            cls._init_data(cls.data)
+            snapshot_key = get_snapshot_key(legacy)
+            if (snapshot := load_snapshot(snapshot_key)) is not None:
+                cls.data = snapshot
+            else:
+                cls._load_data()
+                save_snapshot(snapshot_key, cls.data)
 
             cls._initialised = True
             cls.__instance = singleton
@@ -80,6 +78,23 @@ class GOBModel(UserDict):
     def __init__(cls, legacy=False, reinit=False):
         pass
 
+    @classmethod
+    def _load_data(cls):
+        """Load and initialise GOBModel.data from the GOBModel definition."""
+        cached_data = json_to_cached_dict(os.path.join(os.path.dirname(__file__), 'gobmodel.json'))
+        # Initialise GOBModel.data (leave cached_data untouched).
+        cls.data = copy.deepcopy(cached_data)
+
+        if os.getenv('DISABLE_TEST_CATALOGUE'):
+            # Default is to include the test catalogue.
+            # By setting the DISABLE_TEST_CATALOGUE environment variable
+            # the test catalogue can be removed.
+            del cls.data["test_catalogue"]
+
+        # Proces GOBModel.data.
+        cls._load_schemas(cls.data)
+        cls._init_data(cls.data)
+
     @classmethod
     def _init_data(cls, data):
         """Extract references for easy access.
@@ -103,6 +118,8 @@ class GOBModel(UserDict):
     def _init_catalog(cls, catalog):
         """Initialises GOBModel.data object with all fields and helper dicts."""
         catalog_name = catalog["name"]
+        state_fields = cls._get_field_specs(STATE_FIELDS)
+        global_fields = cls._get_field_specs(cls.global_attributes)
 
         for entity_name, collection in catalog['collections'].items():
             collection['name'] = entity_name
@@ -113,7 +130,10 @@ class GOBModel(UserDict):
                     collection['attributes'] = collection.get(
                         'legacy_attributes', collection['attributes'])
 
-            state_attributes = STATE_FIELDS if cls.has_states(catalog_name, entity_name) else {}
+            # Equal field specs are shared by all collections
+            collection['attributes'] = cls._get_field_specs(collection['attributes'])
+
+            state_attributes = state_fields if cls.has_states(catalog_name, entity_name) else {}
             all_attributes = {
                 **state_attributes,
                 **collection['attributes']
@@ -128,20 +148,30 @@ class GOBModel(UserDict):
             # Include complete definition, including all global fields
             collection['all_fields'] = {
                 **all_attributes,
-                **cls.global_attributes
+                **global_fields
             }
 
+    @staticmethod
+    def _get_field_specs(attributes):
+        """Returns the attributes with interned, read-only field specs."""
+        return {name: get_field_spec(spec) for name, spec in attributes.items()}
+
     @staticmethod
     def _load_schemas(data):
         """Load any external schemas and updates catalog model accordingly.
 
         :return: None
         """
-        for catalog in data.values():
-            for model in catalog['collections'].values():
-                if model.get('schema') is not None:
-                    schema = Schema.parse_obj(model.get("schema"))
-                    model.update(load_schema(schema))
+        models = [model for catalog in data.values() for model in catalog['collections'].values()
+                  if model.get('schema') is not None]
+        schemas = [Schema.parse_obj(model.get("schema")) for model in models]
+        if not schemas:
+            return
+
+        # Schemas are downloaded in parallel
+        with ThreadPoolExecutor(max_workers=min(_SCHEMA_WORKERS, len(schemas))) as executor:
+            for model, schema in zip(models, executor.map(load_schema, schemas)):
+                model.update(schema)
 
     @staticmethod
     def _extract_references(attributes):
@@ -192,20 +222,52 @@ class GOBModel(UserDict):
             source_id = f"{source_id}.{entity[seqnr_field]}"
         return source_id
 
+    def _get_indexes(self) -> dict:
+        """Returns the lookup indexes for the model data.
+
+        The indexes are built on first use and rebuilt when the model data is replaced.
+        """
+        indexes = self.__dict__.get('_indexes')
+        if indexes is None or indexes['data'] is not self.data:
+            indexes = self._build_indexes(self.data)
+            self._indexes = indexes
+        return indexes
+
+    def _build_indexes(self, data) -> dict:
+        """Builds the lookup indexes for the given model data.
+
+        For equal abbreviations the first catalog or collection is indexed, like a linear search would find.
+        """
+        catalogs_by_abbr = {}
+        references_by_abbr = {}
+        table_names = []
+        for catalog_name, catalog in data.items():
+            catalog_abbr = catalog.get('abbreviation')
+            collections_by_abbr = {}
+            for collection_name, collection in catalog['collections'].items():
+                table_names.append(self.get_table_name(catalog_name, collection_name))
+                collection_abbr = collection.get('abbreviation')
+                if catalog_abbr is None or collection_abbr is None:
+                    continue
+                collections_by_abbr.setdefault(collection_abbr.lower(), collection)
+                references_by_abbr.setdefault((catalog_abbr, collection_abbr), f"{catalog_name}:{collection_name}")
+            if catalog_abbr is not None:
+                catalogs_by_abbr.setdefault(catalog_abbr.lower(), (catalog, collections_by_abbr))
+
+        return {
+            'data': data,
+            'catalogs_by_abbr': catalogs_by_abbr,
+            'references_by_abbr': references_by_abbr,
+            'table_names': tuple(table_names),
+        }
+
     def get_reference_by_abbreviations(self, catalog_abbreviation, collection_abbreviation):
-        for catalog_name, catalog in self.items():
-            if catalog['abbreviation'] == catalog_abbreviation.upper():
-                for collection_name, collection in catalog['collections'].items():
-                    if collection['abbreviation'] == collection_abbreviation.upper():
-                        return ':'.join([catalog_name, collection_name])
+        key = (catalog_abbreviation.upper(), collection_abbreviation.upper())
+        return self._get_indexes()['references_by_abbr'].get(key)
 
     def get_table_names(self):
         """Helper function to generate all table names."""
-        table_names = []
-        for catalog_name, catalog in self.items():
-            for collection_name in catalog['collections']:
-                table_names.append(self.get_table_name(catalog_name, collection_name))
-        return table_names
+        return list(self._get_indexes()['table_names'])
 
     def get_table_name(self, catalog_name, collection_name):
         return f'{catalog_name}_{collection_name}'.lower()
@@ -276,9 +338,8 @@ class GOBModel(UserDict):
         :param catalog_abbr:
         """
         try:
-            return [catalog for catalog in self.values()
-                    if catalog['abbreviation'].lower() == catalog_abbr][0]
-        except IndexError as exc:
+            return self._get_indexes()['catalogs_by_abbr'][catalog_abbr][0]
+        except KeyError as exc:
             raise NoSuchCatalogException(catalog_abbr) from exc
 
     def get_catalog_collection_from_abbr(self, catalog_abbr: str, collection_abbr: str):
@@ -288,12 +349,14 @@ class GOBModel(UserDict):
         :param collection_abbr:
         :return:
         """
-        catalog = self.get_catalog_from_abbr(catalog_abbr)
+        try:
+            catalog, collections_by_abbr = self._get_indexes()['catalogs_by_abbr'][catalog_abbr]
+        except KeyError as exc:
+            raise NoSuchCatalogException(catalog_abbr) from exc
 
         try:
-            collection = [collection for collection in catalog['collections'].values()
-                          if collection['abbreviation'].lower() == collection_abbr][0]
-        except IndexError as exc:
+            collection = collections_by_abbr[collection_abbr]
+        except KeyError as exc:
             raise NoSuchCollectionException(collection_abbr) from exc
 
         return catalog, collection
@@ -1,6 +1,20 @@
-"""Amsterdam Schema."""
-
+"""Amsterdam Schema.
+
+Downloaded schema files are kept in memory for the lifetime of the process.
+When the AMSCHEMA_CACHE_DIR environment variable is set, they are also cached on disk:
+- versioned table files are immutable and are read from the cache without any request
+- other files (dataset.json) are validated with their ETag
+When AMSCHEMA_OFFLINE is set, schema files are only read from the cache, without any request.
+For a complete local mirror set REPO_BASE to its (local) location.
+"""
+
+import hashlib
+import json
 import os
+import re
+import threading
+from pathlib import Path
+from typing import Optional
 
 from requests import Session
 from requests.adapters import HTTPAdapter
@@ -11,21 +25,120 @@ from gobcore.model.amschema.model import Dataset, Table
 from gobcore.parse import json_to_cached_dict
 
 REPO_BASE = os.getenv("REPO_BASE")
+CACHE_DIR = os.getenv("AMSCHEMA_CACHE_DIR")
+OFFLINE = bool(os.getenv("AMSCHEMA_OFFLINE"))
+
+# Locations of files that never change, eg .../peilmerken/v2.0.0.json
+_IMMUTABLE_LOCATION = re.compile(r".*/v\d+(\.\d+)*\.json")
 
 
 class AMSchemaError(Exception):
     pass
 
 
+def _get_digest(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
 class AMSchemaRepository:
 
+    # Downloaded files and a lock to download each file only once, by location, shared by all instances
+    _files = {}
+    _locks = {}
+
+    # Digests of the contents of the files that have been read, by location
+    _digests = {}
+
     def _get_file(self, location: str):
         if location.startswith("http"):
-            return self._download_file(location)
+            with AMSchemaRepository._locks.setdefault(location, threading.Lock()):
+                if location not in AMSchemaRepository._files:
+                    data = AMSchemaRepository._files[location] = self._get_remote_file(location)
+                    AMSchemaRepository._digests[location] = _get_digest(data)
+            return AMSchemaRepository._files[location]
         else:
-            return self._load_file(location)
+            data = self._load_file(location)
+            AMSchemaRepository._digests[location] = _get_digest(data)
+            return data
+
+    @classmethod
+    def get_file_digests(cls) -> dict[str, str]:
+        """Return the digests of the contents of the files that have been read, by location.
+
+        :return:
+        """
+        return dict(cls._digests)
+
+    def has_file_digests(self, digests: dict[str, str]) -> bool:
+        """Tell if the files still have the given digests, see get_file_digests.
+
+        Versioned remote files never change and are not read again.
+
+        :param digests:
+        :return:
+        """
+        return all(
+            location.startswith("http") and _IMMUTABLE_LOCATION.fullmatch(location)
+            or _get_digest(self._get_file(location)) == digest
+            for location, digest in digests.items()
+        )
 
-    def _download_file(self, location: str):
+    def _get_cache_path(self, location: str) -> Optional[Path]:
+        if not CACHE_DIR:
+            return None
+        return Path(CACHE_DIR, f"{hashlib.sha256(location.encode()).hexdigest()}.json")
+
+    def _get_remote_file(self, location: str):
+        """Return a remote file, from the cache if the cached file is known to be up to date.
+
+        :param location:
+        :return:
+        """
+        cache_path = self._get_cache_path(location)
+        cached = self._read_cache(cache_path) if cache_path else None
+        if cached:
+            if OFFLINE or _IMMUTABLE_LOCATION.fullmatch(location):
+                return cached["data"]
+        elif OFFLINE:
+            raise AMSchemaError(f"Offline and {location} is not in the cache")
+
+        data, etag = self._download_file(location, etag=cached and cached["etag"])
+        if data is None:
+            # Not modified
+            return cached["data"]
+
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"location": location, "etag": etag, "data": data}), encoding="utf-8")
+            tmp_path.replace(cache_path)
+        return data
+
+    @staticmethod
+    def _read_cache(cache_path: Path) -> Optional[dict]:
+        """Return the cached file, None if it is not cached.
+
+        A cache file that can not be read (eg a file that has been truncated) is deleted.
+
+        :param cache_path:
+        :return: the cached file (location, etag and data)
+        """
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            return {"etag": cached["etag"], "data": cached["data"]}
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError, KeyError):
+            cache_path.unlink(missing_ok=True)
+            return None
+
+    def _download_file(self, location: str, etag: str = None):
+        """Download a file.
+
+        :param location:
+        :param etag: the ETag of a previously downloaded version of the file
+        :return: the file contents and its ETag, the contents are None if the file has not been modified
+        """
         retries = Retry(
             total=6,
             backoff_factor=1,  # 1 x 2^0 until 1 x 2^6
@@ -35,10 +148,15 @@ class AMSchemaRepository:
 
         with Session() as session:
             session.mount("https://", HTTPAdapter(max_retries=retries))
-            r = session.get(location, timeout=10)
+            if etag:
+                r = session.get(location, timeout=10, headers={"If-None-Match": etag})
+            else:
+                r = session.get(location, timeout=10)
             r.raise_for_status()
 
-        return r.json()
+        if r.status_code == 304:
+            return None, etag
+        return r.json(), r.headers.get("ETag")
 
     def _load_file(self, location: str):
         return json_to_cached_dict(location)
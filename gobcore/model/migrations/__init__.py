@@ -1,14 +1,28 @@
 from os import path
 from collections import defaultdict
+from functools import partial
+from typing import Callable, NamedTuple
 
 from gobcore.exceptions import GOBException
 from gobcore.parse import json_to_cached_dict
 from gobcore.logging.logger import logger
 
 
+class MigrationPlan(NamedTuple):
+    """The conversions to migrate ADD and MODIFY events to the target version."""
+
+    target_version: str
+    add_functions: tuple[Callable, ...]
+    modify_functions: tuple[Callable, ...]
+    conversions: tuple[dict, ...]  # The conversions the plan is compiled from, in order
+
+
 class GOBMigrations:
     _migrations = None
 
+    # Migration plans by catalog - collection - version - target_version
+    _plans = {}
+
     def __init__(self):
         if GOBMigrations._migrations is not None:
             # Migrations already initialised
@@ -41,38 +55,31 @@ class GOBMigrations:
         except KeyError:
             return None
 
-    def _rename_column(self, event, data, old_key, new_key):
+    def get_migration_versions(self, catalog_name, collection_name):
         """
-        Rename a column in event data. Based on the event.action the data should be converted.
+        Get the versions for which a migration exists in the given catalog - collection
 
-        :param event:
-        :param data:
-        :param old_key:
-        :param new_key:
+        :param catalog_name:
+        :param collection_name:
         :return:
         """
-        if event.action == 'ADD':
-            # Rename the column
-            data['entity'][new_key] = data['entity'].pop(old_key)
-        elif event.action == 'MODIFY':
-            # Rename the column in modifications
-            for modification in data.get('modifications'):
-                if modification.get('key') == old_key:
-                    modification['key'] = new_key
+        return list(self._migrations.get(catalog_name, {}).get(collection_name, {}))
 
-    def _delete_column(self, event, data, column):
-        if event.action == 'ADD':
-            if column in data['entity']:
-                data['entity'].pop(column)
-        elif event.action == 'MODIFY':
-            data['modifications'] = [mod for mod in data['modifications'] if mod.get('key') != column]
+    @staticmethod
+    def _rename_column(entity, old_key, new_key):
+        entity[new_key] = entity.pop(old_key)
 
-    def _add_column(self, event, data, column, default):
-        if event.action == 'ADD':
-            if column not in data['entity']:
-                data['entity'][column] = default
+    @staticmethod
+    def _delete_column(entity, column):
+        entity.pop(column, None)
 
-    def _split_json(self, event, data, column, mapping):
+    @staticmethod
+    def _add_column(entity, column, default):
+        if column not in entity:
+            entity[column] = default
+
+    @staticmethod
+    def _split_json(entity, column, mapping):
         """Splits an existing GOB.JSON field with name :column: in the fields as specified in :mapping:
 
         For example:
@@ -86,71 +93,185 @@ class GOBMigrations:
         remove 'oldjsoncolumn' if needed.
 
         """
-        if event.action == 'ADD':
-            column_value = data['entity'][column]
+        column_value = entity[column]
+        entity.update({new_col: column_value[json_attr] for new_col, json_attr in mapping.items()})
 
-            new_values = {new_col: column_value[json_attr] for new_col, json_attr in mapping.items()}
-            data['entity'] = {
-                **data['entity'],
-                **new_values
-            }
-        elif event.action == 'MODIFY':
-            # If old JSON column is present in a modification, add modifications for the newly mapped fields.
-            # Leave the old JSON column modification untouched. User should define an explicit delete action for this.
-            new_modifications = []
-            for modification in data['modifications']:
-                if modification.get('key') == column:
-                    for new_col, json_attr in mapping.items():
-                        new_modifications.append({
-                            'key': new_col,
-                            'old_value': modification['old_value'].get(json_attr),
-                            'new_value': modification['new_value'].get(json_attr)
-                        })
-            data['modifications'] += new_modifications
+    @staticmethod
+    def _map_modification_keys(data, key_map):
+        """Rename (or delete if the new key is None) the keys of the modifications in data in one pass.
 
-    def _apply_migration(self, event, data, migration):
+        :param data:
+        :param key_map: the new key (or None) by old key
+        :return:
         """
-        Apply a migration on an event by converting the data based on all conversion in the migration
+        modifications = []
+        for modification in data['modifications']:
+            key = modification.get('key')
+            if key in key_map:
+                if key_map[key] is None:
+                    continue
+                modification['key'] = key_map[key]
+            modifications.append(modification)
+        data['modifications'] = modifications
+
+    @staticmethod
+    def _split_json_modifications(data, column, mapping):
+        # If old JSON column is present in a modification, add modifications for the newly mapped fields.
+        # Leave the old JSON column modification untouched. User should define an explicit delete action for this.
+        new_modifications = []
+        for modification in data['modifications']:
+            if modification.get('key') == column:
+                for new_col, json_attr in mapping.items():
+                    new_modifications.append({
+                        'key': new_col,
+                        'old_value': modification['old_value'].get(json_attr),
+                        'new_value': modification['new_value'].get(json_attr)
+                    })
+        data['modifications'] += new_modifications
+
+    def _compile_conversion(self, conversion):
+        """Compile a conversion to a function on the entity of an ADD event and an operation for MODIFY events.
+
+        :param conversion:
+        :return: (ADD function, MODIFY key mapping or function)
+        """
+        action = conversion.get('action')
+        if action == 'rename':
+            old_key = conversion.get('old_column')
+            new_key = conversion.get('new_column')
+            assert all([old_key, new_key]), "Invalid conversion definition"
+            return partial(self._rename_column, old_key=old_key, new_key=new_key), (old_key, new_key)
+        elif action == 'delete':
+            column = conversion.get('column')
+            assert column, "Invalid conversion definition"
+            return partial(self._delete_column, column=column), (column, None)
+        elif action == 'add':
+            column = conversion.get('column')
+            assert column, "Invalid conversion definition"
+            return partial(self._add_column, column=column, default=conversion.get('default')), None
+        elif action == 'split_json':
+            column = conversion.get('column')
+            mapping = conversion.get('mapping')
+            assert column and mapping, "Invalid conversion definition"
+            return (partial(self._split_json, column=column, mapping=mapping),
+                    partial(self._split_json_modifications, column=column, mapping=mapping))
+        raise NotImplementedError(f"Conversion {action} not implemented")
+
+    def _compile_plan(self, migrations):
+        """Compile the conversions of consecutive migrations into one migration plan.
+
+        Consecutive renames and deletes for MODIFY events are composed into one mapping of modification keys.
+
+        :param migrations:
+        :return:
+        """
+        add_functions = []
+        modify_functions = []
+        key_ops = []
+
+        def compose_key_ops():
+            if key_ops:
+                modify_functions.append(partial(self._map_modification_keys, key_map=self._compose_key_ops(key_ops)))
+                key_ops.clear()
+
+        conversions = [conversion for migration in migrations for conversion in migration['conversions']]
+        for conversion in conversions:
+            add_function, modify_op = self._compile_conversion(conversion)
+            add_functions.append(add_function)
+            if isinstance(modify_op, tuple):
+                key_ops.append(modify_op)
+            elif modify_op is not None:
+                compose_key_ops()
+                modify_functions.append(modify_op)
+        compose_key_ops()
+
+        return MigrationPlan(
+            migrations[-1]['target_version'], tuple(add_functions), tuple(modify_functions), tuple(conversions)
+        )
+
+    @staticmethod
+    def _compose_key_ops(key_ops):
+        """Compose consecutive renames and deletes of modification keys into one key mapping.
+
+        :param key_ops: a list of (old key, new key or None for a delete)
+        :return: the resulting key (or None) by every key that changes
+        """
+        key_map = {}
+        for key in {op_key for op in key_ops for op_key in op if op_key is not None}:
+            new_key = key
+            for old_key, op_new_key in key_ops:
+                if new_key == old_key:
+                    new_key = op_new_key
+            if new_key != key:
+                key_map[key] = new_key
+        return key_map
+
+    def get_migration_plan(self, catalog_name, collection_name, version, target_version):
+        """
+        Get the plan that migrates events in the given catalog - collection from version to target_version
 
-        :param event:
-        :param data:
-        :param old_key:
-        :param new_key:
+        The plan is compiled once for every catalog - collection - version - target_version
+
+        :param catalog_name:
+        :param collection_name:
+        :param version:
+        :param target_version:
         :return:
         """
-        for conversion in migration['conversions']:
-            if conversion.get('action') == 'rename':
-                old_key = conversion.get('old_column')
-                new_key = conversion.get('new_column')
+        key = (catalog_name, collection_name, version, target_version)
+        try:
+            return self._plans[key]
+        except KeyError:
+            pass
 
-                assert all([old_key, new_key]), "Invalid conversion definition"
+        migrations = []
+        while version != target_version:
+            migration = self._get_migration(catalog_name, collection_name, version)
 
-                self._rename_column(event, data, old_key, new_key)
-            elif conversion.get('action') == 'delete':
-                column = conversion.get('column')
-                assert column, "Invalid conversion definition"
+            if not migration:
+                logger.error(f"No migration found for {catalog_name}, {collection_name} {version}")
+                raise GOBException(
+                    f"Not able to migrate event for {catalog_name}, {collection_name} to version {target_version}"
+                )
+            migrations.append(migration)
+            version = migration['target_version']
 
-                self._delete_column(event, data, column)
-            elif conversion.get('action') == 'add':
-                column = conversion.get('column')
-                default = conversion.get('default')
-                assert column, "Invalid conversion definition"
+        plan = self._plans[key] = self._compile_plan(migrations)
+        return plan
 
-                self._add_column(event, data, column, default)
-            elif conversion.get('action') == 'split_json':
-                column = conversion.get('column')
-                mapping = conversion.get('mapping')
-                assert column and mapping, "Invalid conversion definition"
+    def _apply_plan(self, event, data, plan):
+        """
+        Apply a migration plan on an event
 
-                self._split_json(event, data, column, mapping)
-            else:
-                raise NotImplementedError(f"Conversion {conversion['action']} not implemented")
+        :param event:
+        :param data:
+        :param plan:
+        :return:
+        """
+        if event.action == 'ADD':
+            entity = data['entity']
+            for function in plan.add_functions:
+                function(entity)
+        elif event.action == 'MODIFY':
+            for function in plan.modify_functions:
+                function(data)
 
         # update the event version
-        event.version = migration['target_version']
+        event.version = plan.target_version
 
         return data
 
+    def _apply_migration(self, event, data, migration):
+        """
+        Apply a migration on an event by converting the data based on all conversion in the migration
+
+        :param event:
+        :param data:
+        :param migration:
+        :return:
+        """
+        return self._apply_plan(event, data, self._compile_plan([migration]))
+
     def migrate_event_data(self, event, data, catalog_name, collection_name, target_version):
         """
         Migrate data to the target version
@@ -162,15 +283,21 @@ class GOBMigrations:
         :param target_version:
         :return:
         """
-        while event.version != target_version:
-            migration = self._get_migration(catalog_name, collection_name, event.version)
+        if event.version == target_version:
+            return data
 
-            if not migration:
-                logger.error(f"No migration found for {catalog_name}, {collection_name} {event.version}")
-                raise GOBException(
-                    f"Not able to migrate event for {catalog_name}, {collection_name} to version {target_version}"
-                )
-            # Apply all conversions on the data
-            self._apply_migration(event, data, migration)
+        plan = self.get_migration_plan(catalog_name, collection_name, event.version, target_version)
+        return self._apply_plan(event, data, plan)
 
-        return data
+    def migrate_events_data(self, events_data, catalog_name, collection_name, target_version):
+        """
+        Migrate the data of multiple events in the given catalog - collection to the target version
+
+        :param events_data: an iterable of (event, data) tuples
+        :param catalog_name:
+        :param collection_name:
+        :param target_version:
+        :return: a list with the migrated data of each event
+        """
+        return [self.migrate_event_data(event, data, catalog_name, collection_name, target_version)
+                for event, data in events_data]
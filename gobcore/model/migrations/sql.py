@@ -0,0 +1,208 @@
+"""Event data migrations in the database.
+
+The conversions of a migration plan are translated into set based UPDATE statements on the JSONB contents
+of the events table. Old events can so be migrated once, in place, instead of on every read.
+
+The events of a catalog - collection - version are migrated in chunks of the next CHUNK_SIZE eventids.
+Every chunk is migrated in one transaction, including the update of the event version.
+After the migration of a version no event may remain at that version.
+
+Events for which a conversion fails in Python (eg a renamed column that is missing in an ADD event)
+are left unchanged by that conversion.
+"""
+import json
+from collections.abc import Iterator
+
+from gobcore.datastore.postgres import PostgresDatastore
+from gobcore.exceptions import GOBException
+from gobcore.logging.logger import logger
+from gobcore.model.migrations import GOBMigrations, MigrationPlan
+
+EVENTS_TABLE = "events"
+CHUNK_SIZE = 100_000  # Default number of events that is migrated in one transaction
+
+
+def _literal(value: str) -> str:
+    """Return value as a SQL string literal.
+
+    A value with backslashes is returned as an escape string literal (E'...'),
+    so the literal does not depend on the standard_conforming_strings setting.
+    """
+    value = str(value).replace("'", "''")
+    if "\\" in value:
+        return "E'" + value.replace("\\", "\\\\") + "'"
+    return "'" + value + "'"
+
+
+def _jsonb(value) -> str:
+    """Return value as a SQL jsonb literal."""
+    return f"{_literal(json.dumps(value))}::jsonb"
+
+
+def _has_modification(keys) -> str:
+    """Return the condition for events with a modification for any of the keys."""
+    contains = ", ".join(_jsonb([{'key': key}]) for key in sorted(keys))
+    return f"(contents->'modifications') @> ANY (ARRAY[{contains}])"
+
+
+def _update_entity(where: str, value: str, condition: str) -> str:
+    return (f"UPDATE {EVENTS_TABLE} SET contents = jsonb_set(contents, '{{entity}}', {value}) "
+            f"WHERE {where} AND action = 'ADD' AND {condition}")
+
+
+def _update_modifications(where: str, value: str, condition: str) -> str:
+    return (f"UPDATE {EVENTS_TABLE} SET contents = jsonb_set(contents, '{{modifications}}', {value}) "
+            f"WHERE {where} AND action = 'MODIFY' AND {condition}")
+
+
+def _add_statement(conversion: dict, where: str) -> str:
+    """Return the statement for ADD events for the given conversion."""
+    # Parenthesized, operators like - have a higher precedence than ->
+    entity = "(contents->'entity')"
+    action = conversion['action']
+    if action == 'rename':
+        old, new = _literal(conversion['old_column']), _literal(conversion['new_column'])
+        return _update_entity(where, f"({entity} - {old}) || jsonb_build_object({new}, {entity}->{old})",
+                              f"{entity} ? {old}")
+    if action == 'delete':
+        column = _literal(conversion['column'])
+        return _update_entity(where, f"{entity} - {column}", f"{entity} ? {column}")
+    if action == 'add':
+        column = _literal(conversion['column'])
+        return _update_entity(where, f"jsonb_build_object({column}, {_jsonb(conversion.get('default'))}) || {entity}",
+                              f"NOT ({entity} ? {column})")
+    # split_json, only for an object with all attributes, otherwise the conversion fails in Python
+    column = _literal(conversion['column'])
+    values = ", ".join(f"{_literal(new_col)}, {entity}->{column}->{_literal(json_attr)}"
+                       for new_col, json_attr in conversion['mapping'].items())
+    attrs = ", ".join(_literal(json_attr) for json_attr in conversion['mapping'].values())
+    condition = f"jsonb_typeof({entity}->{column}) = 'object' AND ({entity}->{column}) ?& ARRAY[{attrs}]::text[]"
+    return _update_entity(where, f"{entity} || jsonb_build_object({values})", condition)
+
+
+def _map_keys_statement(key_map: dict, where: str) -> str:
+    """Return the statement for MODIFY events that renames (or deletes) the keys of the modifications."""
+    renames = " ".join(f"WHEN {_literal(key)} THEN jsonb_set(m, '{{key}}', {_jsonb(new_key)})"
+                       for key, new_key in key_map.items() if new_key is not None)
+    modification = f"CASE m->>'key' {renames} ELSE m END" if renames else "m"
+
+    deletes = ", ".join(_literal(key) for key, new_key in key_map.items() if new_key is None)
+    keep = f" FILTER (WHERE m->>'key' IS NULL OR m->>'key' NOT IN ({deletes}))" if deletes else ""
+
+    value = (f"(SELECT coalesce(jsonb_agg({modification} ORDER BY i){keep}, '[]'::jsonb) "
+             f"FROM jsonb_array_elements(contents->'modifications') WITH ORDINALITY AS t(m, i))")
+    return _update_modifications(where, value, _has_modification(key_map))
+
+
+def _split_json_statement(conversion: dict, where: str) -> str:
+    """Return the statement for MODIFY events that adds modifications for the fields of a split JSON column."""
+    column = conversion['column']
+    mapping = ", ".join(f"({_literal(new_col)}, {_literal(json_attr)}, {j})"
+                        for j, (new_col, json_attr) in enumerate(conversion['mapping'].items()))
+    value = ("(contents->'modifications') || (SELECT coalesce(jsonb_agg(jsonb_build_object("
+             "'key', map.new_col, 'old_value', m->'old_value'->map.attr, 'new_value', m->'new_value'->map.attr"
+             ") ORDER BY i, map.j), '[]'::jsonb) "
+             "FROM jsonb_array_elements(contents->'modifications') WITH ORDINALITY AS t(m, i), "
+             f"(VALUES {mapping}) AS map(new_col, attr, j) WHERE m->>'key' = {_literal(column)})")
+    return _update_modifications(where, value, _has_modification([column]))
+
+
+def _modify_statements(conversions: tuple[dict, ...], where: str) -> Iterator[str]:
+    """Yield the statements for MODIFY events, consecutive renames and deletes are composed into one statement."""
+    key_ops = []
+    for conversion in conversions:
+        if conversion['action'] == 'split_json':
+            yield from _map_keys_statements(key_ops, where)
+            key_ops = []
+            yield _split_json_statement(conversion, where)
+        elif conversion['action'] in ['rename', 'delete']:
+            key_ops.append((conversion.get('old_column', conversion.get('column')), conversion.get('new_column')))
+    yield from _map_keys_statements(key_ops, where)
+
+
+def _map_keys_statements(key_ops: list[tuple], where: str) -> Iterator[str]:
+    if key_map := GOBMigrations._compose_key_ops(key_ops):
+        yield _map_keys_statement(key_map, where)
+
+
+def get_migration_statements(plan: MigrationPlan, where: str) -> Iterator[str]:
+    """Yield the UPDATE statements that migrate the events that match where with the given plan.
+
+    The last statement sets the event version to the target version of the plan.
+    Execute the statements in one transaction.
+
+    :param plan: the migration plan, see GOBMigrations.get_migration_plan()
+    :param where: SQL condition for the events to migrate, all events should have the version the plan migrates from
+    :return:
+    """
+    for conversion in plan.conversions:
+        yield _add_statement(conversion, where)
+    yield from _modify_statements(plan.conversions, where)
+    yield f"UPDATE {EVENTS_TABLE} SET version = {_literal(plan.target_version)} WHERE {where}"
+
+
+def _migrate_chunks(datastore: PostgresDatastore, plan: MigrationPlan, where: str, first_eventid: int,
+                    chunk_size: int) -> int:
+    """Migrate the events that match where with the given plan, in chunks of the next chunk_size matching eventids.
+
+    :return: the number of migrated events
+    """
+    migrated = 0
+    last_eventid = first_eventid - 1
+    while True:
+        [row] = list(datastore.query(
+            f"SELECT max(eventid), count(*) FROM (SELECT eventid FROM {EVENTS_TABLE} "
+            f"WHERE {where} AND eventid > {last_eventid} ORDER BY eventid LIMIT {chunk_size}) AS chunk"))
+        chunk_end, chunk_count = row
+        if not chunk_count:
+            return migrated
+
+        chunk = f"{where} AND eventid > {last_eventid} AND eventid <= {chunk_end}"
+        datastore.execute(";\n".join(get_migration_statements(plan, chunk)))
+        migrated += chunk_count
+        last_eventid = chunk_end
+        logger.info(f"Migrated {migrated} events, up to eventid {chunk_end}")
+
+
+def migrate_events(datastore: PostgresDatastore, catalog_name: str, collection_name: str, target_version: str,
+                   chunk_size: int = CHUNK_SIZE, dry_run: bool = False) -> int:
+    """Migrate the events of a catalog - collection in the database to the target version.
+
+    :param datastore: a connected PostgresDatastore
+    :param catalog_name:
+    :param collection_name:
+    :param target_version: the version to migrate to, normally the model version of the collection
+    :param chunk_size: the number of events that is migrated in one transaction
+    :param dry_run: only count the events that would be migrated
+    :return: the number of events that is (or would be) migrated
+    :raises GOBException: when any event has not been migrated from its version, eg an event that has been added
+        during the migration
+    """
+    migrations = GOBMigrations()
+    total = 0
+    for version in migrations.get_migration_versions(catalog_name, collection_name):
+        if version == target_version:
+            continue
+
+        where = (f"catalogue = {_literal(catalog_name)} AND entity = {_literal(collection_name)} "
+                 f"AND version = {_literal(version)}")
+        # Consume the query, so its transaction is committed
+        [row] = list(datastore.query(f"SELECT min(eventid), count(*) FROM {EVENTS_TABLE} WHERE {where}"))
+        first_eventid, count = row
+        if not count:
+            continue
+
+        total += count
+        logger.info(f"{'Would migrate' if dry_run else 'Migrate'} {count} events for {catalog_name} "
+                    f"{collection_name} from version {version} to {target_version}")
+        if dry_run:
+            continue
+
+        plan = migrations.get_migration_plan(catalog_name, collection_name, version, target_version)
+        _migrate_chunks(datastore, plan, where, first_eventid, chunk_size)
+
+        [(remaining,)] = list(datastore.query(f"SELECT count(*) FROM {EVENTS_TABLE} WHERE {where}"))
+        if remaining:
+            raise GOBException(f"{remaining} events for {catalog_name} {collection_name} "
+                               f"have not been migrated from version {version}")
+    return total
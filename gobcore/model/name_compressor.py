@@ -1,5 +1,9 @@
 """Shorten table names."""
 
+from functools import lru_cache
+
+# Maximum number of names cached per direction, far more than the number of tables in the model
+_CACHE_SIZE = 4096
 
 _CONVERSIONS = {
     "is_bron_voor_aantekening_kadastraal_object": "bron_kad_obj",
@@ -47,19 +51,24 @@ class NameCompressor:
         return f"_{value}_"
 
     @classmethod
+    @lru_cache(maxsize=_CACHE_SIZE)
     def compress_name(cls, name):
-        """Compress (shorten) table name."""
+        """Compress (shorten) table name, the conversions are applied only once for each name."""
+        compressed = name
         for src, dst in _CONVERSIONS.items():
-            name = name.replace(src, cls._compressed_value(dst))
+            compressed = compressed.replace(src, cls._compressed_value(dst))
 
-        if len(name) > cls.LONG_NAME_LENGTH:
-            print(f"WARNING: LONG NAME: {name} ({len(name)})")
+        if len(compressed) > cls.LONG_NAME_LENGTH:
+            print(f"WARNING: LONG NAME: {compressed} ({len(compressed)})")
 
-        return name
+        return compressed
 
     @classmethod
+    @lru_cache(maxsize=_CACHE_SIZE)
     def uncompress_name(cls, name):
-        """Uncompress table name."""
+        """Uncompress table name, the conversions are applied only once for each name."""
+        uncompressed = name
         for src, dst in reversed(_CONVERSIONS.items()):
-            name = name.replace(cls._compressed_value(dst), src)
-        return name
+            uncompressed = uncompressed.replace(cls._compressed_value(dst), src)
+
+        return uncompressed
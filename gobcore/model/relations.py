@@ -3,6 +3,7 @@
 Relations are automatically derived from the GOB Model specification.
 """
 
+import copy
 from collections import defaultdict
 
 from gobcore.model.metadata import FIELD, DESCRIPTION
@@ -17,6 +18,9 @@ DERIVATION = {
 
 _startup = True  # Show relation warnings only on startup (first execution)
 
+# The relation graph for the last used model data, see get_relation_graph()
+_graph_cache = {'data': None, 'graph': None}
+
 
 def _get_relation(name):
     """Get the relation specification.
@@ -159,10 +163,15 @@ def get_relation_name(model, catalog_name, collection_name, reference_name):
     :param reference_name:
     :return:
     """
+    try:
+        return get_relation_graph(model).relation_names[(catalog_name, collection_name, reference_name)]
+    except KeyError:
+        # Not a reference in the model
+        pass
+
     catalog = model[catalog_name]
     collection = model[catalog_name]['collections'][collection_name]
-    reference = [reference for name, reference in collection['attributes'].items()
-                 if name == reference_name][0]
+    reference = collection['attributes'][reference_name]
     dst_catalog_name, dst_collection_name = reference['ref'].split(':')
 
     src = {
@@ -177,6 +186,87 @@ def get_relation_name(model, catalog_name, collection_name, reference_name):
                               reference_name=reference_name)
 
 
+class RelationGraph:
+    """The relations between the collections in the GOBModel data.
+
+    The graph is derived from the references in the model data once, see get_relation_graph().
+    All relation lookups are answered from the graph.
+    """
+
+    def __init__(self, model):
+        """Derive the relation graph from the model data.
+
+        :param model: GOBModel class/instance
+        """
+        # Relation name (or None) by (src catalog name, src collection name, reference name)
+        self.relation_names = {}
+        # (reference name, dst catalog name, dst collection name, relation name) by src catalog and src collection
+        self.references = {}
+        # (src catalog name, src collection name, reference name) by relation name, existing relations only
+        self.relations = {}
+        # Reference names by dst catalog, dst collection, src catalog and src collection, see get_inverse_relations
+        self.inverse_relations = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
+
+        # model.data covers GOBModel initialisation in __new__.
+        for src_catalog_name, src_catalog in model.data.items():
+            self.references[src_catalog_name] = {}
+            for src_collection_name, src_collection in src_catalog['collections'].items():
+                src = {
+                    "catalog": src_catalog,
+                    "catalog_name": src_catalog_name,
+                    "collection": src_collection,
+                    "collection_name": src_collection_name
+                }
+                references = model._extract_references(src_collection.get('attributes', {}))
+                self.references[src_catalog_name][src_collection_name] = [
+                    self._add_reference(model, src, reference_name, reference)
+                    for reference_name, reference in references.items()
+                ]
+
+    def _add_reference(self, model, src, reference_name, reference):
+        """Add the relation for the given reference to the graph.
+
+        :return: (reference name, dst catalog name, dst collection name, relation name or None if no relation exists)
+        """
+        src_key = (src["catalog_name"], src["collection_name"])
+        dst_catalog_name, dst_collection_name = reference['ref'].split(':')
+        dst = _get_destination(model, dst_catalog_name, dst_collection_name)
+        name = _get_relation_name(src=src, dst=dst, reference_name=reference_name)
+
+        self.relation_names[(*src_key, reference_name)] = name
+        self.inverse_relations[dst_catalog_name][dst_collection_name][src_key[0]].setdefault(
+            src_key[1], []).append(reference_name)
+
+        if not (dst and name):
+            return reference_name, dst_catalog_name, dst_collection_name, None
+
+        self.relations[name] = (*src_key, reference_name)
+        return reference_name, dst_catalog_name, dst_collection_name, name
+
+    def iter_references(self):
+        """Yield the src catalog name, src collection name and references of every collection.
+
+        :return:
+        """
+        for src_catalog_name, collections in self.references.items():
+            for src_collection_name, references in collections.items():
+                yield src_catalog_name, src_collection_name, references
+
+
+def get_relation_graph(model) -> RelationGraph:
+    """Return the relation graph for the model data.
+
+    The graph is derived once for the model data and rederived when the model data is replaced.
+
+    :param model: The GOBModel instance
+    :return:
+    """
+    if _graph_cache['data'] is not model.data:
+        _graph_cache['graph'] = RelationGraph(model)
+        _graph_cache['data'] = model.data
+    return _graph_cache['graph']
+
+
 def get_relations(model):
     """Get the relation specs for all references within GOBModel data.
 
@@ -190,29 +280,17 @@ def get_relations(model):
         "description": "GOB Relations",
         "collections": {}
     }
-    # model.data covers GOBModel initialisation in __new__.
-    for src_catalog_name, src_catalog in model.data.items():
-        for src_collection_name, src_collection in src_catalog['collections'].items():
-            references = model._extract_references(src_collection['attributes'])
-            for reference_name, reference in references.items():
-                dst_catalog_name, dst_collection_name = reference['ref'].split(':')
-                src = {
-                    "catalog": src_catalog,
-                    "catalog_name": src_catalog_name,
-                    "collection": src_collection,
-                    "collection_name": src_collection_name
-                }
-                dst = _get_destination(model, dst_catalog_name, dst_collection_name)
-                name = _get_relation_name(src=src,
-                                          dst=dst,
-                                          reference_name=reference_name)
-                if not (dst and name):
-                    if _startup:
-                        # Show warnings only on startup
-                        print(f"Skip {src_catalog_name}.{src_collection_name}.{reference_name} => " +
-                              f"{dst_catalog_name}.{dst_collection_name}")
-                    continue
-                relations["collections"][name] = _get_relation(name)
+    # The model data is incomplete during GOBModel initialisation, derive a graph that is not kept
+    graph = RelationGraph(model)
+    for src_catalog_name, src_collection_name, references in graph.iter_references():
+        for reference_name, dst_catalog_name, dst_collection_name, name in references:
+            if name is None:
+                if _startup:
+                    # Show warnings only on startup
+                    print(f"Skip {src_catalog_name}.{src_collection_name}.{reference_name} => " +
+                          f"{dst_catalog_name}.{dst_collection_name}")
+                continue
+            relations["collections"][name] = _get_relation(name)
     _startup = False
     return relations
 
@@ -226,26 +304,12 @@ def get_fieldnames_for_missing_relations(model):
     :param model: The GOBModel instance
     :return:
     """
-    result = {}
-    for src_catalog_name, src_catalog in model.items():
-        result[src_catalog_name] = {}
-        for src_collection_name, src_collection in src_catalog['collections'].items():
-            result[src_catalog_name][src_collection_name] = []
-            references = model._extract_references(src_collection['attributes'])
-            for reference_name, reference in references.items():
-                src = {
-                    "catalog": src_catalog,
-                    "catalog_name": src_catalog_name,
-                    "collection": src_collection,
-                    "collection_name": src_collection_name
-                }
-                dst_catalog_name, dst_collection_name = reference['ref'].split(':')
-                dst = _get_destination(model, dst_catalog_name, dst_collection_name)
-                name = _get_relation_name(src=src, dst=dst, reference_name=reference_name)
-
-                if not (dst and name):
-                    result[src_catalog_name][src_collection_name].append(reference_name)
-    return result
+    return {
+        src_catalog_name: {
+            src_collection_name: [reference_name for reference_name, *_, name in references if name is None]
+            for src_collection_name, references in collections.items()
+        } for src_catalog_name, collections in get_relation_graph(model).references.items()
+    }
 
 
 def get_inverse_relations(model):
@@ -270,22 +334,7 @@ def get_inverse_relations(model):
     :param model: The GOBModel instance
     :return:
     """
-    inverse_relations = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
-
-    for src_cat_name, src_catalog in model.items():
-        for src_col_name, src_collection in src_catalog['collections'].items():
-            references = model._extract_references(src_collection['attributes'])
-
-            for reference_name, reference in references.items():
-                dst_cat_name, dst_col_name = reference['ref'].split(':')
-
-                try:
-                    inverse_relations[dst_cat_name][dst_col_name][src_cat_name][src_col_name]
-                except KeyError:
-                    inverse_relations[dst_cat_name][dst_col_name][src_cat_name][src_col_name] = []
-
-                inverse_relations[dst_cat_name][dst_col_name][src_cat_name][src_col_name].append(reference_name)
-    return inverse_relations
+    return copy.deepcopy(get_relation_graph(model).inverse_relations)
 
 
 def get_relations_for_collection(model, catalog_name, collection_name):
@@ -296,11 +345,17 @@ def get_relations_for_collection(model, catalog_name, collection_name):
     :param collection_name:
     :return:
     """
-    collection = model[catalog_name]['collections'][collection_name]
-    references = model._extract_references(collection['attributes'])
-    table_names = {reference_name: get_relation_name(model, catalog_name, collection_name, reference_name)
-                   for reference_name in references.keys()}
-    return table_names
+    try:
+        references = get_relation_graph(model).references[catalog_name][collection_name]
+    except KeyError:
+        # Not in the model
+        collection = model[catalog_name]['collections'][collection_name]
+        return {reference_name: get_relation_name(model, catalog_name, collection_name, reference_name)
+                for reference_name in model._extract_references(collection['attributes'])}
+
+    relation_names = get_relation_graph(model).relation_names
+    return {reference_name: relation_names[(catalog_name, collection_name, reference_name)]
+            for reference_name, *_ in references}
 
 
 def create_relation(src, validity, dst, derivation):
@@ -339,12 +394,19 @@ def create_relation(src, validity, dst, derivation):
         f"dst_{FIELD.SEQNR}": dst[FIELD.SEQNR]
     }
 
+
 def get_catalog_collection_relation_name(model, rel_collection_name: str) -> tuple[str, str, str]:
     """Return the full catalog name, collection name and relation name for a given rel_collection_name.
 
     For example, get_catalog_collection_relation_name(model, 'nap_pmk_gbd_bbk_ligt_in_bouwblok') will return
     ('nap', 'peilmerken', 'ligt_in_bouwblok')
     """
+    try:
+        return get_relation_graph(model).relations[rel_collection_name]
+    except KeyError:
+        # Not a relation in the model
+        pass
+
     rel_info = split_relation_table_name(f"rel_{rel_collection_name}")
 
     catalog, collection = model.get_catalog_collection_from_abbr(
@@ -1,6 +1,9 @@
 """SQLAlchemy GOB Models."""
 
 
+import threading
+from collections.abc import MutableMapping
+
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.schema import ForeignKeyConstraint, UniqueConstraint
 
@@ -16,12 +19,25 @@ from gobcore.typesystem import get_gob_type
 TABLE_TYPE_RELATION = 'relation_table'
 TABLE_TYPE_ENTITY = 'entity_table'
 
-Base = declarative_base()
+_Base = declarative_base()
 
 
 def get_base():
-    """Backwards compatibility."""
-    return Base
+    """Return the declarative base of the GOB models.
+
+    For backwards compatibility the metadata of the base contains all GOB models.
+    Any models that have not been created yet by get_sqlalchemy_models() are created.
+    """
+    if (models := getattr(GOBModel, 'sqlalchemy_models', None)) is not None:
+        models.load_all()
+    return _Base
+
+
+def __getattr__(name):
+    """Base is the declarative base of all GOB models, see get_base."""
+    if name == 'Base':
+        return get_base()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_column(column_name, column_specification):
@@ -48,7 +64,7 @@ def _create_model_type(table_name, columns, has_states, table_args):
     :param table_args:
     :return:
     """
-    return type(table_name, (get_base(),), {
+    return type(table_name, (_Base,), {
         '__tablename__': table_name,
         **columns,
         '__has_states__': has_states,
@@ -135,19 +151,101 @@ def columns_to_model(model: GOBModel, catalog_name, table_name, columns, has_sta
     return _create_model_type(table_name, columns, has_states, table_args)
 
 
+class SQLAlchemyModels(MutableMapping):
+    """SQLAlchemy models by table name.
+
+    The model for a table is created on first access.
+    A relation table model also creates the models of the tables that it refers to.
+
+    Like the dict that was returned before, models can be set and deleted and copy() returns a dict of all models.
+    """
+
+    def __init__(self, model: GOBModel):
+        self._model = model
+        self._tables = {
+            model.get_table_name(catalog_name, collection_name): (catalog_name, collection_name)
+            for catalog_name in model
+            for collection_name in model[catalog_name]['collections']
+        }
+        self._models = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, table_name):
+        try:
+            return self._models[table_name]
+        except KeyError:
+            pass
+
+        catalog_name, collection_name = self._tables[table_name]
+        with self._lock:
+            if table_name not in self._models:
+                self._models[table_name] = self._create_model(catalog_name, collection_name, table_name)
+        return self._models[table_name]
+
+    def __setitem__(self, table_name, model):
+        with self._lock:
+            self._tables.setdefault(table_name, None)
+            self._models[table_name] = model
+
+    def __delitem__(self, table_name):
+        with self._lock:
+            del self._tables[table_name]
+            self._models.pop(table_name, None)
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def copy(self) -> dict:
+        """Return a dict of all models, the models that have not been created yet are created.
+
+        :return:
+        """
+        return dict(self)
+
+    def _create_model(self, catalog_name, collection_name, table_name):
+        """Create the model for the given table.
+
+        :param catalog_name:
+        :param collection_name:
+        :param table_name:
+        :return: Model class
+        """
+        if catalog_name == "rel":
+            # The FK constraints of a relation table require the models of the src and dst tables
+            relation_info = split_relation_table_name(table_name)
+            for srcdst in ['src', 'dst']:
+                catalog, collection = self._model.get_catalog_collection_from_abbr(
+                    relation_info[f'{srcdst}_cat_abbr'], relation_info[f'{srcdst}_col_abbr'])
+                self[self._model.get_table_name(catalog['name'], collection['name'])]
+
+        # the GOB model for the specified entity
+        collection = self._model[catalog_name]['collections'][collection_name]
+        return columns_to_model(self._model, catalog_name, table_name, collection['all_fields'],
+                                has_states=collection.get('has_states', False))
+
+    def load_all(self):
+        """Create the models for all tables that have not been created yet.
+
+        :return: None
+        """
+        for table_name in self:
+            self[table_name]
+
+
 def get_sqlalchemy_models(model: GOBModel):
     """Derive Models from GOB model specification.
 
+    The models are created on first access, see SQLAlchemyModels.
+
     :param model: GOBModel instance
-    :return: None
+    :return: SQLAlchemyModels, a mapping of table name to model
     """
-    if model.__class__.sqlalchemy_models:
+    if model.__class__.sqlalchemy_models is not None:
         return model.__class__.sqlalchemy_models
 
-    models = {
-        # e.g. "meetbouten_rollagen": <BASE>
-    }
-
     # Start with events
     columns_to_model(
         model,
@@ -157,20 +255,6 @@ def get_sqlalchemy_models(model: GOBModel):
         constraint_columns=["eventid"]
     )
 
-    for catalog_name in model:
-        for collection_name, collection in model[catalog_name]['collections'].items():
-            # "attributes": {
-            #     "attribute_name": {
-            #         "type": "GOB type name, e.g. GOB.String",
-            #         "description": "attribute description",
-            #         "ref: "collection_name:entity_name, e.g. meetbouten:meetbouten"
-            #     }, ...
-            # }
-
-            # the GOB model for the specified entity
-            table_name = model.get_table_name(catalog_name, collection_name)
-            models[table_name] = columns_to_model(model, catalog_name, table_name, collection['all_fields'],
-                                                  has_states=collection.get('has_states', False))
-
+    models = SQLAlchemyModels(model)
     model.__class__.sqlalchemy_models = models
     return models
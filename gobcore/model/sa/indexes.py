@@ -10,6 +10,9 @@ TABLE_TYPE_ENTITY = 'entity_table'
 
 Base = None
 
+# The index plan for the last model data, see get_indexes
+_indexes_cache = {'data': None, 'indexes': None}
+
 
 def _get_special_column_type(column_type: str):
     """Returns special column type such as 'geo' or 'json', or else None
@@ -84,9 +87,7 @@ def _hash(string):
     return hashlib.md5(string.encode()).hexdigest()
 
 
-def _relation_indexes_for_collection(model, catalog_name, collection_name, collection, idx_prefix):
-    sources = GOBSources(model)
-
+def _relation_indexes_for_collection(model, sources, catalog_name, collection_name, collection, idx_prefix):
     indexes = {}
     table_name = model.get_table_name(catalog_name, collection_name)
 
@@ -132,7 +133,25 @@ def _relation_indexes_for_collection(model, catalog_name, collection_name, colle
 
 
 def get_indexes(model) -> dict:
+    """Returns the index definitions for all tables in the model, by index name.
+
+    The definitions are computed once for the model data and copied on every call.
+
+    :param model: GOBModel instance
+    :return:
+    """
+    data = getattr(model, 'data', None)
+    if data is None or _indexes_cache['data'] is not data:
+        indexes = _get_indexes(model)
+        if data is None:
+            return indexes
+        _indexes_cache.update(data=data, indexes=indexes)
+    return {name: {**index, 'columns': list(index['columns'])} for name, index in _indexes_cache['indexes'].items()}
+
+
+def _get_indexes(model) -> dict:
     indexes = {}
+    sources = GOBSources(model)
 
     for catalog_name, catalog in model.items():
         for collection_name, collection in model[catalog_name]['collections'].items():
@@ -166,7 +185,7 @@ def get_indexes(model) -> dict:
 
             # Generate indexes on referenced columns (GOB.Reference and GOB.ManyReference)
             indexes.update(
-                **_relation_indexes_for_collection(model, catalog_name, collection_name, collection, prefix))
+                **_relation_indexes_for_collection(model, sources, catalog_name, collection_name, collection, prefix))
 
             # Create special COALESCE(_expiration_date, '9999-12-31'::timestamp without time zone') index
             indexes[_hashed_index_name(prefix, f"{FIELD.EXPIRATION_DATE}_coalesce")] = {
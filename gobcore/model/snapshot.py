@@ -0,0 +1,126 @@
+"""GOBModel snapshots.
+
+Initialising the GOBModel loads the Amsterdam Schemas and processes the complete model.
+When the GOBMODEL_SNAPSHOT_DIR environment variable is set, the initialised model data is saved
+in this directory on first use and any later process loads this snapshot instead.
+Set the variable during a build and initialise the GOBModel once to ship a snapshot with an image.
+
+A snapshot is identified by a hash of the model definition, the code that processes it and the settings
+that affect the result. A snapshot for another model definition is not found.
+The external (Amsterdam) schema files are not part of the key, their contents are only known after reading them.
+A snapshot holds the digests of the schema files it has been built from and it is only loaded if the files that
+can change (eg dataset.json) still have the same contents. Versioned table files never change and are not read.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from gobcore.logging.logger import logger
+
+SNAPSHOT_DIR = "GOBMODEL_SNAPSHOT_DIR"  # Name of the environment variable for the snapshot directory
+
+_MODEL_DIR = Path(__file__).parent
+
+# Files that determine the contents of the initialised model, relative to the model directory
+_SOURCES = [
+    "gobmodel.json",
+    "snapshot.py",
+    "__init__.py",
+    "metadata.py",
+    "name_compressor.py",
+    "pydantic.py",
+    "quality.py",
+    "relations.py",
+    "schema.py",
+    "amschema/model.py",
+    "amschema/repo.py",
+    "../typesystem/__init__.py",
+    "../typesystem/gob_types.py",
+    "../typesystem/gob_geotypes.py",
+    "../typesystem/gob_secure_types.py",
+]
+
+# Environment variables that affect the initialised model
+_ENVIRONMENT = ["DISABLE_TEST_CATALOGUE", "REPO_BASE"]
+
+
+def get_snapshot_key(legacy: bool) -> Optional[str]:
+    """Return the key of the snapshot for the current model, None if snapshots are not enabled.
+
+    :param legacy: the legacy mode of the model
+    :return:
+    """
+    if not os.getenv(SNAPSHOT_DIR):
+        return None
+
+    digest = hashlib.sha256()
+    for source in _SOURCES:
+        digest.update((_MODEL_DIR / source).read_bytes())
+    for name in _ENVIRONMENT:
+        digest.update(repr(os.getenv(name)).encode())
+    digest.update(repr((legacy, sys.version_info[:2], pickle.HIGHEST_PROTOCOL)).encode())
+    return digest.hexdigest()
+
+
+def _get_path(key: str) -> Path:
+    return Path(os.getenv(SNAPSHOT_DIR), f"gobmodel_{key}.pickle")
+
+
+def load_snapshot(key: Optional[str]) -> Optional[dict]:
+    """Return the model data of the snapshot with the given key.
+
+    None if the snapshot does not exist, can not be read or has been built from other schema files.
+
+    :param key:
+    :return:
+    """
+    # The repository imports the model
+    from gobcore.model.amschema.repo import AMSchemaRepository
+
+    if key is None:
+        return None
+
+    try:
+        with open(_get_path(key), "rb") as file:
+            snapshot = pickle.load(file)
+        # An outdated snapshot is not found, like a snapshot for another model definition
+        return snapshot["data"] if AMSchemaRepository().has_file_digests(snapshot["schemas"]) else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"GOBModel snapshot could not be loaded ({str(e)})")
+        return None
+
+
+def save_snapshot(key: Optional[str], data: dict) -> None:
+    """Save the model data as the snapshot with the given key, with the digests of the schema files that have been read.
+
+    The snapshot is written to a temporary file first, so a snapshot is never read while it is being written.
+    Saving a snapshot can never fail.
+
+    :param key:
+    :param data:
+    :return: None
+    """
+    from gobcore.model.amschema.repo import AMSchemaRepository
+
+    if key is None:
+        return
+
+    snapshot = {"data": data, "schemas": AMSchemaRepository.get_file_digests()}
+    path = _get_path(key)
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".gobmodel_", delete=False) as file:
+            tmp_name = file.name
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except Exception as e:
+        logger.warning(f"GOBModel snapshot could not be saved ({str(e)})")
+        if tmp_name and os.path.exists(tmp_name):
+            os.remove(tmp_name)
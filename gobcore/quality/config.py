@@ -178,6 +178,17 @@ class QA_CHECK:
         "msg": 'aantal_eenheden_complex should be filled if complex is in woonfunctie or gezondheidszorgfunctie'
     }
 
+    # State requirements
+    Value_state_overlap = {
+        "msg": "value should not be before"
+    }
+    Value_state_gap = {
+        "msg": "value should not be after"
+    }
+    Value_state_order = {
+        "msg": "value should be greater than"
+    }
+
 
 # Initialisation of QA Checks
 for check_name in [item for item in dir(QA_CHECK) if not item.startswith("__")]:
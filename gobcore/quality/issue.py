@@ -1,26 +1,41 @@
 import datetime
+import decimal
+import json
+from itertools import islice
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Iterable
 
 from dateutil import parser
-import json
+from orjson import orjson
 
 from gobcore.message_broker.config import IMPORT, RELATE, RELATE_CHECK
 from gobcore.message_broker.offline_contents import ContentsWriter
 from gobcore.message_broker.typing import Message, Header
-from gobcore.message_broker.utils import to_json
 from gobcore.model import FIELD
 from gobcore.logging.logger import logger, LoggerManager
 from gobcore.quality.config import QA_LEVEL, QA_CHECK
 from gobcore.quality.quality_update import QualityUpdate
+from gobcore.typesystem.json import GobTypeORJSONEncoder
 from gobcore.utils import ProgressTicker
 from gobcore.workflow.start_workflow import start_workflow
 
 
+_ISSUE_CHUNK_SIZE = 10_000  # Number of issues that are converted to quality contents at once
+
+
 class IssueException(Exception):
     pass
 
 
+class _IssueJSONEncoder(GobTypeORJSONEncoder):
+
+    def __call__(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            # Keep decimals numeric, like GobTypeJSONEncoder
+            return json.loads(str(obj))
+        return super().__call__(obj)
+
+
 class Issue():
     """
     Data issue class
@@ -29,6 +44,13 @@ class Issue():
     _DEFAULT_ENTITY_ID = 'identificatie'
     _NO_VALUE = '<<NO VALUE>>'
 
+    # Issues are kept in memory in large numbers, only store the values that describe the issue
+    __slots__ = ('check', 'check_id', 'entity_id_attribute', 'entity_id',
+                 FIELD.SEQNR, FIELD.START_VALIDITY, FIELD.END_VALIDITY,
+                 'attribute', '_values', 'compared_to', 'compared_to_value', 'explanation')
+
+    _json_default = _IssueJSONEncoder()
+
     def __init__(self, check: dict, entity: dict, id_attribute: str, attribute: str,
                  compared_to: str = None, compared_to_value=None):
         """
@@ -78,8 +100,6 @@ class Issue():
         self.check = check
         self.check_id = check['id']
 
-        self.entity = entity
-
         # Entity id and sequence number
         self.entity_id_attribute = id_attribute or self._DEFAULT_ENTITY_ID
         self.entity_id = self._get_value(entity, self.entity_id_attribute)
@@ -139,7 +159,7 @@ class Issue():
         value = entity.get(attribute)
         try:
             if isinstance(value, str):
-                value = parser.parse(value)
+                value = self._parse_datetime(value)
             elif isinstance(value, datetime.date):
                 value = datetime.datetime.combine(value, datetime.datetime.min.time())
         except ValueError:
@@ -147,6 +167,21 @@ class Issue():
             value = None
         return self._get_value({attribute: value}, attribute)
 
+    @staticmethod
+    def _parse_datetime(value: str) -> datetime.datetime:
+        """
+        Parse a date-time string
+
+        Validities are mostly ISO formatted, only fall back to the generic parser for any other format
+
+        :param value:
+        :return:
+        """
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return parser.parse(value)
+
     def _get_value(self, entity: dict, attribute: str):
         """
         Gets the value of an entity attribute
@@ -214,11 +249,11 @@ class Issue():
             "compared_to": self.compared_to,
             "compared_to_value": self.compared_to_value
         }
-        return to_json(json_obj)
+        return orjson.dumps(json_obj, default=self._json_default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode()
 
     @classmethod
     def from_json(cls, json_entity):
-        entity = json.loads(json_entity)
+        entity = orjson.loads(json_entity)
         return cls(**entity)
 
     def log_args(self, **kwargs) -> dict:
@@ -299,6 +334,26 @@ def process_issues(msg: Message):
         logger.clear_issues()
 
 
+def _get_issue_contents(quality_update: QualityUpdate, json_issues: list[dict]) -> list[dict]:
+    return [quality_update.get_contents(Issue(**json_issue)) for json_issue in json_issues]
+
+
+def _convert_issues(issues: Iterable[dict], quality_update: QualityUpdate) -> Iterator[list[dict]]:
+    """
+    Converts issues to quality contents in chunks of _ISSUE_CHUNK_SIZE issues
+
+    The chunks are converted in this process, pickling the issues and contents to
+    a pool of processes costs more than the conversion itself.
+
+    :param issues:
+    :param quality_update:
+    :return: the quality contents per chunk of issues
+    """
+    issues = iter(issues)
+    for chunk in iter(lambda: list(islice(issues, _ISSUE_CHUNK_SIZE)), []):
+        yield _get_issue_contents(quality_update, chunk)
+
+
 def _start_issue_workflow(header: Header, issues: Iterator[dict], quality_update: QualityUpdate):
     catalogue = header.get('catalogue')
     collection = header.get('collection')
@@ -306,10 +361,10 @@ def _start_issue_workflow(header: Header, issues: Iterator[dict], quality_update
     with ContentsWriter() as writer, \
             ProgressTicker(f"Process issues {catalogue} {collection}", 10000) as progress:
 
-        for json_issue in issues:
-            progress.tick()
-            issue = Issue(**json_issue)
-            writer.write(quality_update.get_contents(issue))
+        for contents in _convert_issues(issues, quality_update):
+            progress.ticks(len(contents))
+            for content in contents:
+                writer.write(content)
 
     # Start workflow
     # allow retries when an identical workflow is already running for max_retry_time seconds
@@ -0,0 +1,226 @@
+"""State consistency checks
+
+The history of an entity in a collection with states is registered as a sequence of states.
+Each state is identified by the entity id and its sequence number (volgnummer) and is valid
+from its begin_geldigheid up to its eind_geldigheid.
+
+The states of an entity should form one unbroken timeline in the order of their sequence numbers:
+- sequence numbers are unique and increasing
+- a state starts where the previous state ends (no gaps)
+- a state does not start before the previous state has ended (no overlaps)
+
+The checks walk over the entities sorted by id and sequence number in a single pass.
+Unsorted entities are sorted first; entities that do not fit in memory are sorted on disk.
+"""
+import datetime
+import heapq
+import pickle
+import tempfile
+from contextlib import ExitStack
+from itertools import groupby, islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from dateutil import parser
+
+from gobcore.model import FIELD
+from gobcore.quality.config import QA_CHECK
+from gobcore.quality.issue import Issue
+
+_SORT_CHUNK_SIZE = 100_000   # Max number of entities to sort in memory
+_PREVIOUS = "previous {}"    # Name of an attribute of the previous state
+
+
+class _State(NamedTuple):
+    entity: dict
+    seqnr: tuple
+    start: Optional[datetime.datetime]
+    end: Optional[datetime.datetime]
+    valid: bool
+
+
+def _seqnr_key(value) -> tuple:
+    """
+    Returns a sort key for a sequence number
+
+    Sequence numbers are compared numerically, non numeric values sort after all numeric values
+
+    :param value:
+    :return:
+    """
+    try:
+        return 0, int(value), ""
+    except (TypeError, ValueError):
+        return 1, 0, str(value)
+
+
+def _get_id(entity: dict, id_attribute: str) -> str:
+    """
+    Returns the id of an entity as it is sorted and grouped, ids are compared as strings
+
+    :param entity:
+    :param id_attribute:
+    :return:
+    """
+    return str(entity.get(id_attribute))
+
+
+def _to_datetime(value) -> Optional[datetime.datetime]:
+    """
+    Converts a validity value to a naive datetime
+
+    Aware datetimes are converted to UTC, so aware and naive datetimes can be compared.
+    Naive datetimes are compared as UTC datetimes.
+
+    :param value: a date, datetime, string or None
+    :return: the value as a naive datetime, None for empty values
+    :raises ValueError: if the value can not be interpreted as a datetime
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        result = value
+    elif isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.datetime.min.time())
+    else:
+        result = _parse_datetime(value)
+    if result.tzinfo is not None:
+        result = result.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return result
+
+
+def _parse_datetime(value: str) -> datetime.datetime:
+    """
+    Parses a datetime string, ISO format is tried first as it is by far the fastest
+
+    :param value:
+    :return:
+    """
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return parser.parse(value)
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime.date) else value
+
+
+def _read_run(file) -> Iterator[dict]:
+    file.seek(0)
+    while True:
+        try:
+            yield pickle.load(file)
+        except EOFError:
+            return
+
+
+def sort_states(entities: Iterable[dict], id_attribute: str = None,
+                chunk_size: int = _SORT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Sorts entities on id and sequence number
+
+    Entities are sorted in memory in chunks of chunk_size entities.
+    If there is more than one chunk, each sorted chunk is spilled to a temporary file
+    and the sorted chunks are merged.
+
+    :param entities: the entities to sort
+    :param id_attribute: the name of the entity id attribute, default 'identificatie'
+    :param chunk_size: the maximum number of entities to keep in memory
+    :return: the entities, sorted on id and sequence number
+    """
+    id_attribute = id_attribute or Issue._DEFAULT_ENTITY_ID
+
+    def key(entity):
+        return _get_id(entity, id_attribute), _seqnr_key(entity.get(FIELD.SEQNR))
+
+    entities = iter(entities)
+    chunk = sorted(islice(entities, chunk_size), key=key)
+    next_chunk = sorted(islice(entities, chunk_size), key=key)
+    if not next_chunk:
+        # Everything fits in memory
+        yield from chunk
+        return
+
+    with ExitStack() as stack:
+        runs = []
+        while chunk:
+            run = stack.enter_context(tempfile.TemporaryFile())
+            for entity in chunk:
+                pickle.dump(entity, run, protocol=pickle.HIGHEST_PROTOCOL)
+            runs.append(run)
+            chunk, next_chunk = next_chunk, sorted(islice(entities, chunk_size), key=key)
+
+        yield from heapq.merge(*[_read_run(run) for run in runs], key=key)
+
+
+def check_states(entities: Iterable[dict], id_attribute: str = None, presorted: bool = False,
+                 chunk_size: int = _SORT_CHUNK_SIZE) -> Iterator[Issue]:
+    """
+    Checks the states of all entities for overlaps, gaps and sequence number order
+
+    :param entities: the entities to check
+    :param id_attribute: the name of the entity id attribute, default 'identificatie'
+    :param presorted: True if the entities are already sorted on id and sequence number
+    :param chunk_size: the maximum number of entities to sort in memory
+    :return: an Issue for every inconsistency that is found
+    """
+    id_attribute = id_attribute or Issue._DEFAULT_ENTITY_ID
+    if not presorted:
+        entities = sort_states(entities, id_attribute, chunk_size)
+
+    for _, states in groupby(entities, key=lambda entity: _get_id(entity, id_attribute)):
+        previous = None
+        for entity in states:
+            state = _get_state(entity)
+            if previous is not None:
+                yield from _compare_states(previous, state, id_attribute)
+            previous = state
+
+
+def _get_state(entity: dict) -> _State:
+    seqnr = _seqnr_key(entity.get(FIELD.SEQNR))
+    try:
+        start = _to_datetime(entity.get(FIELD.START_VALIDITY))
+        end = _to_datetime(entity.get(FIELD.END_VALIDITY))
+    except (TypeError, ValueError, OverflowError):
+        # Erroneous validity, skip validity checks for this state
+        return _State(entity, seqnr, None, None, False)
+    return _State(entity, seqnr, start, end, True)
+
+
+def _compare_states(previous: _State, state: _State, id_attribute: str) -> Iterator[Issue]:
+    """
+    Compares a state with its previous state
+
+    :param previous: the previous state of the entity
+    :param state: the state to check
+    :param id_attribute: the name of the entity id attribute
+    :return: an Issue for every inconsistency between both states
+    """
+    def issue(check, attribute, previous_attribute):
+        return Issue(check, state.entity, id_attribute, attribute,
+                     _PREVIOUS.format(previous_attribute), _iso(previous.entity.get(previous_attribute)))
+
+    if state.seqnr <= previous.seqnr:
+        yield issue(QA_CHECK.Value_state_order, FIELD.SEQNR, FIELD.SEQNR)
+
+    if previous.valid and state.valid and state.start is not None:
+        yield from _compare_validity(previous, state, issue)
+
+
+def _compare_validity(previous: _State, state: _State, issue) -> Iterator[Issue]:
+    """
+    Compares the validity of a state with the validity of its previous state
+
+    :param previous: the previous state of the entity, with a valid validity
+    :param state: the state to check, with a valid validity and a start
+    :param issue: returns the Issue for a check, the checked attribute and the compared attribute of previous
+    :return: an Issue for every inconsistency between both validities
+    """
+    if previous.start is not None and state.start < previous.start:
+        yield issue(QA_CHECK.Value_state_order, FIELD.START_VALIDITY, FIELD.START_VALIDITY)
+
+    if previous.end is None or state.start < previous.end:
+        yield issue(QA_CHECK.Value_state_overlap, FIELD.START_VALIDITY, FIELD.END_VALIDITY)
+    elif state.start > previous.end:
+        yield issue(QA_CHECK.Value_state_gap, FIELD.START_VALIDITY, FIELD.END_VALIDITY)
@@ -1,20 +1,49 @@
 """GOB cryptograhic functions
 
+Encrypted values are stored in an envelope with the key index, the confidence level and the encrypted value.
+There are two envelopes:
+
+    JSON:    {"i":<key index>,"l":<confidence level>,"v":"<encrypted value>"}
+    compact: $gob1$<confidence level>$<key index>$<encrypted value>
+
+Both envelopes are recognised and decrypted. Encrypted values are written in the JSON envelope,
+unless the SECURE_COMPACT_ENVELOPE environment variable is set.
+Encrypted values in different envelopes are equal when their compact envelopes are equal, see compact_envelope.
+
+Rollout of the compact envelope:
+    1. Deploy this version of gobcore to every service that reads encrypted values
+    2. Set SECURE_COMPACT_ENVELOPE for the services that write encrypted values
+    3. Optionally rewrite stored values with compact_envelopes
 """
+import os
 import random
+import re
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import Iterable, Iterator
+
+from orjson import orjson
 
+from gobcore.exceptions import GOBException
 from gobcore.secure.cryptos.config import DecryptionError
 from gobcore.secure.cryptos.fernet import FernetCrypto
 from gobcore.secure.cryptos.aes import AESCrypto
+from gobcore.utils import get_worker_count, process_pool
 
 
-_safe_storage = {}
-
 _KEY_INDEX = "i"
 _LEVEL = "l"
 _VALUE = "v"
 
+_ENVELOPE_PREFIX = "$gob1$"
+_ENVELOPE = _ENVELOPE_PREFIX + "{level}${key_index}${value}"
+_ENVELOPE_REGEX = re.compile(re.escape(_ENVELOPE_PREFIX) + r"(\d+)\$(\d+)\$([\w=-]*)", re.ASCII)
+
+# Write encrypted values in the compact envelope, only when all readers recognise it
+_COMPACT_ENVELOPE = bool(os.getenv("SECURE_COMPACT_ENVELOPE"))
+
 # Special value to denote a None value
 _NONE = "___NONE___"
 
@@ -24,17 +53,44 @@ _LEVELS = {
     5: FernetCrypto
 }
 
+# Levels of which the encryption is deterministic, equal values have equal encrypted values
+_DETERMINISTIC_LEVELS = {4}
 
-def is_encrypted(value):
-    """
-    Tells if a value is an encrypted value
+_ENCRYPTION_CACHE_SIZE = 100_000                      # Maximum number of deterministic encryptions that are remembered
+_CRYPTO_CHUNK_SIZE = 10_000                           # Number of values that are encrypted or decrypted per task
+_CRYPTO_WORKERS = get_worker_count("CRYPTO_WORKERS")  # Maximum number of processes that encrypt or decrypt values
+_MAX_PROTECTED = 1_000_000                            # Maximum number of protected values per thread
 
-    :param value: any value
-    :return: True when the value is an encrypted value
+
+class _SafeStorage(threading.local):
     """
+    Protected values of the current thread, by key, in the order in which they have been protected
+    """
+
+    def __init__(self):
+        self.values = OrderedDict()
+        self.peak = 0        # Maximum number of protected values
+        self.discarded = 0   # Number of values that have been cleared before they were unprotected
+
+
+_safe_storage = _SafeStorage()
+
+
+def _loads(value: str):
     try:
-        value = json.loads(str(value))
-    except (json.JSONDecodeError, TypeError):
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # Accept anything that json accepts, eg NaN
+        return json.loads(value)
+
+
+def _is_json_envelope(value: str) -> bool:
+    if not value.lstrip().startswith("{"):
+        # Not a JSON object, skip parsing
+        return False
+    try:
+        value = _loads(value)
+    except json.JSONDecodeError:
         return False
     keys = [_KEY_INDEX, _LEVEL, _VALUE]
     return isinstance(value, dict) and \
@@ -42,6 +98,34 @@ def is_encrypted(value):
         len(value.keys()) == len(keys)
 
 
+def _open_envelope(encrypted_value) -> tuple:
+    """
+    Returns the key index, confidence level and encrypted value of an encrypted value
+
+    :param encrypted_value: a value in the compact or JSON envelope
+    :return:
+    """
+    encrypted_value = str(encrypted_value)
+    if match := _ENVELOPE_REGEX.fullmatch(encrypted_value):
+        level, key_index, value = match.groups()
+        return int(key_index), int(level), value
+    envelope = _loads(encrypted_value)
+    return envelope[_KEY_INDEX], envelope[_LEVEL], envelope[_VALUE]
+
+
+def is_encrypted(value):
+    """
+    Tells if a value is an encrypted value
+
+    :param value: any value
+    :return: True when the value is an encrypted value
+    """
+    value = value if isinstance(value, str) else str(value)
+    if value.startswith(_ENVELOPE_PREFIX):
+        return _ENVELOPE_REGEX.fullmatch(value) is not None
+    return _is_json_envelope(value)
+
+
 def confidence_level(encrypted_value):
     """
     Tells the confidence level of an encrypted value
@@ -49,8 +133,9 @@ def confidence_level(encrypted_value):
     :param encrypted_value: any encrypted value
     :return: the required confidence level to have access to the value
     """
-    encrypted_value = json.loads(encrypted_value)
-    return encrypted_value[_LEVEL]
+    if match := _ENVELOPE_REGEX.fullmatch(str(encrypted_value)):
+        return int(match[1])
+    return _loads(encrypted_value)[_LEVEL]
 
 
 def encrypt(value, level):
@@ -63,13 +148,26 @@ def encrypt(value, level):
     """
     if value is None:
         value = _NONE
-    crypto = _LEVELS[level]
-    key_index, encrypted_value = crypto().encrypt(value, level)
-    return json.dumps({
-        _KEY_INDEX: key_index,                # Allows for key rotation
-        _LEVEL: level,  # Some data is more confident that other data
-        _VALUE: encrypted_value               # The encrypted data
-    }, separators=(',', ':'))
+    if level in _DETERMINISTIC_LEVELS:
+        return _encrypt_deterministic(value, level)
+    return _encrypt(value, level)
+
+
+def _encrypt(value, level):
+    key_index, encrypted_value = _LEVELS[level]().encrypt(value, level)
+    if _COMPACT_ENVELOPE:
+        return _ENVELOPE.format(level=level, key_index=key_index, value=encrypted_value)
+    return orjson.dumps({
+        _KEY_INDEX: key_index,      # Allows for key rotation
+        _LEVEL: level,              # Some data is more confident that other data
+        _VALUE: encrypted_value     # The encrypted data
+    }).decode()
+
+
+@lru_cache(maxsize=_ENCRYPTION_CACHE_SIZE)
+def _encrypt_deterministic(value, level):
+    # Repeated values, like codes and dates, are encrypted only once
+    return _encrypt(value, level)
 
 
 def decrypt(encrypted_value):
@@ -79,28 +177,119 @@ def decrypt(encrypted_value):
     :param encrypted_value:
     :return:
     """
-    encrypted_value = json.loads(str(encrypted_value))
-    crypto = _LEVELS[encrypted_value[_LEVEL]]
+    key_index, level, encrypted_value = _open_envelope(encrypted_value)
+    crypto = _LEVELS[level]
     try:
-        value = crypto().decrypt(encrypted_value[_VALUE],
-                                 encrypted_value[_LEVEL],
-                                 encrypted_value[_KEY_INDEX])
+        value = crypto().decrypt(encrypted_value, level, key_index)
         return None if value == _NONE else value
     except DecryptionError:
         print("ERROR: decryption failed")
         return None
 
 
+def _encrypt_chunk(level, values: list) -> list:
+    return [encrypt(value, level) for value in values]
+
+
+def _decrypt_chunk(encrypted_values: list) -> list:
+    return [decrypt(encrypted_value) for encrypted_value in encrypted_values]
+
+
+def _map_chunks(func, values: list) -> list:
+    """
+    Applies func to values in chunks of _CRYPTO_CHUNK_SIZE values
+
+    If there is more than one chunk and more than one CPU the chunks are processed in parallel by a pool of processes.
+
+    :param func: a function that processes a chunk of values
+    :param values:
+    :return: the concatenated results of all chunks, in the order of the values
+    """
+    chunks = [values[i:i + _CRYPTO_CHUNK_SIZE] for i in range(0, len(values), _CRYPTO_CHUNK_SIZE)]
+    if len(chunks) < 2 or _CRYPTO_WORKERS < 2:
+        return func(values)
+
+    with process_pool(min(_CRYPTO_WORKERS, len(chunks))) as executor:
+        return [result for chunk_results in executor.map(func, chunks) for result in chunk_results]
+
+
+def encrypt_values(values: Iterable, level) -> list[str]:
+    """
+    Encrypt a list of values with the encryption for the given confidence level
+
+    Deterministic encryptions are remembered, other encryptions are done in parallel for large lists.
+
+    :param values:
+    :param level:
+    :return: the encrypted values
+    """
+    if level in _DETERMINISTIC_LEVELS:
+        return _encrypt_chunk(level, values)
+    return _map_chunks(partial(_encrypt_chunk, level), list(values))
+
+
+def decrypt_values(encrypted_values: Iterable) -> list:
+    """
+    Decrypt a list of encrypted values, in parallel for large lists
+
+    :param encrypted_values:
+    :return: the decrypted values
+    """
+    return _map_chunks(_decrypt_chunk, list(encrypted_values))
+
+
+def compact_envelope(value):
+    """
+    Rewrites an encrypted value in the JSON envelope into the compact envelope
+
+    The encrypted value itself is left untouched, no keys are required.
+    Any other value, including a value that is already in the compact envelope, is returned as-is.
+
+    :param value: any value
+    :return: the value in the compact envelope
+    """
+    if isinstance(value, str) and not value.startswith(_ENVELOPE_PREFIX) and _is_json_envelope(value):
+        key_index, level, encrypted_value = _open_envelope(value)
+        value = _ENVELOPE.format(level=level, key_index=key_index, value=encrypted_value)
+    return value
+
+
+def compact_envelopes(values: Iterable) -> Iterator:
+    """
+    Rewrites encrypted values in the JSON envelope into the compact envelope, see compact_envelope
+
+    Use to migrate stored values, eg:
+
+        for id, value in zip(ids, compact_envelopes(values)):
+            ...
+
+    :param values: an iterable of (encrypted) values
+    :return: a generator of the values in the compact envelope
+    """
+    for value in values:
+        yield compact_envelope(value)
+
+
 def read_protect(value):
     """
     Protect sensitive data by storing it locally or encrypt its value
 
+    The value is stored for the current thread until it is unprotected or the protected values are cleared.
+    At most _MAX_PROTECTED values can be protected at once, a protected value is never discarded silently.
+
     :param value: any sensitive data
-    :param save_local: store it locally if true, else encrypt
     :return: the key to the sensitive data or the encrypted value
     """
+    values = _safe_storage.values
     key = random.random()
-    _safe_storage[key] = value
+    while key in values:
+        key = random.random()
+
+    if len(values) >= _MAX_PROTECTED:
+        raise GOBException(f"More than {_MAX_PROTECTED} protected values, unprotect or clear protected values first")
+
+    values[key] = value
+    _safe_storage.peak = max(_safe_storage.peak, len(values))
     return key
 
 
@@ -108,17 +297,56 @@ def read_unprotect(value):
     """
     Unprotect a previously read protected data
 
+    The value can only be unprotected in the thread in which it has been protected.
+
     :param value: the key to the sensitive data or the encrypted value
     :return: the unprotected value
     """
-    if value in _safe_storage:
-        saved_value = _safe_storage[value]
-        del _safe_storage[value]
-        return saved_value
+    try:
+        return _safe_storage.values.pop(value)
+    except KeyError as exc:
+        raise GOBException("Protected value not found, it has been cleared or protected in another thread") from exc
+
+
+def read_protected(value):
+    """
+    Read previously protected data, the data remains protected
+
+    :param value: the key to the sensitive data
+    :return: the protected value
+    """
+    return _safe_storage.values.get(value)
 
 
 def is_protected(value):
     """
     :param value: the key to the sensitive data or the encrypted value
     """
-    return value in _safe_storage
+    return value in _safe_storage.values
+
+
+def clear_protected():
+    """
+    Discards all protected values of the current thread
+
+    Protected values that have not been unprotected when a message has been handled are no longer needed.
+    The cached encryptions of the message are discarded as well, plain values are not kept between messages.
+
+    :return: None
+    """
+    _safe_storage.discarded += len(_safe_storage.values)
+    _safe_storage.values = OrderedDict()
+    _encrypt_deterministic.cache_clear()
+
+
+def get_protected_metrics() -> dict:
+    """
+    Returns the metrics of the protected values of the current thread
+
+    :return: the current and peak number of protected values and the number of discarded values
+    """
+    return {
+        "size": len(_safe_storage.values),
+        "peak": _safe_storage.peak,
+        "discarded": _safe_storage.discarded
+    }
@@ -30,6 +30,7 @@ class GOBSources:
         self.model = model
 
         self._relations: defaultdict[str, defaultdict[str, RelationListType]] = defaultdict(lambda: defaultdict(list))
+        self._field_relations: defaultdict[tuple[str, str, str], RelationListType] = defaultdict(list)
 
         # Extract references for easy access.
         for source_name, source in data.items():
@@ -49,8 +50,9 @@ class GOBSources:
                             "type": spec["type"],
                             **field_relation,
                         }
-                        # Store the relation for the catalog - collection
+                        # Store the relation for the catalog - collection and for the field
                         self._relations[catalog_name][collection_name].append(relation)
+                        self._field_relations[catalog_name, collection_name, field_name].append(relation)
 
     def _get_field_relation(
         self,
@@ -79,11 +81,7 @@ class GOBSources:
         :param field_name:
         :return:
         """
-        try:
-            relations = self.get_relations(catalog_name, collection_name)
-            return [relation for relation in relations if relation["field_name"] == field_name]
-        except KeyError:
-            return []
+        return list(self._field_relations.get((catalog_name, collection_name, field_name), []))
 
     def get_relations(self, catalog_name: CatalogName, collection_name: CollectionName) -> RelationListType:
         """Return all the relations for the given catalog - collection."""
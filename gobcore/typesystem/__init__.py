@@ -6,6 +6,8 @@ The definition and characteristics of each type is in the gob_types module
 """
 
 
+import copy
+import datetime
 from typing import Any, Optional, TypedDict
 
 import geoalchemy2
@@ -58,6 +60,12 @@ _gob_geotypes = {f'GOB.Geo.{gob_type.name}': gob_type for gob_type in GEO_TYPES}
 _gob_types_dict = {**_gob_types, **_gob_securetypes, **_gob_geotypes}
 
 
+# Interned field specs by their frozen type info, see get_field_spec()
+_field_specs: dict[Any, gob_types.FieldSpec] = {}
+
+# Raw (DB) value types for which equal values of the same type always convert to equal GOBType values
+_RAW_EQUALITY_TYPES = (str, int, bool, datetime.date)
+
 # Convert GOB_TYPES to a dictionary indexed by the name of the type, prefixed by GOB.
 _gob_sql_types_list = [{'gob_type': gob_type, 'sql_type': gob_type.sql_type} for gob_type in GOB_TYPES + GEO_TYPES]
 
@@ -87,6 +95,9 @@ def enhance_type_info(type_info: dict[str, Any]) -> None:
     :param type_info:
     :return:
     """
+    if isinstance(type_info, gob_types.ReadOnlyDict):
+        # Field specs, including their nested type info, are enhanced on creation
+        return
     if type_info.get("type") and not isinstance(type_info["type"], dict):
         type_info["gob_type"] = get_gob_type(type_info["type"])
     for value in type_info.values():
@@ -95,6 +106,66 @@ def enhance_type_info(type_info: dict[str, Any]) -> None:
             enhance_type_info(value)
 
 
+def _freeze(value):
+    """Return a hashable representation of a (nested) type info value.
+
+    :param value:
+    :return:
+    """
+    if isinstance(value, dict):
+        return dict, tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return list, tuple(_freeze(item) for item in value)
+    # Include the type, eg 1 and True are equal but do not result in equal type info
+    return type(value), value
+
+
+def get_field_spec(type_info: dict[str, Any]) -> dict[str, Any]:
+    """Return the shared, read-only FieldSpec for the given GOBModel field type info.
+
+    The field spec is enhanced with the GOBType class, see enhance_type_info().
+    Type info that can not be frozen or enhanced is returned as is.
+
+    Example:
+        get_field_spec({"type": "GOB.String"}) is get_field_spec({"type": "GOB.String"}) => True
+
+    :param type_info:
+    :return:
+    """
+    if isinstance(type_info, gob_types.FieldSpec):
+        return type_info
+
+    try:
+        key = _freeze(type_info)
+        return _field_specs[key]
+    except TypeError:
+        # Unhashable type info
+        return type_info
+    except KeyError:
+        pass
+
+    if (field_spec := _create_field_spec(type_info)) is None:
+        return type_info
+
+    _field_specs[key] = field_spec
+    return field_spec
+
+
+def _create_field_spec(type_info: dict[str, Any]) -> Optional[gob_types.FieldSpec]:
+    """Return a FieldSpec for an enhanced copy of the given type info, None if it contains an unknown GOB type.
+
+    :param type_info:
+    :return:
+    """
+    enhanced = copy.deepcopy(type_info)
+    try:
+        enhance_type_info(enhanced)
+    except KeyError:
+        # Unknown GOB type, fails on first use as before
+        return None
+    return gob_types.FieldSpec(enhanced)
+
+
 def get_gob_type_from_info(type_info):
     """Return the GOBType class for the given GOBModel type info.
 
@@ -107,6 +178,23 @@ def get_gob_type_from_info(type_info):
     return type_info["gob_type"]
 
 
+def get_db_converter(type_info):
+    """Return a function that converts a value to its DB representation for the given GOBModel type info.
+
+    The GOBType class and its kwargs are resolved once, when the converter is created.
+    The converter is the converter of GOBType.from_values_batch, it converts without a GOBType instance if it can.
+
+    Example:
+        get_db_converter({"type": "GOB.Integer"})("1") => 1
+
+    :param type_info:
+    :return: a function that returns GOBType.from_value(value, **kwargs).to_db
+    """
+    gob_type = get_gob_type_from_info(type_info)
+    kwargs = gob_types.get_kwargs_from_type_info(type_info)
+    return gob_type._batch_converter("to_db", **kwargs)
+
+
 def get_gob_type(name):
     """Return GOBType class for a given GOBModel type name.
 
@@ -200,16 +288,17 @@ def get_modifications(
     for field_name, field_info in model.items():
         gob_type = get_gob_type_from_info(field_info)
         field_kwargs = gob_types.get_kwargs_from_type_info(field_info)
-        old_value = gob_type.from_value(getattr(entity, field_name), **field_kwargs)
+        old_value = LazyGOBType(gob_type, getattr(entity, field_name), **field_kwargs)
 
         # Try to get the new value from the data, if missing, skip this field
         try:
-            new_value = gob_type.from_value(data[field_name], **field_kwargs)
+            new_value = LazyGOBType(gob_type, data[field_name], **field_kwargs)
         except KeyError:
             continue
 
+        # Unchanged raw values are not converted
         if old_value != new_value:
-            modifications.append({'key': field_name, 'old_value': old_value, 'new_value': new_value})
+            modifications.append({'key': field_name, 'old_value': old_value.value, 'new_value': new_value.value})
 
     return modifications
 
@@ -222,3 +311,79 @@ def get_value(entity):
     :return: a dictionary of key, values
     """
     return {key: value.to_value for key, value in entity.items()}
+
+
+def _raw_equal(value, other) -> bool:
+    """Tell if two raw values are known to convert to equal GOBType values without converting them.
+
+    False means unknown, the values might still convert to equal GOBType values (eg 1 and "1").
+
+    :param value:
+    :param other:
+    :return:
+    """
+    if value is other:
+        return True
+    if type(value) is not type(other):
+        return False
+    if isinstance(value, geoalchemy2.elements.WKBElement):
+        return value.srid == other.srid and bytes(value.data) == bytes(other.data)
+    if isinstance(value, datetime.datetime) and (value.tzinfo or other.tzinfo):
+        # Equal aware datetimes in different timezones have different string representations
+        return False
+    return isinstance(value, _RAW_EQUALITY_TYPES) and value == other
+
+
+class LazyGOBType(gob_types.LazyValue):
+    """A raw (DB) value that is converted to a GOBType on first access.
+
+    Used by get_modifications to compare stored rows with new data, eg:
+
+        value = LazyGOBType(GEO.Geometry, row.geometrie)
+        value == other_value  # True without any conversion if both raw values are equal
+        value.json            # Converts row.geometrie once to a Geometry and returns its json
+    """
+
+    __slots__ = ('gob_type', 'raw', '_kwargs', '_value')
+
+    def __init__(self, gob_type: type[gob_types.GOBType], raw: Any, **kwargs):
+        self.gob_type = gob_type
+        self.raw = raw
+        self._kwargs = kwargs
+        self._value = None
+
+    @property
+    def value(self) -> gob_types.GOBType:
+        """Return the GOBType value, converted from the raw value on first access."""
+        if self._value is None:
+            self._value = self.gob_type.from_value(self.raw, **self._kwargs)
+        return self._value
+
+    @property
+    def to_db(self):
+        return self.value.to_db
+
+    @property
+    def to_value(self):
+        return self.value.to_value
+
+    @property
+    def json(self):
+        return self.value.json
+
+    def __str__(self):
+        return str(self.value)
+
+    def __eq__(self, other):
+        """Compare the raw values if that is conclusive, else compare the GOBType values.
+
+        :param other: a LazyGOBType, GOBType or any value to compare the GOBType value with
+        :return: True or False
+        """
+        if isinstance(other, LazyGOBType):
+            if other.gob_type is self.gob_type and other._kwargs == self._kwargs and _raw_equal(self.raw, other.raw):
+                return True
+            other = other.value
+        return self.value == other
+
+    __hash__ = None
@@ -0,0 +1,141 @@
+"""Canonical entity hashes
+
+The hash of an entity (FIELD.HASH) is computed over the values of the public fields of its collection.
+
+Each value is converted to its GOB type and encoded by its canonical string.
+The fields are encoded in the order of their names, each by its name and its length prefixed canonical value,
+so the encoding does not depend on the order of the fields in the entity or on the type of the raw values.
+Secure values are encoded by the deterministic encryption (HASH_LEVEL) of their canonical value,
+so the hash of a secure value depends on the secure key and its plain value cannot be found by hashing candidates.
+Values that are already encrypted at HASH_LEVEL are encoded without decrypting them.
+
+The encoding is hashed with BLAKE2b. The hash is personalised with HASH_VERSION,
+change HASH_VERSION whenever the encoding changes.
+"""
+import hashlib
+from typing import Any, Iterable, Optional
+
+from gobcore.model import GOBModel
+from gobcore.secure.crypto import is_encrypted, decrypt, encrypt, is_protected, read_protected, confidence_level, \
+    compact_envelope
+from gobcore.typesystem import get_gob_type_from_info
+from gobcore.typesystem.gob_types import get_kwargs_from_type_info, GOBType, String
+
+HASH_VERSION = b"gob.hash.2"  # Personalisation of the hash, at most 16 bytes
+DIGEST_SIZE = 16              # Size of the hash in bytes, the hash is a string of twice as many hex digits
+HASH_LEVEL = 4                # Confidence level of the deterministic encryption of secure values
+
+_NONE = b"\xff\xff\xff\xff"   # Encoding of a None value, no length prefix of an encoded string
+
+# Types of which equal values always have equal encodings (unlike eg Decimal("1.0") and Decimal("1.00"))
+_MEMO_TYPES = (str, int, bool, type(None))
+
+
+def _encode(value: Optional[str]) -> bytes:
+    if value is None:
+        return _NONE
+    encoded = value.encode()
+    return len(encoded).to_bytes(4, "big") + encoded
+
+
+def _digest(parts: Iterable[bytes]) -> str:
+    return hashlib.blake2b(b"".join(parts), digest_size=DIGEST_SIZE, person=HASH_VERSION).hexdigest()
+
+
+class _Field:
+
+    def __init__(self, name: str, type_info: dict):
+        self.name = name
+        self.prefix = _encode(name)
+        self.gob_type: type[GOBType] = get_gob_type_from_info(type_info)
+        self.kwargs = get_kwargs_from_type_info(type_info)
+
+        if self.gob_type.is_secure:
+            self.gob_type = self.gob_type.BaseType
+            self.kwargs.pop("level", None)
+            self.encode = self._encode_secure
+
+        if self.gob_type is String:
+            # The canonical string of a String is its DB value, convert it without creating GOBType instances
+            self.canonical = String._batch_converter("to_db")
+        else:
+            self.canonical = self._canonical
+
+    def _canonical(self, value) -> Optional[str]:
+        return self.gob_type.from_value(value, **self.kwargs).canonical
+
+    def _encrypted(self, value) -> str:
+        if isinstance(value, str) and is_encrypted(value):
+            if confidence_level(value) == HASH_LEVEL:
+                # The encrypted value is the encryption of the canonical value, independent of its envelope
+                return compact_envelope(value)
+            # Other encryptions are not deterministic
+            value = decrypt(value)
+        elif isinstance(value, float) and is_protected(value):
+            # Protected values are keys of the type float, protected values remain protected
+            value = read_protected(value)
+        return compact_envelope(encrypt(self.canonical(value), HASH_LEVEL))
+
+    def encode(self, value) -> bytes:
+        """Return the name and canonical value of the field."""
+        return self.prefix + _encode(self.canonical(value))
+
+    def _encode_secure(self, value) -> bytes:
+        """Return the name and encrypted canonical value of a secure field."""
+        return self.prefix + _encode(self._encrypted(value))
+
+    def encode_column(self, values: list) -> list[bytes]:
+        """Return the encoding of a column of values, equal str, int and None values are encoded once."""
+        encoded = {}
+        result = []
+        for value in values:
+            if value.__class__ not in _MEMO_TYPES:
+                result.append(self.encode(value))
+                continue
+            # Include the type in the key, 1 and True are equal but are not encoded equally
+            key = (value.__class__, value)
+            try:
+                result.append(encoded[key])
+            except KeyError:
+                result.append(encoded.setdefault(key, self.encode(value)))
+        return result
+
+
+class EntityHasher:
+
+    def __init__(self, fields: dict[str, dict]):
+        """Canonical hasher for the entities of a collection.
+
+        :param fields: the public fields of the collection (collection["fields"])
+        """
+        self._fields = [_Field(name, type_info) for name, type_info in sorted(fields.items())]
+
+    @classmethod
+    def for_collection(cls, catalog_name: str, collection_name: str) -> "EntityHasher":
+        """Return the hasher for the given catalog - collection in the GOBModel.
+
+        :param catalog_name:
+        :param collection_name:
+        :return:
+        """
+        return cls(GOBModel()[catalog_name]['collections'][collection_name]['fields'])
+
+    def hash(self, entity: dict[str, Any]) -> str:
+        """Return the hash of an entity, missing fields are hashed as None values.
+
+        :param entity:
+        :return: the hash as a string of hex digits
+        """
+        return _digest(field.encode(entity.get(field.name)) for field in self._fields)
+
+    def hash_batch(self, entities: Iterable[dict[str, Any]]) -> list[str]:
+        """Return the hashes of multiple entities.
+
+        The result is equal to hashing each entity on its own, equal values in a field are converted once.
+
+        :param entities:
+        :return: a list with the hash of each entity
+        """
+        entities = list(entities)
+        columns = [field.encode_column([entity.get(field.name) for entity in entities]) for field in self._fields]
+        return [_digest(parts) for parts in zip(*columns)] if columns else [_digest([]) for _ in entities]
@@ -1,12 +1,15 @@
 import os
 import json
+import re
 
 from abc import abstractmethod
 
 import sqlalchemy
 import geoalchemy2
+import shapely.wkt
 from geoalchemy2.shape import to_shape
 from geomet import wkt
+from shapely.geometry import mapping
 
 from gobcore.exceptions import GOBException
 from gobcore.typesystem.gob_types import GOBType, Decimal
@@ -16,6 +19,34 @@ from gobcore.typesystem.json import GobTypeJSONEncoder
 DEFAULT_SRID = int(os.getenv("DEFAULT_SRID", "28992"))
 DEFAULT_PRECISION = 3
 
+# 2D geometry types for which the shapely (GEOS) WKT and the geomet WKT only differ in their coordinates
+_PLAIN_WKT_TYPES = ("POINT (", "LINESTRING (", "POLYGON (", "MULTILINESTRING (", "MULTIPOLYGON (")
+_PLAIN_WKT_COORDINATES = re.compile(r"[0-9eE.,+\- ()]+")
+_WKT_NUMBER = re.compile(r"-?[0-9.]+(?:[eE][+-]?[0-9]+)?")
+
+
+def _is_plain_wkt(value: str) -> bool:
+    """Tell if value is a finite 2D WKT of one of the _PLAIN_WKT_TYPES, formatted as "TYPE (coordinates)"."""
+    return value.startswith(_PLAIN_WKT_TYPES) and _PLAIN_WKT_COORDINATES.fullmatch(value, value.index("(")) is not None
+
+
+def _format_coordinate(value: float, decimals: int) -> str:
+    """Return the coordinate rounded to decimals and padded with zeros, formatted like wkt.dumps."""
+    if decimals == 0:
+        return repr(int(round(value)))
+
+    rounded = round(value, decimals)
+    formatted = format(rounded, f'.{decimals}f') if 'e' in repr(rounded) else repr(rounded)
+    return formatted + '0' * (decimals - len(formatted.split('.')[1]))
+
+
+def _round_plain_wkt(value: str, precision: int) -> str:
+    """Return the plain WKT value with its coordinates rounded to precision decimals.
+
+    Equals wkt.dumps(wkt.loads(value), decimals=precision), without building the GeoJSON in between.
+    """
+    return _WKT_NUMBER.sub(lambda match: _format_coordinate(float(match[0]), precision), value)
+
 
 class GEOType(GOBType):
     """Abstract baseclass for the GOB Geo Types, use like follows:
@@ -72,6 +103,9 @@ class GEOType(GOBType):
     def json(self):
         if self._string is None or self._string == '':
             return json.dumps(None)
+        if _is_plain_wkt(self._string):
+            # GEOS parses the WKT much faster than geomet, the GeoJSON is the same
+            return json.dumps(mapping(shapely.wkt.loads(self._string)))
         return json.dumps(wkt.loads(self._string))
 
     @property
@@ -86,22 +120,25 @@ class GEOType(GOBType):
         if value is None:
             return cls(None)
 
+        precision = kwargs['precision'] if 'precision' in kwargs else cls._precision
+
         if isinstance(value, str):
             # WKT => GeoJSON, raises ValueError if fails
             geo_json_value = wkt.loads(value)
         elif isinstance(value, geoalchemy2.elements.WKBElement):
             # DB value => GeoJSON
             # Use shapely to construct wkt string
-            # use wkt.load to get correct precision
-            geo_json_value = wkt.loads(to_shape(value).wkt)
+            # round its coordinates or use wkt.load to get correct precision
+            shape_wkt = to_shape(value).wkt
+            if _is_plain_wkt(shape_wkt):
+                return cls(_round_plain_wkt(shape_wkt, precision))
+            geo_json_value = wkt.loads(shape_wkt)
         elif isinstance(value, dict):
             # GeoJSON, leave value as-is
             geo_json_value = value
         else:
             raise ValueError("WKT, DB value or GeoJSON expected")
 
-        precision = kwargs['precision'] if 'precision' in kwargs else cls._precision
-
         # Convert GeoJSON to WKT with given precision
         try:
             wkt_value = wkt.dumps(geo_json_value, decimals=precision)
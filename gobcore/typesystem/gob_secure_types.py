@@ -1,5 +1,5 @@
-from gobcore.typesystem.gob_types import String, Decimal, DateTime, Date, IncompleteDate
-from gobcore.secure.crypto import is_encrypted, encrypt, decrypt, read_unprotect, is_protected
+from gobcore.typesystem.gob_types import String, Decimal, DateTime, Date, IncompleteDate, LazyValue
+from gobcore.secure.crypto import is_encrypted, encrypt, decrypt, read_unprotect, is_protected, compact_envelope
 
 
 class Secure(String):
@@ -24,6 +24,19 @@ class Secure(String):
             value = encrypt(value, level=level)
         super().__init__(value)
 
+    def __eq__(self, other):
+        """Encrypted values are compared independent of their envelope
+
+        :param other: other GOB Type to compare with
+        :return: True or False
+        """
+        if isinstance(other, LazyValue):
+            other = other.value
+
+        if isinstance(other, Secure):
+            return compact_envelope(self._string) == compact_envelope(other._string)
+        return super().__eq__(other)
+
     @classmethod
     def from_value(cls, value, **kwargs):
         """
@@ -15,30 +15,238 @@ todo:
 """
 
 
+import copy
 import datetime
 import decimal
 import json
 import numbers
 import re
 from abc import ABCMeta, abstractmethod
+from functools import lru_cache
 from math import isnan
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Optional
 
 import sqlalchemy
+from orjson import orjson
 
 from gobcore.exceptions import GOBTypeException
 from gobcore.model.metadata import FIELD
 
 
+_NOT_PARSED = object()  # Marks a cached value that has not yet been computed
+
+
+# Fixed width regexes for strptime directives, other directives are left to strptime
+_DATETIME_DIRECTIVES = {
+    'Y': ('year', r'(\d{4})'),
+    'm': ('month', r'(\d{2})'),
+    'd': ('day', r'(\d{2})'),
+    'H': ('hour', r'(\d{2})'),
+    'M': ('minute', r'(\d{2})'),
+    'S': ('second', r'(\d{2})'),
+    'f': ('microsecond', r'(\d{1,6})'),
+}
+
+
+def _parse_iso_date(value: str) -> datetime.datetime:
+    if len(value) == 10 and value[4] == value[7] == '-' and value.replace('-', '').isdigit():
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, Date.internal_format)
+
+
+def _parse_iso_datetime(value: str) -> datetime.datetime:
+    if len(value) == 26 and value[10] == 'T' and value[19] == '.' \
+            and value[4] == value[7] == '-' and value[13] == value[16] == ':' \
+            and value[20:].isdigit():
+        try:
+            result = datetime.datetime.fromisoformat(value)
+            if result.tzinfo is None:
+                return result
+        except ValueError:
+            pass
+    return datetime.datetime.strptime(value, DateTime.internal_format)
+
+
+def _compile_datetime_format(fmt: str) -> Optional[tuple[re.Pattern, list[str]]]:
+    """Return a fixed width regex for fmt and the datetime field for each group, None if fmt can not be compiled."""
+    pattern, fields = "", []
+    for literal, directive in re.findall(r'([^%]*)(?:%(.)|$)', fmt):
+        pattern += re.escape(literal)
+        if not directive:
+            continue
+        if directive not in _DATETIME_DIRECTIVES:
+            return None
+        field, directive_pattern = _DATETIME_DIRECTIVES[directive]
+        pattern += directive_pattern
+        fields.append(field)
+    return re.compile(pattern, re.ASCII), fields
+
+
+@lru_cache(maxsize=None)
+def _get_datetime_parser(fmt: str):
+    """Return a function that parses a string to a datetime, with the result of datetime.strptime(value, fmt).
+
+    The internal Date and DateTime formats are parsed by datetime.fromisoformat.
+    Formats that consist of only %Y, %m, %d, %H, %M, %S and %f directives are compiled to a fixed width regex.
+    Any value that is not matched or not valid is left to strptime, which also produces any error message.
+
+    :param fmt: a strptime format
+    :return: a function that parses a string value
+    """
+    if fmt == Date.internal_format:
+        return _parse_iso_date
+    if fmt == DateTime.internal_format:
+        return _parse_iso_datetime
+
+    if (compiled := _compile_datetime_format(fmt)) is None:
+        return lambda value: datetime.datetime.strptime(value, fmt)
+    return _get_regex_datetime_parser(fmt, *compiled)
+
+
+def _get_regex_datetime_parser(fmt: str, regex: re.Pattern, fields: list[str]):
+    def parse(value: str) -> datetime.datetime:
+        if match := regex.fullmatch(value):
+            kwargs = {'year': 1900, 'month': 1, 'day': 1}  # strptime defaults
+            kwargs.update(zip(fields, match.groups()))
+            if 'microsecond' in kwargs:
+                kwargs['microsecond'] = kwargs['microsecond'].ljust(6, '0')
+            try:
+                return datetime.datetime(**{key: int(value) for key, value in kwargs.items()})
+            except ValueError:
+                pass
+        return datetime.datetime.strptime(value, fmt)
+
+    return parse
+
+
+# Keys in GOB Model field type info that are not passed as kwargs to the GOB type
+_NON_KWARGS = ["type", "gob_type", "description", "ref"]
+
+
 def get_kwargs_from_type_info(type_info: dict[str, Any]) -> dict[str, Any]:
     """Return kwargs dictionary from GOB Model field type info."""
+    if isinstance(type_info, FieldSpec):
+        return dict(type_info.kwargs)
+
     # Collect special keys like 'precision'.
     type_kwargs = {
-        key: value for key, value in type_info.items() if key not in ["type", "gob_type", "description", "ref"]
+        key: value for key, value in type_info.items() if key not in _NON_KWARGS
     }
     return type_kwargs
 
 
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{self.__class__.__name__} is read-only")
+
+
+def _frozen(value):
+    """Return a read-only copy of a (nested) dict or list value, other values are returned as is."""
+    if isinstance(value, ReadOnlyDict):
+        return value
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
+
+class ReadOnlyDict(dict):
+    """Read-only dict, nested dicts and lists are read-only as well.
+
+    A (deep) copy of a read-only dict is a regular dict.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values: dict[str, Any]):
+        super().__init__((key, _frozen(value)) for key, value in values.items())
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+
+class ReadOnlyList(list):
+    """Read-only list, nested dicts and lists are read-only as well.
+
+    A (deep) copy of a read-only list is a regular list.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values: list):
+        super().__init__(_frozen(value) for value in values)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self), memo)
+
+
+class FieldSpec(ReadOnlyDict):
+    """Read-only GOB Model field type info.
+
+    Field specs are shared by all fields with equal type info, see typesystem.get_field_spec().
+    The kwargs for the GOB type are collected once.
+    """
+
+    __slots__ = ('kwargs',)
+
+    def __init__(self, type_info: dict[str, Any]):
+        super().__init__(type_info)
+        self.kwargs = {key: value for key, value in self.items() if key not in _NON_KWARGS}
+
+
+def _convert_memoized(convert: Callable[[Any], Any], values: Iterable) -> list:
+    """Return the converted values, each distinct (hashable) value is converted only once."""
+    converted = {}
+    result = []
+    for value in values:
+        # Include the type in the key, 1, 1.0 and True are equal but are not converted equally
+        key = (value.__class__, value)
+        try:
+            result.append(converted[key])
+        except KeyError:
+            result.append(converted.setdefault(key, convert(value)))
+        except TypeError:
+            # Unhashable value
+            result.append(convert(value))
+    return result
+
+
+class LazyValue:
+    """Base class of values that are converted to a GOBType on first access, see typesystem.LazyGOBType.
+
+    GOBTypes compare with the converted value of a lazy value.
+    """
+
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def value(self):
+        """Return the GOBType value."""
+        pass  # pragma: no cover
+
+
 class GOBType(metaclass=ABCMeta):
     """Abstract Base Class for GOB Types.
 
@@ -66,6 +274,9 @@ class GOBType(metaclass=ABCMeta):
     name = "type"
     sql_type = sqlalchemy.Column
 
+    # Whether equal values in a batch may share their (immutable) conversion result, see from_values_batch
+    _batch_memoize = False
+
     @abstractmethod
     def __init__(self, value):
         """Initialisation of GOBType with a string value
@@ -91,6 +302,9 @@ class GOBType(metaclass=ABCMeta):
         :param other: other GOB Type to compare with
         :return: True or False
         """
+        if isinstance(other, LazyValue):
+            other = other.value
+
         # todo: same type?
         # When string is a NoneType, compare it as a string to other
         if self._string is None and isinstance(other, GOBType):
@@ -134,6 +348,39 @@ class GOBType(metaclass=ABCMeta):
         """
         pass  # pragma: no cover
 
+    @classmethod
+    def from_values_batch(cls, values: Iterable, output: str = "to_db", **kwargs) -> list:
+        """Convert a column of values to their DB (output="to_db") or Python (output="to_value") representation.
+
+            Integer.from_values_batch(["1", "2", None]) => [1, 2, None]
+
+        The result is equal to converting each value on its own:
+
+            [getattr(cls.from_value(value, **kwargs), output) for value in values]
+
+        Types with immutable results convert each distinct value in the column only once.
+
+        :param values: any iterable of values, e.g. a list, a numpy array or a pandas Series
+        :param output: the representation to return, "to_db" or "to_value"
+        :param kwargs: the kwargs for from_value, e.g. format
+        :return: a list with the converted values
+        """
+        if output not in ("to_db", "to_value"):
+            raise GOBTypeException(f"Unknown batch output: '{output}'")
+        convert = cls._batch_converter(output, **kwargs)
+
+        if not cls._batch_memoize:
+            return [convert(value) for value in values]
+        return _convert_memoized(convert, values)
+
+    @classmethod
+    def _batch_converter(cls, output: str, **kwargs) -> Callable[[Any], Any]:
+        """Return a function that converts a single value for from_values_batch."""
+        def convert(value):
+            return getattr(cls.from_value(value, **kwargs), output)
+
+        return convert
+
     @property
     @abstractmethod
     def json(self):
@@ -161,6 +408,14 @@ class GOBType(metaclass=ABCMeta):
         """
         pass  # pragma: no cover
 
+    @property
+    def canonical(self):
+        """Canonical string of the GOBType instance, equal instances have equal canonical strings
+
+        :return: the internal string representation, None for a None value
+        """
+        return self._string
+
     @classmethod
     def get_column_definition(cls, column_name, **kwargs):
         """Returns the SQL Alchemy column definition for the type """
@@ -182,6 +437,20 @@ class String(GOBType):
             value = None
         return cls(str(value)) if value is not None else cls(value)
 
+    @classmethod
+    def _batch_converter(cls, output, **kwargs):
+        if (getattr(cls.from_value, '__func__', None) is not String.from_value.__func__
+                or cls.__init__ is not String.__init__):
+            # Subclass with its own conversion
+            return super()._batch_converter(output, **kwargs)
+
+        def convert(value):
+            if value is None or isinstance(value, numbers.Number) and isnan(value):
+                return None
+            return str(value)
+
+        return convert
+
     @property
     def json(self):
         return json.dumps(self._string)
@@ -218,6 +487,19 @@ class Character(String):
         return cls(string_value[0]) if len(string_value) > 0 else cls(None)
 
 
+def _to_int(value) -> Optional[int]:
+    """Convert a single value like Integer.from_value(value).to_db (and to_value) for Integer.from_values_batch."""
+    if value is None or isinstance(value, numbers.Number) and isnan(value):
+        return None
+    value = str(value)
+    if value == 'nan':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise GOBTypeException(f"value '{value}' cannot be interpreted as Integer")
+
+
 class Integer(String):
     """GOBType class for GOB.Integer."""
 
@@ -234,6 +516,14 @@ class Integer(String):
                 raise GOBTypeException(f"value '{value}' cannot be interpreted as Integer")
         super().__init__(value)
 
+    @classmethod
+    def _batch_converter(cls, output, **kwargs):
+        if (getattr(cls.from_value, '__func__', None) is not Integer.from_value.__func__
+                or cls.__init__ is not Integer.__init__):
+            # Subclass with its own conversion
+            return super()._batch_converter(output, **kwargs)
+        return _to_int
+
     @property
     def json(self):
         return json.dumps(int(self._string)) if self._string is not None else json.dumps(None)
@@ -338,6 +628,7 @@ class Boolean(GOBType):
 
     name = "Boolean"
     sql_type = sqlalchemy.Boolean
+    _batch_memoize = True
 
     def __init__(self, value):
         if value is not None:
@@ -402,8 +693,11 @@ class Date(String):
 
     name = "Date"
     sql_type = sqlalchemy.Date
+    _batch_memoize = True
     internal_format = "%Y-%m-%d"
 
+    _datetime = _NOT_PARSED
+
     @classmethod
     def from_value(cls, value, **kwargs):
         """ Create a Date GOB type as a string containing a date value in ISO 8601 format:
@@ -414,27 +708,39 @@ class Date(String):
         """
         input_format = kwargs['format'] if 'format' in kwargs else cls.internal_format
 
-        if value is not None:
-            try:
-                value = datetime.datetime.strptime(str(value), input_format).date()
-                # Transform to internal string format and work around issue: https://bugs.python.org/issue13305
-                value = f"{value.year:04d}-" + value.strftime("%m-%d")
-            except ValueError as v:
-                raise GOBTypeException(v)
+        if value is None:
+            return cls(None)
 
-        return cls(str(value)) if value is not None else cls(None)
+        try:
+            value = _get_datetime_parser(input_format)(str(value))
+        except ValueError as v:
+            raise GOBTypeException(v)
+        return cls._from_datetime(value)
+
+    @classmethod
+    def _from_datetime(cls, value: datetime.datetime):
+        # Transform to internal string format and work around issue: https://bugs.python.org/issue13305
+        gob_type = cls(f"{value.year:04d}-{value.month:02d}-{value.day:02d}")
+        gob_type._datetime = datetime.datetime(value.year, value.month, value.day)
+        return gob_type
+
+    def _get_datetime(self) -> datetime.datetime:
+        """Return the internal string as a datetime, parsed once and cached."""
+        if self._datetime is _NOT_PARSED:
+            self._datetime = _get_datetime_parser(self.internal_format)(self._string)
+        return self._datetime
 
     @property
     def to_db(self):
         if self._string is None:
             return None
-        return datetime.datetime.strptime(self._string, self.internal_format)
+        return self._get_datetime()
 
     @property
     def to_value(self):
         if self._string is None:
             return None
-        return datetime.datetime.strptime(self._string, self.internal_format).date()
+        return self._get_datetime().date()
 
 
 class DateTime(Date):
@@ -451,31 +757,33 @@ class DateTime(Date):
     def from_value(cls, value, **kwargs):
         input_format = kwargs['format'] if 'format' in kwargs else cls.internal_format
 
-        if value is not None:
-            try:
-                if not isinstance(value, datetime.datetime):
-                    if isinstance(value, str) and '.%f' in input_format and len(value) == len('YYYY-MM-DDTHH:MM:SS'):
-                        # Add missing microseconds if needed
-                        value += '.000000'
-                    value = datetime.datetime.strptime(str(value), input_format)
-                # Transform to internal string format and work around issue: https://bugs.python.org/issue13305
-                value = f"{value.year:04d}-" + value.strftime("%m-%dT%H:%M:%S.%f")
-            except ValueError as v:
-                raise GOBTypeException(v)
+        if value is None:
+            return cls(None)
 
-        return cls(str(value)) if value is not None else cls(None)
+        try:
+            if not isinstance(value, datetime.datetime):
+                if isinstance(value, str) and '.%f' in input_format and len(value) == len('YYYY-MM-DDTHH:MM:SS'):
+                    # Add missing microseconds if needed
+                    value += '.000000'
+                value = _get_datetime_parser(input_format)(str(value))
+        except ValueError as v:
+            raise GOBTypeException(v)
+        return cls._from_datetime(value)
 
-    @property
-    def to_db(self):
-        if self._string is None:
-            return None
-        return datetime.datetime.strptime(self._string, self.internal_format)
+    @classmethod
+    def _from_datetime(cls, value: datetime.datetime):
+        # Transform to internal string format and work around issue: https://bugs.python.org/issue13305
+        gob_type = cls(f"{value.year:04d}-{value.month:02d}-{value.day:02d}T"
+                       f"{value.hour:02d}:{value.minute:02d}:{value.second:02d}.{value.microsecond:06d}")
+        gob_type._datetime = datetime.datetime(value.year, value.month, value.day,
+                                               value.hour, value.minute, value.second, value.microsecond)
+        return gob_type
 
     @property
     def to_value(self):
         if self._string is None:
             return None
-        return datetime.datetime.strptime(self._string, self.internal_format)
+        return self._get_datetime()
 
 
 class JSON(GOBType):
@@ -484,16 +792,53 @@ class JSON(GOBType):
     name = "JSON"
     sql_type = sqlalchemy.dialects.postgresql.JSONB
 
-    def __init__(self, value, spec=None):
+    _parsed = _NOT_PARSED
+
+    def __init__(self, value, spec=None, canonical=False):
+        """Initialise a JSON value from a JSON string.
+
+        :param value: the JSON string
+        :param spec: the (secure) attributes specification
+        :param canonical: True if the value is already a canonical JSON string (with sorted keys)
+        """
         if value is not None:
-            try:
-                # force sort keys to have order
-                value = json.dumps(json.loads(value), sort_keys=True)
-                self._spec = spec
-            except ValueError:
-                raise GOBTypeException(f"value '{value}' cannot be interpreted as JSON")
+            if not canonical:
+                try:
+                    # force sort keys to have order
+                    value = json.dumps(json.loads(value), sort_keys=True)
+                except ValueError:
+                    raise GOBTypeException(f"value '{value}' cannot be interpreted as JSON")
+            self._spec = spec
         super().__init__(value)
 
+    @staticmethod
+    def _canonical(value) -> str:
+        """Return the canonical JSON string of a dict or list.
+
+        The result equals the canonical string of the dumped value, without dumping and parsing the value first.
+        Values that change when dumped to JSON (non-str keys, large ints) are still dumped and parsed first;
+        orjson raises a TypeError on these values.
+
+        :param value:
+        :return:
+        """
+        try:
+            orjson.dumps(value)
+        except TypeError:
+            return json.dumps(json.loads(json.dumps(value)), sort_keys=True)
+        return json.dumps(value, sort_keys=True)
+
+    def _get_parsed(self):
+        """Return the parsed value, parsed once and cached.
+
+        The result is shared, do not modify it.
+
+        :return:
+        """
+        if self._parsed is _NOT_PARSED:
+            self._parsed = None if self._string is None else json.loads(self._string)
+        return self._parsed
+
     def _process_get_dict_value(self, value, user):
         for attr, attr_value in value.items():
             if isinstance(attr_value, dict):
@@ -551,7 +896,7 @@ class JSON(GOBType):
             cls._process_from_value(value, attributes)
 
         if isinstance(value, dict) or isinstance(value, list):
-            return cls(json.dumps(value), spec=attributes)
+            return cls(cls._canonical(value), spec=attributes, canonical=True)
 
         return cls(str(value))
 
@@ -578,17 +923,46 @@ class Reference(JSON):
     name = "Reference"
     exclude_keys = (FIELD.REFERENCE_ID, FIELD.SEQNR)  # Legacy. Old way of storing relations.
 
+    _filtered = _NOT_PARSED
+
     def __eq__(self, other):
-        """Internal representation is string, that is what we compare
+        """Compare the references without the excluded keys
 
         :param other: other GOB Type to compare with
         :return: True or False
         """
-        cleaned_self = self._filter_reference(self._string)
-        cleaned_other = self._filter_reference(other._string)
+        if isinstance(other, LazyValue):
+            other = other.value
+
+        cleaned_self = self._get_filtered()
+        if type(other) is type(self):
+            cleaned_other = other._get_filtered()
+        else:
+            cleaned_other = self._filter(other._string)
 
         return cleaned_self == cleaned_other
 
+    def _get_filtered(self):
+        """Return the value without the excluded keys, filtered once and cached.
+
+        :return:
+        """
+        if self._filtered is _NOT_PARSED:
+            self._filtered = self._filter(self._get_parsed())
+        return self._filtered
+
+    @property
+    def canonical(self):
+        """Canonical string of the reference, without the excluded keys
+
+        :return:
+        """
+        filtered = self._get_filtered()
+        return None if filtered is None else json.dumps(filtered, sort_keys=True)
+
+    def _filter(self, value):
+        return self._filter_reference(value)
+
     def _filter_reference(self, value):
         if value is None:
             return value
@@ -601,21 +975,14 @@ class ManyReference(Reference):
 
     name = "ManyReference"
 
-    def __eq__(self, other, exclude_keys=(FIELD.REFERENCE_ID, FIELD.SEQNR)):
-        """Internal representation is string, that is what we compare
-
-        :param other: other GOB Type to compare with
-        :return: True or False
-        """
-        cleaned_self = self._filter_references(self._string)
-        cleaned_other = self._filter_references(other._string)
-
-        return cleaned_self == cleaned_other
+    def _filter(self, value):
+        return self._filter_references(value)
 
     def _filter_references(self, value):
         if value is None:
             return value
-        return [self._filter_reference(item) for item in json.loads(str(value))]
+        items = json.loads(str(value)) if isinstance(value, str) else value
+        return [self._filter_reference(item) for item in items]
 
 
 class VeryManyReference(ManyReference):
@@ -1,5 +1,8 @@
+import multiprocessing
+import os
 import socket
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from itertools import chain
 from pathlib import Path
@@ -9,6 +12,8 @@ from typing import Optional
 from gobcore.message_broker.config import GOB_SHARED_DIR
 from gobcore.message_broker.typing import Service
 
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"  # CPU quota and period of the cgroup (v2) of this process
+
 
 def gettotalsizeof(o):
     """Return the approximate memory footprint an object and all of its contents.
@@ -150,3 +155,48 @@ def get_logger_name(service: Service) -> str:
         raise TypeError(f"Name must be str type, got: {type(name)}")
 
     return name.upper()
+
+
+def _get_cpu_quota() -> Optional[int]:
+    """Return the number of CPUs of the CPU quota of the cgroup (v2) of this process, eg in a container.
+
+    :return: the quota rounded up to whole CPUs, or None if there is no quota
+    """
+    try:
+        quota, period = Path(CGROUP_CPU_MAX).read_text().split()
+        return max(1, -(-int(quota) // int(period)))
+    except (OSError, ValueError):
+        # No cgroup v2 quota file, or no quota ("max")
+        return None
+
+
+def get_worker_count(name: str) -> int:
+    """Return the number of worker processes from the environment variable name, or else the number of usable CPUs.
+
+    The usable CPUs are the CPUs that this process may run on, limited by the CPU quota of its cgroup.
+
+    :param name: the name of the environment variable
+    :return:
+    """
+    if count := os.getenv(name):
+        return int(count)
+    if hasattr(os, "sched_getaffinity"):
+        # The CPUs that this process may run on, this does not reflect a cgroup CPU quota
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count() or 1
+    quota = _get_cpu_quota()
+    return count if quota is None else min(count, quota)
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return a pool of processes that are not forked from this process.
+
+    A forked process inherits the state of all threads, eg held locks of the message broker connection or logging.
+    The processes are started by a forkserver when available, otherwise they are spawned.
+
+    :param max_workers:
+    :return:
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
@@ -0,0 +1,147 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from gobcore.events.diff import EventDiff
+from gobcore.exceptions import GOBException
+
+
+class TestEventDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.writer = MagicMock()
+        self.collection = {
+            'all_fields': {
+                'name': {'type': 'GOB.String'},
+                '_tid': {'type': 'GOB.String'},
+            }
+        }
+        self.stored = {
+            'b': SimpleNamespace(_tid='b', name='old name', _last_event=2),
+            'c': SimpleNamespace(_tid='c', name='same name', _last_event=3),
+        }
+        self.get_entities = MagicMock(side_effect=lambda tids: {tid: self.stored[tid] for tid in tids})
+        self.current = [
+            ('a', 'hash a', 1),
+            ('b', 'hash b', 2),
+            ('c', 'hash c', 3),
+            ('e', 'hash e', 5),
+        ]
+        self.new = [
+            {'_tid': 'a', '_hash': 'hash a', 'name': 'any'},
+            {'_tid': 'b', '_hash': 'new hash b', 'name': 'new name'},
+            {'_tid': 'c', '_hash': 'new hash c', 'name': 'same name'},
+            {'_tid': 'd', '_hash': 'hash d', 'name': 'added'},
+        ]
+
+    def _events(self):
+        return [call[0][0] for call in self.writer.write.call_args_list]
+
+    def test_write_events(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities)
+        counts = diff.write_events(self.current, self.new)
+
+        self.assertEqual({'ADD': 1, 'MODIFY': 1, 'CONFIRM': 2, 'DELETE': 1}, counts)
+
+        # Only the entities with a different hash are read
+        self.get_entities.assert_called_once_with(['b', 'c'])
+
+        events = self._events()
+        self.assertEqual(['ADD', 'DELETE', 'MODIFY', 'BULKCONFIRM'], [event['event'] for event in events])
+        add, delete, modify, bulkconfirm = events
+
+        self.assertEqual('d', add['data']['_tid'])
+        self.assertEqual({'_tid': 'e', '_last_event': 5}, delete['data'])
+        self.assertEqual({
+            '_tid': 'b',
+            '_hash': 'new hash b',
+            '_last_event': 2,
+            'modifications': [{'key': 'name', 'old_value': 'old name', 'new_value': 'new name'}]
+        }, modify['data'])
+        self.assertEqual([{'_tid': 'a', '_last_event': 1}, {'_tid': 'c', '_last_event': 3}],
+                         bulkconfirm['data']['confirms'])
+        self.assertTrue(all(event['version'] == '0.1' for event in events))
+
+    def test_write_events_chunks(self):
+        self.current.append(('f', 'hash f', 6))
+        self.new.append({'_tid': 'f', '_hash': 'hash f', 'name': 'any'})
+
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, chunk_size=1)
+        counts = diff.write_events(self.current, self.new)
+        self.assertEqual({'ADD': 1, 'MODIFY': 1, 'CONFIRM': 3, 'DELETE': 1}, counts)
+
+        self.assertEqual(3, len([event for event in self._events() if event['event'] == 'BULKCONFIRM']))
+        self.assertEqual(2, self.get_entities.call_count)
+
+    def test_write_events_not_full(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, full_import=False)
+        counts = diff.write_events(self.current, self.new)
+        self.assertEqual({'ADD': 1, 'MODIFY': 1, 'CONFIRM': 2}, counts)
+
+    def test_write_events_on_disk(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities)
+        expected = diff.write_events(self.current, self.new)
+        expected_events = self._events()
+        self.writer.reset_mock()
+
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, max_in_memory=2)
+        self.assertEqual(expected, diff.write_events(self.current, iter(self.new)))
+
+        events = self._events()
+        confirms = [confirm for event in events if event['event'] == 'BULKCONFIRM'
+                    for confirm in event['data']['confirms']]
+        self.assertCountEqual(expected_events[3]['data']['confirms'], confirms)
+        self.assertEqual({(event['event'], event['data']['_tid']): event for event in expected_events[:3]},
+                         {(event['event'], event['data']['_tid']): event
+                          for event in events if event['event'] != 'BULKCONFIRM'})
+
+    def test_write_events_spill_levels(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities)
+        expected = diff.write_events(self.current, self.new)
+
+        # Partitions with more than max_in_memory states are partitioned again, up to SPILL_LEVELS times
+        join = EventDiff._join
+        for spill_levels in [0, 1, 4]:
+            # The number of states per join, the partitions of the tids depend on the hash seed
+            joined_states = []
+
+            def counting_join(diff, states, new):
+                joined_states.append(len(states))
+                join(diff, states, new)
+
+            with patch('gobcore.events.diff.SPILL_PARTITIONS', 2), \
+                    patch('gobcore.events.diff.SPILL_LEVELS', spill_levels), \
+                    patch.object(EventDiff, '_join', counting_join):
+                diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, max_in_memory=1)
+                self.assertEqual(expected, diff.write_events(self.current, iter(self.new)))
+
+            self.assertEqual(4, sum(joined_states))
+            if spill_levels == 0:
+                self.assertEqual([4], joined_states)
+            else:
+                self.assertLessEqual(2, len(joined_states))
+                self.assertLessEqual(len(joined_states), 2 ** spill_levels)
+
+    def test_join(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, full_import=False)
+        states = {tid: (hash_, last_event) for tid, hash_, last_event in self.current}
+        diff._join(states, self.new)
+
+        # The joined states are removed
+        self.assertEqual({'e': ('hash e', 5)}, states)
+
+    def test_write_events_empty(self):
+        diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities)
+        self.assertEqual({}, diff.write_events([], []))
+        self.writer.write.assert_not_called()
+
+    def test_write_events_duplicate_tid(self):
+        for duplicate in [
+            {'_tid': 'a', '_hash': 'hash a', 'name': 'any'},
+            {'_tid': 'b', '_hash': 'other hash b', 'name': 'other name'},
+            {'_tid': 'd', '_hash': 'hash d', 'name': 'added'},
+        ]:
+            for max_in_memory in [100, 2]:
+                diff = EventDiff(self.writer, self.collection, '0.1', self.get_entities, max_in_memory=max_in_memory)
+                with self.assertRaisesRegex(GOBException, f"Duplicate _tid in the new entities: {duplicate['_tid']}"):
+                    diff.write_events(self.current, self.new + [duplicate])
@@ -1,6 +1,6 @@
 import unittest
 import json
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock, ANY
 
 from gobcore import events
 from gobcore.events import GOB, GobEvent, database_to_gobevent
@@ -179,3 +179,81 @@ class TestEvents(unittest.TestCase):
                 event, data, event.catalogue, event.entity, target_version)
 
         mock_gob_event.assert_called_with("the tid", expected_event_msg, expected_meta_data)
+
+    @patch('gobcore.events.GOBMigrations')
+    @patch('gobcore.events.GOBModel')
+    @patch('gobcore.events.GobEvent')
+    def test_database_to_gobevents(self, mock_gob_event, mock_model, mock_migrations):
+        mock_model().__getitem__.return_value = {
+            'collections': {'test_entity': {'version': '0.2'}}}
+        mock_gob_event.side_effect = lambda *args: MagicMock()
+
+        def migrate_events_data(events_data, *args):
+            for event, data in events_data:
+                event.version = '0.2'
+                yield {**data, 'migrated': True}
+        mock_migrations().migrate_events_data.side_effect = migrate_events_data
+
+        def stored_event(eventid, version, contents):
+            event = dict_to_object({
+                'version': version,
+                'catalogue': 'test_catalogue',
+                'application': 'TEST',
+                'entity': 'test_entity',
+                'timestamp': None,
+                'source': 'test',
+                'action': 'ADD',
+                'tid': f"tid {eventid}",
+                'contents': contents,
+            })
+            event.eventid = eventid
+            return event
+
+        stored_events = [
+            stored_event(1, '0.1', '{"id_column": "id"}'),
+            stored_event(2, '0.2', {'id_column': 'id'}),
+            stored_event(3, '0.1', b'{"id_column": "id"}'),
+        ]
+
+        result = list(events.database_to_gobevents(stored_events, batch_size=2))
+        self.assertEqual(3, len(result))
+
+        # The events are reconstructed in order, migrations are done per batch
+        self.assertEqual([call[0][0] for call in mock_gob_event.call_args_list], ['tid 1', 'tid 2', 'tid 3'])
+        self.assertEqual([call[0][1]['data'] for call in mock_gob_event.call_args_list], [
+            {'id_column': 'id', 'migrated': True},
+            {'id_column': 'id'},
+            {'id_column': 'id', 'migrated': True},
+        ])
+        self.assertEqual(2, mock_migrations().migrate_events_data.call_count)
+        mock_migrations().migrate_events_data.assert_called_with(
+            ANY, 'test_catalogue', 'test_entity', '0.2')
+
+        # Events with an equal header in a batch share their metadata
+        metadata = [call[0][2] for call in mock_gob_event.call_args_list]
+        self.assertIs(metadata[0], metadata[1])
+        self.assertEqual('test', metadata[2].source)
+        self.assertEqual([1, 2, 3], [event.id for event in result])
+
+    def test_get_contents(self):
+        def stored_event(contents):
+            return dict_to_object({'contents': contents})
+
+        self.assertEqual({'a': 1}, events._get_contents(stored_event({'a': 1})))
+        self.assertEqual({'a': [1, 'b']}, events._get_contents(stored_event('{"a": [1, "b"]}')))
+        self.assertEqual({'a': 1}, events._get_contents(stored_event(b'{"a": 1}')))
+
+        # Integers outside the 64 bit range are not converted to floats
+        large = 2 ** 64
+        contents = events._get_contents(stored_event(json.dumps({'a': large, 'b': -large})))
+        self.assertEqual({'a': large, 'b': -large}, contents)
+        self.assertIsInstance(contents['a'], int)
+        self.assertEqual({'a': large}, events._get_contents(stored_event(json.dumps({'a': large}).encode())))
+
+        # NaN and Infinity are parsed like json does
+        contents = events._get_contents(stored_event('{"a": NaN, "b": Infinity, "c": -Infinity}'))
+        self.assertNotEqual(contents['a'], contents['a'])
+        self.assertEqual([float('inf'), float('-inf')], [contents['b'], contents['c']])
+
+        with self.assertRaises(json.JSONDecodeError):
+            events._get_contents(stored_event('{"a": }'))
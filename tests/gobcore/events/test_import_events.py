@@ -130,3 +130,42 @@ class TestImportEvents(unittest.TestCase):
 
             # Put back to avoid failing tests using this object
             event.gob_model = GOBModel()
+
+    def test_get_attribute_dict_converters(self):
+        class MockModel(dict):
+            data = {}
+
+        metadata = MagicMock()
+        metadata.catalogue = 'any catalogue'
+        metadata.entity = 'any entity'
+        model = MockModel({'any catalogue': {'collections': {'any entity': {'all_fields': {
+            'a': {'type': 'GOB.Integer'},
+            'b': {'type': 'GOB.String'},
+        }}}}})
+
+        import_events.CONFIRM.gob_model = model
+
+        event = import_events.CONFIRM("tid", {'a': '1', 'b': 2, '_entity_source_id': 'any id'}, metadata)
+        result = event.get_attribute_dict()
+        self.assertEqual(result['a'], 1)
+        self.assertEqual(result['b'], '2')
+        self.assertNotIn('_entity_source_id', result)
+
+        # Converters are built once per collection of the model data
+        self.assertIs(import_events.ImportEvent._converters['data'], model.data)
+        converters = import_events.ImportEvent._converters['converters'][('any catalogue', 'any entity')]
+        event = import_events.CONFIRM("tid", {'a': '2'}, metadata)
+        self.assertEqual(event.get_attribute_dict()['a'], 2)
+        self.assertIs(event._get_converters(), converters)
+
+        # New model data, new converters
+        model.data = {}
+        self.assertIsNot(event._get_converters(), converters)
+        self.assertIs(import_events.ImportEvent._converters['data'], model.data)
+
+        # No model data, no cache
+        import_events.CONFIRM.gob_model = {**model}
+        self.assertIsNot(event._get_converters(), event._get_converters())
+
+        # Put back
+        import_events.CONFIRM.gob_model = GOBModel()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock
+
+from gobcore.events import GOB
+from gobcore.events.writer import EventWriter
+
+
+class TestEventWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.writer = MagicMock()
+
+    def _events(self):
+        return [call[0][0] for call in self.writer.write.call_args_list]
+
+    def _confirm(self, tid, version='0.1'):
+        return GOB.CONFIRM.create_event(tid, {'_last_event': int(tid)}, version)
+
+    def test_write(self):
+        add = GOB.ADD.create_event('1', {'_hash': 'hash', '_last_event': None}, '0.1')
+        delete = GOB.DELETE.create_event('4', {'_last_event': 4}, '0.1')
+
+        with EventWriter(self.writer, bulk_size=2) as writer:
+            for event in [self._confirm('2'), add, self._confirm('3'), self._confirm('5'), delete]:
+                writer.write(event)
+            self.assertEqual([add, GOB.BULKCONFIRM.create_event([
+                {'_tid': '2', '_last_event': 2},
+                {'_tid': '3', '_last_event': 3},
+            ], '0.1'), delete], self._events())
+
+        # The remaining confirms are written on exit
+        self.assertEqual([GOB.BULKCONFIRM.create_event([{'_tid': '5', '_last_event': 5}], '0.1')],
+                         self._events()[3:])
+        self.assertEqual({'ADD': 1, 'CONFIRM': 3, 'DELETE': 1}, writer.counts)
+
+    def test_write_versions(self):
+        writer = EventWriter(self.writer)
+        writer.write(self._confirm('1', '0.1'))
+        writer.write(self._confirm('2', '0.2'))
+        writer.write(self._confirm('3', '0.2'))
+        writer.flush()
+        writer.flush()
+
+        self.assertEqual(['0.1', '0.2'], [event['version'] for event in self._events()])
+        self.assertEqual([1, 2], [len(event['data']['confirms']) for event in self._events()])
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            with EventWriter(self.writer) as writer:
+                writer.write(self._confirm('1'))
+                raise ValueError
+        self.writer.write.assert_not_called()
+
+    def test_confirm(self):
+        writer = EventWriter(self.writer)
+        writer.confirm('1', 1, '0.1')
+        writer.write(self._confirm('2'))
+        writer.flush()
+
+        self.assertEqual([GOB.BULKCONFIRM.create_event([
+            {'_tid': '1', '_last_event': 1},
+            {'_tid': '2', '_last_event': 2},
+        ], '0.1')], self._events())
+        self.assertEqual({'CONFIRM': 2}, writer.counts)
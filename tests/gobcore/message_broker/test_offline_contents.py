@@ -37,14 +37,16 @@ class TestOfflineContents(unittest.TestCase):
         self.assertEqual(oc.get_filename("x", oc._MESSAGE_BROKER_FOLDER), f"{expected_dir}/x")
         mocked_mkdir.assert_called_with(exist_ok=True, parents=True)
 
+    @mock.patch('gobcore.message_broker.offline_contents.clear_protected')
     @mock.patch('gobcore.message_broker.offline_contents.get_filename', return_value="filename")
     @mock.patch('os.remove')
-    def testEndMessage(self, mocked_remove, mocked_filename):
+    def testEndMessage(self, mocked_remove, mocked_filename, mocked_clear_protected):
 
         # End message without any contents_ref does nothing
         self.assertEqual(oc.end_message({}, {}), None)
         self.assertFalse(mocked_filename.called)
         self.assertFalse(mocked_remove.called)
+        mocked_clear_protected.assert_called_once()
 
         # End message with contents_ref gets the filename and removes it
         self.assertEqual(oc.end_message({}, "x"), None)
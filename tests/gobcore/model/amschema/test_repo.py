@@ -1,4 +1,6 @@
 import json
+import os
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch
 from pathlib import Path
@@ -74,6 +76,7 @@ class TestAMSchemaRepository(TestCase):
         download_url = "https://download-location.tld/amsterdam-schema/master"
         result = instance._download_dataset(download_url)
         self.assertEqual(result, dataset)
+        AMSchemaRepository._files = {}
 
         mock_retry.assert_called_with(
             total=6,
@@ -101,3 +104,118 @@ class TestAMSchemaRepository(TestCase):
         self.assertEqual(result, table)
 
         mock_cached_dict.assert_called_with(local_path)
+
+
+class TestAMSchemaRepositoryCache(TestCase):
+
+    def setUp(self):
+        AMSchemaRepository._files = {}
+        AMSchemaRepository._digests = {}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.instance = AMSchemaRepository()
+        self.instance._download_file = MagicMock(return_value=({"any": "data"}, "etag"))
+
+    def tearDown(self):
+        AMSchemaRepository._files = {}
+        AMSchemaRepository._digests = {}
+        self.tmp_dir.cleanup()
+
+    def test_file_digests(self):
+        dataset = "https://any.location/dataset.json"
+        table = "https://any.location/table/v1.0.json"
+        local = "/any/location/dataset.json"
+        self.instance._load_file = MagicMock(return_value={"local": "data"})
+
+        self.instance._get_file(dataset)
+        self.instance._get_file(table)
+        self.instance._get_file(local)
+        digests = AMSchemaRepository.get_file_digests()
+        self.assertEqual([dataset, table, local], list(digests))
+        self.assertEqual(digests[dataset], digests[table])
+        self.assertNotEqual(digests[dataset], digests[local])
+        self.assertTrue(self.instance.has_file_digests(digests))
+
+        # Eg in another process, only the files that can change are read again
+        AMSchemaRepository._files = {}
+        self.instance._download_file.reset_mock()
+        self.assertTrue(self.instance.has_file_digests(digests))
+        self.instance._download_file.assert_called_once_with(dataset, etag=None)
+
+        AMSchemaRepository._files = {}
+        self.instance._download_file.return_value = {"new": "data"}, "new etag"
+        self.assertFalse(self.instance.has_file_digests(digests))
+
+        self.instance._download_file.return_value = {"any": "data"}, "etag"
+        self.instance._load_file.return_value = {"new local": "data"}
+        AMSchemaRepository._files = {}
+        self.assertFalse(self.instance.has_file_digests(digests))
+
+    def test_memory_cache(self):
+        location = "https://any.location/dataset.json"
+        self.assertEqual(self.instance._get_file(location), {"any": "data"})
+        self.assertEqual(AMSchemaRepository()._get_file(location), {"any": "data"})
+        self.instance._download_file.assert_called_once_with(location, etag=None)
+
+    def test_disk_cache(self):
+        dataset = "https://any.location/dataset.json"
+        table = "https://any.location/table/v1.0.json"
+
+        with patch("gobcore.model.amschema.repo.CACHE_DIR", self.tmp_dir.name):
+            self.instance._get_remote_file(dataset)
+            self.instance._get_remote_file(table)
+            self.assertEqual(len(os.listdir(self.tmp_dir.name)), 2)
+            self.instance._download_file.reset_mock()
+
+            # Immutable files are read from the cache
+            self.assertEqual(self.instance._get_remote_file(table), {"any": "data"})
+            self.instance._download_file.assert_not_called()
+
+            # Other files are validated
+            self.instance._download_file.return_value = None, "etag"
+            self.assertEqual(self.instance._get_remote_file(dataset), {"any": "data"})
+            self.instance._download_file.assert_called_with(dataset, etag="etag")
+
+            self.instance._download_file.return_value = {"new": "data"}, "new etag"
+            self.assertEqual(self.instance._get_remote_file(dataset), {"new": "data"})
+            self.instance._download_file.reset_mock()
+
+            with patch("gobcore.model.amschema.repo.OFFLINE", True):
+                self.assertEqual(self.instance._get_remote_file(dataset), {"new": "data"})
+                self.instance._download_file.assert_not_called()
+
+                with self.assertRaisesRegex(AMSchemaError, "Offline"):
+                    self.instance._get_remote_file("https://any.location/other.json")
+
+    def test_corrupt_disk_cache(self):
+        table = "https://any.location/table/v1.0.json"
+
+        with patch("gobcore.model.amschema.repo.CACHE_DIR", self.tmp_dir.name):
+            cache_path = self.instance._get_cache_path(table)
+            for contents in ['{"etag": "etag", "da', '[]', '{"any": "data"}']:
+                cache_path.write_text(contents)
+
+                # A corrupt cache file is a miss, it is deleted
+                with patch("gobcore.model.amschema.repo.OFFLINE", True):
+                    with self.assertRaisesRegex(AMSchemaError, "Offline"):
+                        self.instance._get_remote_file(table)
+                self.assertFalse(cache_path.exists())
+
+                # And the file is downloaded again
+                cache_path.write_text(contents)
+                self.instance._download_file.reset_mock()
+                self.assertEqual(self.instance._get_remote_file(table), {"any": "data"})
+                self.instance._download_file.assert_called_once_with(table, etag=None)
+                self.assertEqual(json.loads(cache_path.read_text())["data"], {"any": "data"})
+
+    @patch("gobcore.model.amschema.repo.Session")
+    def test_download_not_modified(self, mock_session):
+        mock_get = mock_session.return_value.__enter__.return_value.get
+        mock_get.return_value.status_code = 304
+
+        self.assertEqual(AMSchemaRepository()._download_file("https://any", etag="etag"), (None, "etag"))
+        mock_get.assert_called_with("https://any", timeout=10, headers={"If-None-Match": "etag"})
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {"ETag": "new etag"}
+        self.assertEqual(AMSchemaRepository()._download_file("https://any"),
+                         (mock_get.return_value.json.return_value, "new etag"))
@@ -15,6 +15,7 @@ class MockEvent():
 class TestMigrations(unittest.TestCase):
 
     def setUp(self):
+        GOBMigrations._plans = {}
         self.migrations = GOBMigrations()
         self.add_event = MockEvent('ADD', '0.1')
         self.mock_migration = {
@@ -306,3 +307,75 @@ class TestMigrations(unittest.TestCase):
         with self.assertRaises(GOBException):
             self.migrations.migrate_event_data(self.add_event, data, 'catalog', 'collection', '0.3')
             mock_logger.assert_called()
+
+    @patch('gobcore.model.migrations.GOBMigrations._get_migration')
+    def test_migration_plan(self, mock_get_migration):
+        mock_migration2 = {
+            'target_version': '0.3',
+            'conversions': [
+                {
+                    'action': 'rename',
+                    'old_column': 'new',
+                    'new_column': 'deleted_column'
+                },
+                {
+                    'action': 'rename',
+                    'old_column': 'deleted_column',
+                    'new_column': 'other'
+                },
+                {
+                    'action': 'add',
+                    'column': 'other added column',
+                    'default': None
+                }
+            ]
+        }
+        mock_get_migration.side_effect = [self.mock_migration, mock_migration2]
+
+        plan = self.migrations.get_migration_plan('catalog', 'collection', '0.1', '0.3')
+        self.assertEqual('0.3', plan.target_version)
+        self.assertEqual(6, len(plan.add_functions))
+        self.assertEqual(self.mock_migration['conversions'] + mock_migration2['conversions'], list(plan.conversions))
+
+        # Renames and deletes for modifications are composed in one key mapping
+        self.assertEqual(1, len(plan.modify_functions))
+        self.assertEqual({'old': 'other', 'new': 'other', 'deleted_column': None},
+                         plan.modify_functions[0].keywords['key_map'])
+
+        # The plan is compiled once
+        self.assertIs(plan, self.migrations.get_migration_plan('catalog', 'collection', '0.1', '0.3'))
+        self.assertEqual(2, mock_get_migration.call_count)
+
+        data = {
+            'modifications': [
+                {'key': 'old', 'old_value': 'a', 'new_value': 'b'},
+                {'key': 'deleted_column', 'old_value': 'c', 'new_value': 'd'},
+            ]
+        }
+        modify_event = MockEvent('MODIFY', '0.1')
+        self.migrations.migrate_event_data(modify_event, data, 'catalog', 'collection', '0.3')
+        self.assertEqual({'modifications': [{'key': 'other', 'old_value': 'a', 'new_value': 'b'}]}, data)
+        self.assertEqual('0.3', modify_event.version)
+
+    @patch('gobcore.model.migrations.GOBMigrations._get_migration')
+    def test_migrate_events_data(self, mock_get_migration):
+        mock_get_migration.return_value = self.mock_migration
+
+        events_data = [
+            (self.add_event, {'entity': {'old': 'value'}}),
+            (MockEvent('ADD', '0.2'), {'entity': {'old': 'value'}}),
+            (MockEvent('CONFIRM', '0.1'), {}),
+        ]
+        result = self.migrations.migrate_events_data(events_data, 'catalog', 'collection', '0.2')
+        self.assertEqual([
+            {'entity': {'new': 'value', 'added_column': 'default value'}},
+            {'entity': {'old': 'value'}},
+            {},
+        ], result)
+        self.assertTrue(all(event.version == '0.2' for event, _ in events_data))
+        mock_get_migration.assert_called_once_with('catalog', 'collection', '0.1')
+
+    def test_get_migration_versions(self):
+        self.migrations._migrations = {'catalog': {'collection': {'0.1': {}, '0.2': {}}}}
+        self.assertEqual(['0.1', '0.2'], self.migrations.get_migration_versions('catalog', 'collection'))
+        self.assertEqual([], self.migrations.get_migration_versions('catalog', 'other'))
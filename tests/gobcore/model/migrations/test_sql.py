@@ -0,0 +1,258 @@
+import copy
+import json
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+import psycopg2
+
+from gobcore.datastore.postgres import PostgresDatastore
+from gobcore.exceptions import GOBException
+from gobcore.model.migrations import GOBMigrations, MigrationPlan
+from gobcore.model.migrations.sql import get_migration_statements, migrate_events, _literal, _jsonb
+
+TEST_DATABASE_URL = "GOB_TEST_DATABASE_URL"  # Connection string of a Postgres database for the round trip tests
+
+
+def parse_literal(literal: str, standard_conforming_strings: bool) -> str:
+    """Return the value of a SQL string literal like Postgres, only the escapes of backslash and quote."""
+    escape = literal.startswith("E") or not standard_conforming_strings
+    body = literal[literal.index("'") + 1:-1]
+    value, i = [], 0
+    while i < len(body):
+        if body[i] == "'" or (escape and body[i] == "\\"):
+            value.append(body[i + 1])
+            i += 2
+        else:
+            value.append(body[i])
+            i += 1
+    return "".join(value)
+
+
+class TestMigrationStatements(unittest.TestCase):
+
+    def setUp(self):
+        GOBMigrations._plans = {}
+
+    def _plan(self, conversions):
+        return MigrationPlan('0.2', (), (), tuple(conversions))
+
+    def test_version(self):
+        statements = list(get_migration_statements(self._plan([]), "catalogue = 'cat'"))
+        self.assertEqual(["UPDATE events SET version = '0.2' WHERE catalogue = 'cat'"], statements)
+
+    def test_rename_delete(self):
+        plan = self._plan([
+            {'action': 'rename', 'old_column': 'old', 'new_column': 'new'},
+            {'action': 'delete', 'column': "it's"},
+        ])
+        statements = list(get_migration_statements(plan, "x"))
+        self.assertEqual(4, len(statements))
+
+        add_rename, add_delete, modify, version = statements
+        self.assertEqual("UPDATE events SET contents = jsonb_set(contents, '{entity}', "
+                         "((contents->'entity') - 'old') || jsonb_build_object('new', (contents->'entity')->'old')) "
+                         "WHERE x AND action = 'ADD' AND (contents->'entity') ? 'old'", add_rename)
+        self.assertEqual("UPDATE events SET contents = jsonb_set(contents, '{entity}', (contents->'entity') - 'it''s') "
+                         "WHERE x AND action = 'ADD' AND (contents->'entity') ? 'it''s'", add_delete)
+
+        # Renames and deletes of modifications are composed in one statement
+        self.assertIn("CASE m->>'key' WHEN 'old' THEN jsonb_set(m, '{key}', '\"new\"'::jsonb) ELSE m END", modify)
+        self.assertIn("FILTER (WHERE m->>'key' IS NULL OR m->>'key' NOT IN ('it''s'))", modify)
+        self.assertIn("action = 'MODIFY'", modify)
+        self.assertIn("(contents->'modifications') @> ANY (ARRAY['[{\"key\": \"it''s\"}]'::jsonb, "
+                      "'[{\"key\": \"old\"}]'::jsonb])", modify)
+        self.assertTrue(version.startswith("UPDATE events SET version"))
+
+    def test_add(self):
+        plan = self._plan([{'action': 'add', 'column': 'col', 'default': None}])
+        add, version = get_migration_statements(plan, "x")
+        self.assertEqual("UPDATE events SET contents = jsonb_set(contents, '{entity}', "
+                         "jsonb_build_object('col', 'null'::jsonb) || (contents->'entity')) "
+                         "WHERE x AND action = 'ADD' AND NOT ((contents->'entity') ? 'col')", add)
+
+    def test_literal(self):
+        self.assertEqual("'abc'", _literal('abc'))
+        self.assertEqual("'it''s'", _literal("it's"))
+        self.assertEqual("'1'", _literal(1))
+        self.assertEqual("E'a\\\\b'", _literal('a\\b'))
+
+        # The value of a literal does not depend on standard_conforming_strings
+        for value in ['abc', "it's", 'a\\b', "a\\'b", '\\', "\\'; DROP TABLE events; --", 'C:\\dir\\']:
+            for standard_conforming_strings in [True, False]:
+                self.assertEqual(value, parse_literal(_literal(value), standard_conforming_strings))
+
+        # json escapes are backslashes
+        for value in ['a"b', 'é', {'a\\': "b'"}]:
+            for standard_conforming_strings in [True, False]:
+                literal = _jsonb(value).removesuffix('::jsonb')
+                self.assertEqual(json.dumps(value), parse_literal(literal, standard_conforming_strings))
+
+    def test_split_json(self):
+        plan = self._plan([
+            {'action': 'rename', 'old_column': 'a', 'new_column': 'b'},
+            {'action': 'split_json', 'column': 'json', 'mapping': {'json_a': 'a', 'json_b': 'b'}},
+            {'action': 'delete', 'column': 'json'},
+        ])
+        statements = list(get_migration_statements(plan, "x"))
+        # 3 ADD statements, rename, split_json, delete for MODIFY and the version
+        self.assertEqual(7, len(statements))
+
+        self.assertIn("(contents->'entity') || jsonb_build_object('json_a', (contents->'entity')->'json'->'a', "
+                      "'json_b', (contents->'entity')->'json'->'b')", statements[1])
+        # Only for entities where the conversion does not fail in Python
+        self.assertTrue(statements[1].endswith(
+            "action = 'ADD' AND jsonb_typeof((contents->'entity')->'json') = 'object' "
+            "AND ((contents->'entity')->'json') ?& ARRAY['a', 'b']::text[]"))
+        self.assertIn("WHEN 'a' THEN", statements[3])
+        self.assertIn("(VALUES ('json_a', 'a', 0), ('json_b', 'b', 1)) AS map(new_col, attr, j) "
+                      "WHERE m->>'key' = 'json'", statements[4])
+        self.assertIn("NOT IN ('json')", statements[5])
+
+
+@patch("gobcore.model.migrations.sql.logger", MagicMock())
+class TestMigrateEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.datastore = MagicMock()
+        self.datastore.query.side_effect = [
+            iter([(1, 3)]),       # first eventid and count
+            iter([(3, 2)]),       # eventids 1 and 3
+            iter([(5, 1)]),       # eventid 5
+            iter([(None, 0)]),    # no more events
+            iter([(0,)]),         # no events remain at the old version
+        ]
+
+    @patch("gobcore.model.migrations.sql.GOBMigrations")
+    def test_migrate_events(self, mock_migrations):
+        mock_migrations.return_value.get_migration_versions.return_value = ['0.1', '0.2']
+        mock_migrations.return_value.get_migration_plan.return_value = MigrationPlan('0.2', (), (), ())
+
+        result = migrate_events(self.datastore, 'cat', 'col', '0.2', chunk_size=2)
+        self.assertEqual(3, result)
+
+        where = "catalogue = 'cat' AND entity = 'col' AND version = '0.1'"
+        queries = [args[0] for args, _ in self.datastore.query.call_args_list]
+        self.assertEqual([
+            f"SELECT min(eventid), count(*) FROM events WHERE {where}",
+            f"SELECT max(eventid), count(*) FROM (SELECT eventid FROM events "
+            f"WHERE {where} AND eventid > 0 ORDER BY eventid LIMIT 2) AS chunk",
+            f"SELECT max(eventid), count(*) FROM (SELECT eventid FROM events "
+            f"WHERE {where} AND eventid > 3 ORDER BY eventid LIMIT 2) AS chunk",
+            f"SELECT max(eventid), count(*) FROM (SELECT eventid FROM events "
+            f"WHERE {where} AND eventid > 5 ORDER BY eventid LIMIT 2) AS chunk",
+            f"SELECT count(*) FROM events WHERE {where}",
+        ], queries)
+        mock_migrations.return_value.get_migration_plan.assert_called_once_with('cat', 'col', '0.1', '0.2')
+
+        # The chunks are the next 2 eventids of the collection
+        self.assertEqual(2, self.datastore.execute.call_count)
+        self.assertIn("eventid > 0 AND eventid <= 3", self.datastore.execute.call_args_list[0][0][0])
+        self.assertIn("eventid > 3 AND eventid <= 5", self.datastore.execute.call_args_list[1][0][0])
+
+    @patch("gobcore.model.migrations.sql.GOBMigrations")
+    def test_migrate_events_remaining(self, mock_migrations):
+        mock_migrations.return_value.get_migration_versions.return_value = ['0.1']
+        mock_migrations.return_value.get_migration_plan.return_value = MigrationPlan('0.2', (), (), ())
+        self.datastore.query.side_effect = [iter([(1, 1)]), iter([(1, 1)]), iter([(None, 0)]), iter([(1,)])]
+
+        with self.assertRaisesRegex(GOBException, "1 events for cat col have not been migrated from version 0.1"):
+            migrate_events(self.datastore, 'cat', 'col', '0.2')
+
+    @patch("gobcore.model.migrations.sql.GOBMigrations")
+    def test_migrate_events_dry_run(self, mock_migrations):
+        mock_migrations.return_value.get_migration_versions.return_value = ['0.1']
+
+        self.assertEqual(3, migrate_events(self.datastore, 'cat', 'col', '0.2', dry_run=True))
+        self.datastore.execute.assert_not_called()
+        mock_migrations.return_value.get_migration_plan.assert_not_called()
+
+    @patch("gobcore.model.migrations.sql.GOBMigrations")
+    def test_migrate_events_none(self, mock_migrations):
+        mock_migrations.return_value.get_migration_versions.return_value = ['0.1']
+        self.datastore.query.side_effect = [iter([(None, 0)])]
+
+        self.assertEqual(0, migrate_events(self.datastore, 'cat', 'col', '0.2'))
+        self.datastore.execute.assert_not_called()
+
+    @patch("gobcore.model.migrations.sql.GOBMigrations")
+    def test_migrate_events_query_consumed(self, mock_migrations):
+        mock_migrations.return_value.get_migration_versions.return_value = ['0.1']
+        committed = []
+
+        def query(*args):
+            # Like PostgresDatastore.query, the transaction is committed after the last row
+            yield (1, 1)
+            committed.append(True)
+        self.datastore.query.side_effect = query
+
+        self.assertEqual(1, migrate_events(self.datastore, 'cat', 'col', '0.2', dry_run=True))
+        self.assertEqual([True], committed)
+
+
+class MockEvent:
+
+    def __init__(self, action, version):
+        self.action = action
+        self.version = version
+
+
+@unittest.skipUnless(os.getenv(TEST_DATABASE_URL), f"{TEST_DATABASE_URL} is not set")
+@patch("gobcore.model.migrations.sql.logger", MagicMock())
+class TestMigrateEventsPostgres(unittest.TestCase):
+    """Round trip of the migration statements in Postgres, the result should equal the migration in Python."""
+
+    migration = {
+        'target_version': '0.2',
+        'conversions': [
+            {'action': 'rename', 'old_column': 'old', 'new_column': 'new'},
+            {'action': 'delete', 'column': "it's"},
+            {'action': 'add', 'column': 'added', 'default': {'a': 'b\\c'}},
+            {'action': 'split_json', 'column': 'json', 'mapping': {'json_a': 'a', 'json_b': 'b'}},
+            {'action': 'rename', 'old_column': 'new', 'new_column': 'newer'},
+        ]
+    }
+
+    events = [
+        ('ADD', {'entity': {'old': 1, "it's": 2, 'json': {'a': 'x', 'b': None}, 'other': 3}}),
+        ('ADD', {'entity': {'old': None, 'added': 2, 'json': {'a': 1, 'b': {'c': 2}}}}),
+        ('MODIFY', {'modifications': [
+            {'key': 'old', 'old_value': 1, 'new_value': 2},
+            {'key': "it's", 'old_value': 1, 'new_value': 2},
+            {'key': 'json', 'old_value': {'a': 1, 'b': 2}, 'new_value': {'a': 3}},
+            {'key': 'other', 'old_value': 1, 'new_value': 2},
+        ]}),
+        ('MODIFY', {'modifications': [{'key': 'other', 'old_value': 1, 'new_value': 2}]}),
+        ('CONFIRM', {}),
+    ]
+
+    def setUp(self):
+        GOBMigrations._plans = {}
+        self.datastore = PostgresDatastore({})
+        self.datastore.connection = psycopg2.connect(os.getenv(TEST_DATABASE_URL))
+        # A temporary table for this session hides any events table
+        self.datastore.execute("CREATE TEMPORARY TABLE events (eventid serial PRIMARY KEY, catalogue varchar, "
+                               "entity varchar, version varchar, action varchar, contents jsonb)")
+        self.datastore.write_rows("events (catalogue, entity, version, action, contents)", [
+            [catalogue, 'col', '0.1', action, json.dumps(contents)]
+            for catalogue in ['cat', 'other cat']
+            for action, contents in self.events
+        ])
+
+    def tearDown(self):
+        self.datastore.connection.close()
+
+    @patch("gobcore.model.migrations.GOBMigrations._get_migration")
+    @patch("gobcore.model.migrations.GOBMigrations.get_migration_versions", lambda *args: ['0.1'])
+    def test_round_trip(self, mock_get_migration):
+        mock_get_migration.side_effect = lambda cat, col, version: self.migration if version == '0.1' else None
+
+        self.assertEqual(len(self.events), migrate_events(self.datastore, 'cat', 'col', '0.2', chunk_size=2))
+
+        expected = GOBMigrations().migrate_events_data(
+            [(MockEvent(action, '0.1'), copy.deepcopy(contents)) for action, contents in self.events],
+            'cat', 'col', '0.2')
+        rows = list(self.datastore.query("SELECT catalogue, version, contents FROM events ORDER BY eventid"))
+        expected_rows = [('cat', '0.2', contents) for contents in expected]
+        expected_rows += [('other cat', '0.1', contents) for _, contents in self.events]
+        self.assertEqual(expected_rows, [tuple(row) for row in rows])
@@ -1,8 +1,9 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, call, patch
 
 from gobcore.model import GOBModel
-from gobcore.model.sa.gob import get_sqlalchemy_models, columns_to_model
+from gobcore.model.sa import gob
+from gobcore.model.sa.gob import SQLAlchemyModels, get_base, get_sqlalchemy_models, columns_to_model
 
 
 class TestGob(unittest.TestCase):
@@ -128,3 +129,109 @@ class TestGob(unittest.TestCase):
             'column1': 'column1spec',
             'column2': 'column2spec',
         }, False, (mock_unique.return_value, mock_unique.return_value,))
+
+
+class MockGOBModel(dict):
+
+    def get_table_name(self, catalog_name, collection_name):
+        return f"{catalog_name}_{collection_name}"
+
+    def get_catalog_collection_from_abbr(self, cat_abbr, col_abbr):
+        return self[cat_abbr], self[cat_abbr]['collections'][col_abbr]
+
+
+@patch("gobcore.model.sa.gob.columns_to_model", lambda model, cat, table_name, *args, **kwargs: f"model {table_name}")
+class TestSQLAlchemyModels(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MockGOBModel({
+            'cat': {
+                'name': 'cat',
+                'collections': {
+                    'col1': {'name': 'col1', 'all_fields': {}, 'has_states': True},
+                    'col2': {'name': 'col2', 'all_fields': {}},
+                }
+            },
+            'rel': {
+                'name': 'rel',
+                'collections': {
+                    'cat_col1_cat_col2_ref': {'name': 'cat_col1_cat_col2_ref', 'all_fields': {}},
+                }
+            }
+        })
+
+    def test_lazy(self):
+        models = SQLAlchemyModels(self.model)
+        self.assertEqual(['cat_col1', 'cat_col2', 'rel_cat_col1_cat_col2_ref'], list(models))
+        self.assertEqual(3, len(models))
+        self.assertEqual({}, models._models)
+
+        self.assertEqual("model cat_col2", models['cat_col2'])
+        self.assertEqual({'cat_col2': "model cat_col2"}, models._models)
+
+        with self.assertRaises(KeyError):
+            models['any table']
+
+    @patch("gobcore.model.sa.gob.split_relation_table_name")
+    def test_relation_table(self, mock_split):
+        mock_split.return_value = {
+            'src_cat_abbr': 'cat',
+            'src_col_abbr': 'col1',
+            'dst_cat_abbr': 'cat',
+            'dst_col_abbr': 'col2',
+            'reference_name': 'ref'
+        }
+        models = SQLAlchemyModels(self.model)
+        self.assertEqual("model rel_cat_col1_cat_col2_ref", models['rel_cat_col1_cat_col2_ref'])
+
+        # The referred tables are created first
+        self.assertEqual(['cat_col1', 'cat_col2', 'rel_cat_col1_cat_col2_ref'], list(models._models))
+
+    def test_load_all(self):
+        models = SQLAlchemyModels(self.model)
+        models._create_model = MagicMock(side_effect=lambda cat, col, table_name: table_name)
+        models['cat_col1']
+        models.load_all()
+        models._create_model.assert_has_calls([
+            call('cat', 'col1', 'cat_col1'),
+            call('cat', 'col2', 'cat_col2'),
+            call('rel', 'cat_col1_cat_col2_ref', 'rel_cat_col1_cat_col2_ref'),
+        ])
+        self.assertEqual(3, models._create_model.call_count)
+
+    def test_dict(self):
+        models = SQLAlchemyModels(self.model)
+        models._create_model = MagicMock(side_effect=lambda cat, col, table_name: table_name)
+
+        models['any table'] = 'any model'
+        self.assertEqual('any model', models['any table'])
+        del models['cat_col1']
+        self.assertEqual(['cat_col2', 'rel_cat_col1_cat_col2_ref', 'any table'], list(models))
+
+        copy = models.copy()
+        self.assertIsInstance(copy, dict)
+        self.assertEqual({
+            'cat_col2': 'cat_col2',
+            'rel_cat_col1_cat_col2_ref': 'rel_cat_col1_cat_col2_ref',
+            'any table': 'any model'
+        }, copy)
+
+        with self.assertRaises(KeyError):
+            del models['cat_col1']
+
+    @patch("gobcore.model.sa.gob.GOBModel")
+    def test_get_base(self, mock_model):
+        mock_model.sqlalchemy_models = MagicMock()
+        get_base()
+        mock_model.sqlalchemy_models.load_all.assert_called_once()
+
+        mock_model.sqlalchemy_models = None
+        self.assertIsNotNone(get_base())
+
+        # The module attribute Base is the base with all models
+        mock_model.sqlalchemy_models = MagicMock()
+        self.assertIs(get_base(), gob.Base)
+        self.assertEqual(2, mock_model.sqlalchemy_models.load_all.call_count)
+
+        with self.assertRaises(AttributeError):
+            gob.any_attribute
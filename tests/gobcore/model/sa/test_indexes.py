@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from gobcore.model import FIELD
 from gobcore.model.sa.indexes import _get_special_column_type, get_indexes
@@ -161,6 +161,23 @@ class TestIndexes(unittest.TestCase):
             except KeyError:
                 return []
 
+    @patch("gobcore.model.sa.indexes._get_indexes")
+    def test_get_indexes_memoized(self, mock_get_indexes):
+        mock_get_indexes.return_value = {'name': {'columns': ['a']}}
+        model = MagicMock(data={})
+
+        result = get_indexes(model)
+        self.assertEqual(result, {'name': {'columns': ['a']}})
+        result['name']['type'] = None
+        result['name']['columns'].append('b')
+        self.assertEqual(get_indexes(model), {'name': {'columns': ['a']}})
+        mock_get_indexes.assert_called_once_with(model)
+
+        # Recompute for other model data
+        model.data = {}
+        get_indexes(model)
+        self.assertEqual(mock_get_indexes.call_count, 2)
+
     @patch("gobcore.model.sa.indexes.GOBSources", MockSourcesForGetIndexes)
     def test_get_indexes(self):
         result = get_indexes(self.MockModelForGetIndexes())
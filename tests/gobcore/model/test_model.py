@@ -159,6 +159,17 @@ class TestModel(TestCase):
         # Reset GOBModel for further testing
         GOBModel._initialised = False
 
+    def test_field_specs(self):
+        # Equal field specs are shared by collections and can not be modified
+        qa_collections = list(self.model['qa']['collections'].values())
+        self.assertIs(qa_collections[0]['attributes']['code'], qa_collections[1]['attributes']['code'])
+        self.assertIs(qa_collections[0]['all_fields']['_id'], qa_collections[1]['all_fields']['_id'])
+
+        field_spec = qa_collections[0]['all_fields']['code']
+        self.assertEqual('String', field_spec['gob_type'].name)
+        with self.assertRaises(TypeError):
+            field_spec['type'] = 'GOB.Integer'
+
     def test_source_id(self):
         entity = {
             'idfield': 'idvalue'
@@ -415,6 +426,38 @@ class TestModel(TestCase):
         # Reset GOBModel data
         GOBModel._initialised = False
 
+    def test_indexes(self):
+        self.model.data = {
+            'cat_a': {
+                'abbreviation': 'CA',
+                'collections': {
+                    'col_a': {'abbreviation': 'COA'},
+                    'col_b': {},
+                }
+            },
+            'cat_b': {
+                'abbreviation': 'CA',
+                'collections': {
+                    'col_a': {'abbreviation': 'COB'},
+                }
+            },
+        }
+        self.assertEqual(self.model.get_reference_by_abbreviations('ca', 'coa'), 'cat_a:col_a')
+        self.assertEqual(self.model.get_reference_by_abbreviations('ca', 'cob'), 'cat_b:col_a')
+        self.assertEqual(self.model.get_table_names(), ['cat_a_col_a', 'cat_a_col_b', 'cat_b_col_a'])
+        self.assertIs(self.model.get_catalog_from_abbr('ca'), self.model.data['cat_a'])
+        with self.assertRaises(NoSuchCollectionException):
+            self.model.get_catalog_collection_from_abbr('ca', 'cob')
+
+        # Indexes are rebuilt for new model data
+        self.model.data = {'cat_c': {'abbreviation': 'CC', 'collections': {}}}
+        self.assertEqual(self.model.get_table_names(), [])
+        self.assertIs(self.model.get_catalog_from_abbr('cc'), self.model.data['cat_c'])
+        self.assertIsNone(self.model.get_reference_by_abbreviations('ca', 'coa'))
+
+        # Reset GOBModel data
+        GOBModel._initialised = False
+
     def test_catalog_from_abbr(self):
         self.model.data = {
             'cat_a': {
@@ -484,3 +527,26 @@ class TestLegacyModel(TestCase):
         mock_logger.warning.assert_called_once()
 
         GOBModel(True, True)  # Reset again
+
+
+class TestModelSnapshot(TestCase):
+
+    @patch("gobcore.model.logger", MagicMock())
+    @patch("gobcore.model.save_snapshot")
+    @patch("gobcore.model.load_snapshot")
+    @patch("gobcore.model.get_snapshot_key", lambda legacy: f"key {legacy}")
+    def test_snapshot(self, mock_load, mock_save):
+        mock_load.return_value = {'any catalog': {}}
+        model = GOBModel(False, True)
+        self.assertEqual(model.data, {'any catalog': {}})
+        mock_load.assert_called_with("key False")
+        mock_save.assert_not_called()
+
+        mock_load.return_value = None
+        with patch.object(GOBModel, "_load_data") as mock_load_data:
+            model = GOBModel(False, True)
+            mock_load_data.assert_called_once()
+        mock_save.assert_called_with("key False", model.data)
+
+        # Reset GOBModel data
+        GOBModel._initialised = False
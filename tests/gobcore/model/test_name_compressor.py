@@ -1,12 +1,36 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
-from gobcore.model.name_compressor import NameCompressor
+from gobcore.model.name_compressor import _CACHE_SIZE, NameCompressor
 
 MOCK_CONVERSIONS = {"something very special": "nothing"}
 
 
 class TestNameCompressor(TestCase):
+
+    def setUp(self):
+        NameCompressor.compress_name.cache_clear()
+        NameCompressor.uncompress_name.cache_clear()
+
+    def tearDown(self):
+        NameCompressor.compress_name.cache_clear()
+        NameCompressor.uncompress_name.cache_clear()
+
+    def test_cache(self):
+        with patch("gobcore.model.name_compressor._CONVERSIONS", MOCK_CONVERSIONS):
+            self.assertEqual("_nothing_ here", NameCompressor.compress_name("something very special here"))
+            self.assertEqual("something very special here", NameCompressor.uncompress_name("_nothing_ here"))
+
+        # The conversions are applied only once for each name
+        with patch("gobcore.model.name_compressor._CONVERSIONS", {}):
+            self.assertEqual("_nothing_ here", NameCompressor.compress_name("something very special here"))
+            self.assertEqual("something very special here", NameCompressor.uncompress_name("_nothing_ here"))
+            self.assertEqual("something else", NameCompressor.compress_name("something else"))
+
+    def test_cache_size(self):
+        self.assertEqual(NameCompressor.compress_name.cache_info().maxsize, _CACHE_SIZE)
+        self.assertEqual(NameCompressor.uncompress_name.cache_info().maxsize, _CACHE_SIZE)
+
     @patch("gobcore.model.name_compressor._CONVERSIONS", MagicMock())
     def test_conversions(self):
         names = [
@@ -4,7 +4,7 @@ from unittest import mock
 from gobcore.model.relations import _get_relation, _get_relation_name, get_relation_name, get_relations, \
     create_relation, get_inverse_relations, get_fieldnames_for_missing_relations, split_relation_table_name, \
     get_reference_name_from_relation_table_name, _get_destination, get_relations_for_collection, \
-    get_catalog_collection_relation_name
+    get_catalog_collection_relation_name, get_relation_graph, RelationGraph
 from gobcore.model import GOBModel
 from gobcore.exceptions import GOBException
 
@@ -68,7 +68,7 @@ class TestRelations(unittest.TestCase):
         model = GOBModel()
         # catalog['collections']['collection'] => src['collections']['dst']
         model.data = {
-            'catalog': {'abbreviation': 'cat', 'collections': src},
+            'catalog': {'abbreviation': 'cat', 'collections': {'collection': src['collection']}},
             'src': {'abbreviation': 'cat',
                     'collections': {'dst': src['collection']}
                    }
@@ -178,8 +178,10 @@ class TestRelations(unittest.TestCase):
     def test_get_inverse_relations(self):
         model = {
             "cat": {
+                "abbreviation": "cat",
                 "collections": {
                     "entity_a": {
+                        "abbreviation": "a",
                         "attributes": {
                             "ref_to_d": {
                                 "type": "GOB.Reference",
@@ -196,8 +198,10 @@ class TestRelations(unittest.TestCase):
                 }
             },
             "cat2": {
+                "abbreviation": "cat2",
                 "collections": {
                     "entity_d": {
+                        "abbreviation": "d",
                         "attributes": {
                             "ref_to_a": {
                                 "type": "GOB.Reference",
@@ -372,3 +376,94 @@ class TestRelations(unittest.TestCase):
             ("nap", "peilmerken", "ligt_in_gebieden_bouwblok"),
             get_catalog_collection_relation_name(gobmodel, "nap_pmk_gbd_bbk_ligt_in_gebieden_bouwblok")
         )
+
+
+class MockGraphModel:
+    _extract_references = staticmethod(GOBModel._extract_references)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, catalog_name):
+        return self.data[catalog_name]
+
+
+class TestRelationGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MockGraphModel({
+            'cat': {
+                'abbreviation': 'cat',
+                'collections': {
+                    'col_a': {
+                        'abbreviation': 'cola',
+                        'attributes': {
+                            'ref_b': {'type': 'GOB.Reference', 'ref': 'cat:col_b'},
+                            'ref_x': {'type': 'GOB.ManyReference', 'ref': 'cat:col_x'},
+                            'name': {'type': 'GOB.String'},
+                        }
+                    },
+                    'col_b': {
+                        'abbreviation': 'colb',
+                        'attributes': {
+                            'ref_a': {'type': 'GOB.VeryManyReference', 'ref': 'cat:col_a'},
+                        }
+                    },
+                }
+            },
+            'empty': {
+                'abbreviation': 'emp',
+                'collections': {}
+            }
+        })
+
+    def test_graph(self):
+        graph = RelationGraph(self.model)
+        self.assertEqual({
+            ('cat', 'col_a', 'ref_b'): 'cat_cola_cat_colb_ref_b',
+            ('cat', 'col_a', 'ref_x'): None,
+            ('cat', 'col_b', 'ref_a'): 'cat_colb_cat_cola_ref_a',
+        }, graph.relation_names)
+        self.assertEqual({
+            'cat_cola_cat_colb_ref_b': ('cat', 'col_a', 'ref_b'),
+            'cat_colb_cat_cola_ref_a': ('cat', 'col_b', 'ref_a'),
+        }, graph.relations)
+        self.assertEqual([
+            ('cat', 'col_a', [('ref_b', 'cat', 'col_b', 'cat_cola_cat_colb_ref_b'), ('ref_x', 'cat', 'col_x', None)]),
+            ('cat', 'col_b', [('ref_a', 'cat', 'col_a', 'cat_colb_cat_cola_ref_a')]),
+        ], list(graph.iter_references()))
+
+    def test_get_relation_graph(self):
+        graph = get_relation_graph(self.model)
+        self.assertIs(graph, get_relation_graph(self.model))
+
+        # Rederive for other model data
+        self.model.data = dict(self.model.data)
+        self.assertIsNot(graph, get_relation_graph(self.model))
+
+    def test_relation_apis(self):
+        self.assertEqual('cat_cola_cat_colb_ref_b', get_relation_name(self.model, 'cat', 'col_a', 'ref_b'))
+        self.assertEqual({'ref_b': 'cat_cola_cat_colb_ref_b', 'ref_x': None},
+                         get_relations_for_collection(self.model, 'cat', 'col_a'))
+        self.assertEqual({'cat': {'col_a': ['ref_x'], 'col_b': []}, 'empty': {}},
+                         get_fieldnames_for_missing_relations(self.model))
+        self.assertEqual({'cat': {'col_b': {'cat': {'col_a': ['ref_b']}},
+                                  'col_x': {'cat': {'col_a': ['ref_x']}},
+                                  'col_a': {'cat': {'col_b': ['ref_a']}}}},
+                         get_inverse_relations(self.model))
+        self.assertEqual(('cat', 'col_b', 'ref_a'),
+                         get_catalog_collection_relation_name(self.model, 'cat_colb_cat_cola_ref_a'))
+        self.assertEqual(['cat_cola_cat_colb_ref_b', 'cat_colb_cat_cola_ref_a'],
+                         list(get_relations(self.model)['collections']))
+
+        # Results can be modified
+        get_inverse_relations(self.model)['cat']['col_b']['cat']['col_a'].append('any')
+        get_fieldnames_for_missing_relations(self.model)['cat']['col_a'].append('any')
+        self.assertEqual(['ref_b'], get_inverse_relations(self.model)['cat']['col_b']['cat']['col_a'])
+        self.assertEqual(['ref_x'], get_fieldnames_for_missing_relations(self.model)['cat']['col_a'])
+
+        # Lookups outside the model
+        with self.assertRaises(KeyError):
+            get_relation_name(self.model, 'cat', 'col_a', 'name')
+        with self.assertRaises(KeyError):
+            get_relations_for_collection(self.model, 'cat', 'col_c')
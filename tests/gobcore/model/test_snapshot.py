@@ -0,0 +1,82 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from gobcore.model.snapshot import SNAPSHOT_DIR, get_snapshot_key, load_snapshot, save_snapshot
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {SNAPSHOT_DIR: self.tmp_dir.name})
+        self.env.start()
+        self.repository = patch("gobcore.model.amschema.repo.AMSchemaRepository")
+        self.mock_repository = self.repository.start()
+        self.mock_repository.get_file_digests.return_value = {"any location": "any digest"}
+        self.mock_repository.return_value.has_file_digests.return_value = True
+
+    def tearDown(self):
+        self.repository.stop()
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_snapshot_key(self):
+        key = get_snapshot_key(False)
+        self.assertEqual(key, get_snapshot_key(False))
+        self.assertNotEqual(key, get_snapshot_key(True))
+
+        with patch.dict(os.environ, {"DISABLE_TEST_CATALOGUE": "1"}):
+            self.assertNotEqual(key, get_snapshot_key(False))
+
+        with patch.dict(os.environ, {SNAPSHOT_DIR: ""}):
+            self.assertIsNone(get_snapshot_key(False))
+
+    def test_get_snapshot_key_sources(self):
+        key = get_snapshot_key(False)
+        read_bytes = Path.read_bytes
+        for name in ["gobmodel.json", "gob_types.py", "gob_geotypes.py", "gob_secure_types.py"]:
+            def changed_read_bytes(path):
+                return read_bytes(path) + (b"\n" if path.name == name else b"")
+
+            with patch.object(Path, 'read_bytes', changed_read_bytes):
+                self.assertNotEqual(key, get_snapshot_key(False), name)
+
+    def test_save_load(self):
+        shared = {'a': 1}
+        data = {'catalog': {'x': shared, 'y': shared}}
+        save_snapshot("key", data)
+
+        snapshot = load_snapshot("key")
+        self.assertEqual(snapshot, data)
+        self.assertIs(snapshot['catalog']['x'], snapshot['catalog']['y'])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["gobmodel_key.pickle"])
+
+        self.assertIsNone(load_snapshot("other key"))
+        self.assertIsNone(load_snapshot(None))
+        save_snapshot(None, data)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["gobmodel_key.pickle"])
+
+    def test_schemas_changed(self):
+        save_snapshot("key", {'any': 'data'})
+
+        # The snapshot is only loaded if the schema files that it has been built from have not changed
+        self.assertEqual(load_snapshot("key"), {'any': 'data'})
+        self.mock_repository.return_value.has_file_digests.assert_called_with({"any location": "any digest"})
+
+        self.mock_repository.return_value.has_file_digests.return_value = False
+        self.assertIsNone(load_snapshot("key"))
+
+    @patch("gobcore.model.snapshot.logger")
+    def test_errors(self, mock_logger):
+        with open(os.path.join(self.tmp_dir.name, "gobmodel_key.pickle"), "wb") as file:
+            file.write(b"corrupt")
+        self.assertIsNone(load_snapshot("key"))
+        mock_logger.warning.assert_called_once()
+
+        mock_logger.reset_mock()
+        save_snapshot("other key", {'unpicklable': lambda: None})
+        mock_logger.warning.assert_called_once()
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["gobmodel_key.pickle"])
@@ -2,10 +2,13 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch, PropertyMock
 
 import datetime
+import decimal
+import json
 
 from gobcore.model import FIELD
 from gobcore.quality.issue import QA_LEVEL, Issue, IssueException, log_issue, process_issues, is_functional_process, \
-                                  _start_issue_workflow
+                                  _start_issue_workflow, _convert_issues
+from gobcore.quality.quality_update import QualityUpdate
 
 
 class Mock_QA_CHECK:
@@ -99,13 +102,27 @@ class TestIssue(TestCase):
         }
         issue = Issue({'id': 'any_check'}, entity, 'id', 'attr', 'compared attr')
 
-        expected_json = '{"check": {"id": "any_check"}, "entity": {"id": "any id", "volgnummer": null, "begin_geldigheid": null, "eind_geldigheid": null, "attr": "any attr"}, "id_attribute": "id", "attribute": "attr", "compared_to": "compared attr", "compared_to_value": "any compared value"}'
+        expected_json = '{"check":{"id":"any_check"},"entity":{"id":"any id","volgnummer":null,"begin_geldigheid":null,"eind_geldigheid":null,"attr":"any attr"},"id_attribute":"id","attribute":"attr","compared_to":"compared attr","compared_to_value":"any compared value"}'
 
         self.assertEqual(expected_json, issue.json)
 
         from_json = Issue.from_json(expected_json)
         self.assertEqual(from_json.value, issue.value)
 
+    def test_json_decimal(self):
+        entity = {
+            'id': 'any id',
+            'attr': decimal.Decimal('1.50'),
+            'compared attr': decimal.Decimal('2')
+        }
+        issue = Issue({'id': 'any_check'}, entity, 'id', 'attr', 'compared attr')
+
+        # Decimals are numbers, like in GobTypeJSONEncoder
+        result = json.loads(issue.json)
+        self.assertEqual(1.5, result['entity']['attr'])
+        self.assertEqual(2, result['compared_to_value'])
+        self.assertIsInstance(result['compared_to_value'], int)
+
     def test_msg(self):
         entity = {
             'id': 'any id',
@@ -352,10 +369,23 @@ class TestIssue(TestCase):
         entity['validity'] = datetime.date(year=1020, month=5, day=22)
         self.assertEqual(issue._get_validity(entity, 'validity'), '1020-05-22T00:00:00')
 
+        # Non ISO formats are parsed as well
+        entity['validity'] = '22 May 2020 10:00'
+        self.assertEqual(issue._get_validity(entity, 'validity'), '2020-05-22T10:00:00')
+
         # Conversion fails, set to None
         entity['validity'] = 'non date'
         self.assertEqual(issue._get_validity(entity, 'validity'), None)
 
+    def test_slots(self):
+        entity = {
+            'id': 'any id',
+            'attr': 'any attr'
+        }
+        issue = Issue({'id': 'any_check'}, entity, 'id', 'attr')
+        self.assertFalse(hasattr(issue, '__dict__'))
+        self.assertFalse(hasattr(issue, 'entity'))
+
     @patch('gobcore.quality.issue.Issue')
     @patch('gobcore.quality.issue.start_workflow')
     @patch('gobcore.quality.issue.ContentsWriter')
@@ -378,6 +408,32 @@ class TestIssue(TestCase):
             mock_path.assert_called_with(mock_writer.return_value.__enter__.return_value.filename)
             mock_path.return_value.unlink.assert_called_with(missing_ok=True)
 
+    @patch('gobcore.quality.issue._ISSUE_CHUNK_SIZE', 2)
+    def test_convert_issues(self):
+        quality_update = QualityUpdate()
+        quality_update.process = 'any process'
+        issues = [json.loads(Issue({'id': 'any_check'}, {'id': str(n), 'attr': n}, 'id', 'attr').json)
+                  for n in range(7)]
+
+        result = list(_convert_issues(iter(issues), quality_update))
+        self.assertEqual([len(chunk) for chunk in result], [2, 2, 2, 1])
+        self.assertEqual([contents['identificatie'] for chunk in result for contents in chunk],
+                         [str(n) for n in range(7)])
+        self.assertEqual(result[0][0]['code'], 'any_check')
+
+        self.assertEqual(list(_convert_issues([], quality_update)), [])
+
+    @patch('gobcore.quality.issue._convert_issues')
+    @patch('gobcore.quality.issue.start_workflow')
+    @patch('gobcore.quality.issue.ContentsWriter')
+    def test_start_issue_workflow_count(self, mock_writer, mock_start_workflow, mock_convert):
+        mock_convert.return_value = iter([[{'id': 1}, {'id': 2}], [{'id': 3}]])
+        _start_issue_workflow({}, [], MagicMock())
+
+        writer = mock_writer.return_value.__enter__.return_value
+        self.assertEqual(writer.write.call_count, 3)
+        self.assertEqual(mock_start_workflow.call_args[0][1]['summary'], {'num_records': 3})
+
     def test_state_attributes(self):
         entity = {
             'id': 'any id',
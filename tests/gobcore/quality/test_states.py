@@ -0,0 +1,111 @@
+import datetime
+from unittest import TestCase
+
+from gobcore.model import FIELD
+from gobcore.quality.config import QA_CHECK
+from gobcore.quality.states import sort_states, check_states, _seqnr_key, _to_datetime
+
+
+def state(id, seqnr, start, end):
+    return {
+        'identificatie': id,
+        FIELD.SEQNR: seqnr,
+        FIELD.START_VALIDITY: start,
+        FIELD.END_VALIDITY: end
+    }
+
+
+class TestStates(TestCase):
+
+    def test_seqnr_key(self):
+        self.assertLess(_seqnr_key(2), _seqnr_key("10"))
+        self.assertLess(_seqnr_key("10"), _seqnr_key("a"))
+        self.assertLess(_seqnr_key("10"), _seqnr_key(None))
+
+    def test_to_datetime(self):
+        self.assertIsNone(_to_datetime(None))
+        self.assertEqual(_to_datetime(datetime.date(2020, 1, 2)), datetime.datetime(2020, 1, 2))
+        self.assertEqual(_to_datetime("2020-01-02T10:00:00"), datetime.datetime(2020, 1, 2, 10))
+        self.assertEqual(_to_datetime("2 jan 2020"), datetime.datetime(2020, 1, 2))
+        with self.assertRaises(ValueError):
+            _to_datetime("any invalid date")
+
+        # Aware datetimes are converted to naive UTC datetimes
+        aware = datetime.datetime(2020, 1, 2, 11, tzinfo=datetime.timezone(datetime.timedelta(hours=1)))
+        self.assertEqual(_to_datetime(aware), datetime.datetime(2020, 1, 2, 10))
+        self.assertEqual(_to_datetime("2020-01-02T10:00:00+01:00"), datetime.datetime(2020, 1, 2, 9))
+
+    def test_check_states_mixed_timezones(self):
+        entities = [
+            state('a', 1, '2020-01-01T00:00:00+00:00', datetime.datetime(2020, 2, 1)),
+            state('a', 2, '2020-02-01T01:00:00+01:00', None),
+        ]
+        self.assertEqual(list(check_states(entities)), [])
+
+    def test_check_states_id_types(self):
+        # Ids are sorted and grouped on the same key, an int and a string id are the same entity
+        entities = [
+            state(1, 1, '2020-01-01', '2020-02-01'),
+            state('1', 2, '2020-02-01', None),
+            state(1, 3, '2020-03-01', None),
+        ]
+        issues = list(check_states(entities))
+        self.assertEqual(len(issues), 1)
+
+    def test_sort_states(self):
+        entities = [state('b', '2', None, None), state('a', 10, None, None), state('b', 1, None, None),
+                    state('a', 9, None, None), state('c', 1, None, None)]
+        expected = [('a', 9), ('a', 10), ('b', 1), ('b', '2'), ('c', 1)]
+
+        for chunk_size in [1, 2, 5, 10]:
+            result = [(e['identificatie'], e[FIELD.SEQNR]) for e in sort_states(entities, chunk_size=chunk_size)]
+            self.assertEqual(result, expected)
+
+        self.assertEqual(list(sort_states([])), [])
+
+    def test_check_states_consistent(self):
+        entities = [
+            state('a', 2, '2020-02-01', None),
+            state('a', 1, datetime.date(2020, 1, 1), datetime.date(2020, 2, 1)),
+            state('b', 1, '2020-01-01', None),
+        ]
+        self.assertEqual(list(check_states(entities)), [])
+
+    def test_check_states(self):
+        entities = [
+            # Overlap
+            state('a', 1, '2020-01-01', '2020-03-01'),
+            state('a', 2, '2020-02-01', '2020-04-01'),
+            # Gap
+            state('a', 3, '2020-05-01', None),
+            # Previous state never ends
+            state('a', 4, '2020-06-01', None),
+            # Duplicate seqnr
+            state('b', 1, '2020-01-01', '2020-02-01'),
+            state('b', 1, '2020-02-01', None),
+            # Invalid date, only seqnr is checked
+            state('c', 1, 'any invalid date', None),
+            state('c', 2, '2020-01-01', None),
+        ]
+        issues = list(check_states(entities, chunk_size=3))
+        result = [(issue.check_id, issue.entity_id, getattr(issue, FIELD.SEQNR), issue.attribute,
+                   issue.compared_to_value) for issue in issues]
+        self.assertEqual(result, [
+            ('Value_state_overlap', 'a', 2, FIELD.START_VALIDITY, '2020-03-01'),
+            ('Value_state_gap', 'a', 3, FIELD.START_VALIDITY, '2020-04-01'),
+            ('Value_state_overlap', 'a', 4, FIELD.START_VALIDITY, None),
+            ('Value_state_order', 'b', 1, FIELD.SEQNR, 1),
+        ])
+        self.assertEqual(issues[0].msg(), "begin_geldigheid: value should not be before previous eind_geldigheid")
+
+    def test_check_states_presorted(self):
+        entities = [
+            state('a', 2, '2020-01-01', '2020-02-01'),
+            state('a', 1, '2019-01-01', '2020-01-01'),
+        ]
+        issues = list(check_states(entities, id_attribute='identificatie', presorted=True))
+        self.assertEqual([(issue.check, issue.attribute) for issue in issues], [
+            (QA_CHECK.Value_state_order, FIELD.SEQNR),
+            (QA_CHECK.Value_state_order, FIELD.START_VALIDITY),
+            (QA_CHECK.Value_state_overlap, FIELD.START_VALIDITY),
+        ])
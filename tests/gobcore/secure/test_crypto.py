@@ -1,9 +1,14 @@
+import threading
 import unittest
 import json
 from unittest import mock
 
 from gobcore.secure.crypto import is_encrypted, confidence_level, encrypt, decrypt, is_protected
-from gobcore.secure.crypto import read_protect, read_unprotect
+from gobcore.secure.crypto import read_protect, read_unprotect, encrypt_values, decrypt_values, compact_envelopes
+from gobcore.secure.crypto import compact_envelope, _encrypt_deterministic
+from gobcore.exceptions import GOBException
+from gobcore.secure.crypto import read_protected
+from gobcore.secure.crypto import _SafeStorage, clear_protected, get_protected_metrics
 
 
 class TestCrypto(unittest.TestCase):
@@ -22,17 +27,32 @@ class TestCrypto(unittest.TestCase):
         self.assertFalse(is_encrypted({"i": 0, "l": 0, "v": "value", "any": "other"}))
 
         self.assertTrue(is_encrypted(json.dumps({"i": 0, "l": 0, "v": "value"})))
+        self.assertTrue(is_encrypted(' {"i": 0, "l": 0, "v": NaN}'))
+        self.assertFalse(is_encrypted('{"i": 0, "l": 0, "v": '))
+
+    def test_is_encrypted_compact(self):
+        self.assertTrue(is_encrypted("$gob1$5$0$gAAAA-_=="))
+        self.assertTrue(is_encrypted("$gob1$4$10$"))
+        self.assertFalse(is_encrypted("$gob1$5$0$value with spaces"))
+        self.assertFalse(is_encrypted("$gob1$5$value"))
+        self.assertFalse(is_encrypted("$gob2$5$0$value"))
 
     def test_confidence_level(self):
         self.assertEqual(confidence_level(json.dumps({"l": 5})), 5)
+        self.assertEqual(confidence_level("$gob1$4$0$value"), 4)
 
     @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
     def test_encrypt(self):
-        self.assertEqual(json.loads(encrypt("value", 5)), {
-            "i": mock.ANY,
-            "l": 5,
-            "v": mock.ANY
-        })
+        # The JSON envelope by default
+        value = encrypt("value", 5)
+        self.assertRegex(value, r'^\{"i":0,"l":5,"v":"[\w=-]+"\}$')
+        self.assertTrue(is_encrypted(value))
+
+        with mock.patch('gobcore.secure.crypto._COMPACT_ENVELOPE', True):
+            value = encrypt("value", 5)
+        self.assertRegex(value, r"^\$gob1\$5\$0\$[\w=-]+$")
+        self.assertTrue(is_encrypted(value))
+        self.assertEqual(decrypt(value), "value")
 
     @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
     def test_decrypt(self):
@@ -40,14 +60,32 @@ class TestCrypto(unittest.TestCase):
         self.assertEqual(decrypt(value), "value")
 
     @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    @mock.patch('gobcore.secure.crypto._COMPACT_ENVELOPE', True)
     def test_decrypt_error(self):
         value = encrypt("value", 5)
         # Manipulate value
-        value = json.loads(value)
-        value['v'] = f"_{value['v']}"
-        value = json.dumps(value)
+        value = value.replace("$0$", "$0$_")
         self.assertIsNone(decrypt(value))
 
+    @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    @mock.patch('gobcore.secure.crypto._COMPACT_ENVELOPE', True)
+    def test_compact_envelopes(self):
+        value = encrypt("value", 5)
+        json_value = json.dumps({"i": 0, "l": 5, "v": value.split("$")[-1]})
+        self.assertEqual(decrypt(json_value), "value")
+
+        values = [json_value, value, None, "any string", '{"a": 1}']
+        self.assertEqual(list(compact_envelopes(iter(values))), [value, value, None, "any string", '{"a": 1}'])
+        self.assertEqual(compact_envelope(json_value), value)
+        self.assertEqual(compact_envelope(1.5), 1.5)
+
+        # A deterministic encryption has equal compact envelopes in both envelopes
+        with mock.patch('gobcore.secure.crypto._COMPACT_ENVELOPE', False):
+            json_value = encrypt("deterministic value", 4)
+        _encrypt_deterministic.cache_clear()
+        self.assertNotEqual(json_value, encrypt("deterministic value", 4))
+        self.assertEqual(compact_envelope(json_value), encrypt("deterministic value", 4))
+
     @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
     def test_encrypt_decrypt(self):
         value = encrypt("value", 5)
@@ -56,12 +94,105 @@ class TestCrypto(unittest.TestCase):
         value = encrypt(None, 5)
         self.assertIsNone(decrypt(value))
 
+    @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    def test_encrypt_deterministic(self):
+        with mock.patch('gobcore.secure.crypto._LEVELS', {4: mock.MagicMock()}) as mock_levels:
+            mock_levels[4].return_value.encrypt.return_value = (0, "encrypted")
+            self.assertEqual(encrypt("any deterministic value", 4), encrypt("any deterministic value", 4))
+            mock_levels[4].return_value.encrypt.assert_called_once_with("any deterministic value", 4)
+
+            # The cache does not outlive the message
+            clear_protected()
+            encrypt("any deterministic value", 4)
+            self.assertEqual(mock_levels[4].return_value.encrypt.call_count, 2)
+
+        self.assertEqual(encrypt("value", 4), encrypt("value", 4))
+        self.assertNotEqual(encrypt("value", 5), encrypt("value", 5))
+
+    @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    @mock.patch('gobcore.secure.crypto.process_pool')
+    def test_encrypt_decrypt_values(self, mock_pool):
+        executor = mock_pool.return_value.__enter__.return_value
+        executor.map.side_effect = map
+
+        values = ["a", None, "b", "a"]
+        for chunk_size in [2, 10]:
+            with mock.patch('gobcore.secure.crypto._CRYPTO_CHUNK_SIZE', chunk_size), \
+                    mock.patch('gobcore.secure.crypto._CRYPTO_WORKERS', 2):
+                for level in [4, 5]:
+                    encrypted_values = encrypt_values(values, level)
+                    self.assertEqual([confidence_level(value) for value in encrypted_values], [level] * 4)
+                    self.assertEqual(decrypt_values(iter(encrypted_values)), values)
+
+        # Level 5 encryptions and the decryptions of two chunks in a pool, deterministic encryptions are remembered
+        self.assertEqual(executor.map.call_count, 3)
+        mock_pool.assert_called_with(2)
+
+        # No pool for a single worker
+        mock_pool.reset_mock()
+        with mock.patch('gobcore.secure.crypto._CRYPTO_CHUNK_SIZE', 2), \
+                mock.patch('gobcore.secure.crypto._CRYPTO_WORKERS', 1):
+            self.assertEqual(decrypt_values(encrypt_values(values, 5)), values)
+        mock_pool.assert_not_called()
+
+        self.assertEqual(encrypt_values([], 5), [])
+        self.assertEqual(decrypt_values([]), [])
+
     @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
     def test_protect(self):
         value = read_protect("any value")
         self.assertEqual(read_unprotect(value), "any value")
 
-    @mock.patch('gobcore.secure.crypto._safe_storage', {'a': 'a value'})
+    def test_read_protected(self):
+        value = read_protect("any value")
+        self.assertEqual(read_protected(value), "any value")
+        self.assertTrue(is_protected(value))
+        self.assertEqual(read_unprotect(value), "any value")
+        self.assertIsNone(read_protected(value))
+
+    def test_read_unprotect_missing(self):
+        value = read_protect("any value")
+        read_unprotect(value)
+        with self.assertRaises(GOBException):
+            read_unprotect(value)
+
+    @mock.patch('gobcore.secure.crypto._safe_storage', mock.MagicMock(values={'a': 'a value'}))
     def test_is_protected(self):
         self.assertTrue(is_protected('a'))
         self.assertFalse(is_protected('b'))
+
+    @mock.patch('gobcore.secure.crypto._safe_storage', _SafeStorage())
+    @mock.patch('gobcore.secure.crypto._MAX_PROTECTED', 2)
+    def test_protected_store(self):
+        keys = [read_protect(value) for value in ["a", "b"]]
+
+        # A full store is never evicted
+        with self.assertRaises(GOBException):
+            read_protect("c")
+        self.assertTrue(is_protected(keys[0]))
+        self.assertEqual(get_protected_metrics(), {"size": 2, "peak": 2, "discarded": 0})
+
+        self.assertEqual(read_unprotect(keys[0]), "a")
+        clear_protected()
+        self.assertFalse(is_protected(keys[1]))
+        self.assertEqual(get_protected_metrics(), {"size": 0, "peak": 2, "discarded": 1})
+
+        with mock.patch('gobcore.secure.crypto.random.random', side_effect=[0.5, 0.5, 0.7]):
+            self.assertEqual([read_protect("d"), read_protect("e")], [0.5, 0.7])
+
+    def test_protected_store_per_thread(self):
+        key = read_protect("any value")
+        errors = []
+
+        def other_thread():
+            self.assertFalse(is_protected(key))
+            try:
+                read_unprotect(key)
+            except GOBException as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+        self.assertEqual(1, len(errors))
+        self.assertEqual(read_unprotect(key), "any value")
@@ -16,18 +16,16 @@ class TestSources(unittest.TestCase):
         self.assertIsInstance(self.sources.get_relations('nap', 'peilmerken'), list)
 
     def test_get_field_relations(self):
-        self.sources.get_relations = MagicMock(return_value=[{
+        self.sources._field_relations = {('catalog', 'collection', 'fieldname'): [{
             'field_name': 'fieldname',
             'bla': 'bla'
-        }, {
+        }], ('catalog', 'collection', 'someother'): [{
             'field_name': 'someother',
             'bla': 'die'
-        }])
+        }]}
         self.assertEqual([{
             'field_name': 'fieldname',
             'bla': 'bla'
         }], self.sources.get_field_relations('catalog', 'collection', 'fieldname'))
 
-        self.sources.get_relations = MagicMock(side_effect=KeyError)
-
-        self.assertEqual([], self.sources.get_field_relations('catalog', 'collection', 'fieldname'))
+        self.assertEqual([], self.sources.get_field_relations('catalog', 'other collection', 'fieldname'))
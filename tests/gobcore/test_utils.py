@@ -1,9 +1,11 @@
+import tempfile
+from pathlib import Path
 from unittest import TestCase
 from unittest.mock import patch, mock_open, call
 
 from tests.gobcore.fixtures import get_service_fixture
 
-from gobcore.utils import ProgressTicker, get_dns, get_logger_name
+from gobcore.utils import ProgressTicker, get_dns, get_logger_name, get_worker_count, process_pool, _get_cpu_quota
 
 
 class TestProgressTicker(TestCase):
@@ -102,3 +104,58 @@ nameserver 1.2.3.4
         with self.assertRaisesRegex(TypeError, "Name must be str type"):
             get_logger_name(service)
 
+    @patch('gobcore.utils._get_cpu_quota', lambda: None)
+    @patch('gobcore.utils.os')
+    def test_get_worker_count(self, mock_os):
+        mock_os.getenv.return_value = '3'
+        self.assertEqual(3, get_worker_count('ANY_WORKERS'))
+        mock_os.getenv.assert_called_with('ANY_WORKERS')
+
+        mock_os.getenv.return_value = None
+        mock_os.sched_getaffinity.return_value = {0, 1}
+        self.assertEqual(2, get_worker_count('ANY_WORKERS'))
+        mock_os.sched_getaffinity.assert_called_with(0)
+
+        del mock_os.sched_getaffinity
+        mock_os.cpu_count.return_value = 4
+        self.assertEqual(4, get_worker_count('ANY_WORKERS'))
+
+        mock_os.cpu_count.return_value = None
+        self.assertEqual(1, get_worker_count('ANY_WORKERS'))
+
+    @patch('gobcore.utils.os')
+    def test_get_worker_count_quota(self, mock_os):
+        mock_os.getenv.return_value = None
+        mock_os.sched_getaffinity.return_value = {0, 1, 2, 3}
+        with patch('gobcore.utils._get_cpu_quota', lambda: 2):
+            self.assertEqual(2, get_worker_count('ANY_WORKERS'))
+        with patch('gobcore.utils._get_cpu_quota', lambda: 8):
+            self.assertEqual(4, get_worker_count('ANY_WORKERS'))
+
+    def test_get_cpu_quota(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cpu_max = Path(tmpdir) / 'cpu.max'
+            with patch('gobcore.utils.CGROUP_CPU_MAX', str(cpu_max)):
+                # No cgroup v2
+                self.assertIsNone(_get_cpu_quota())
+
+                cpu_max.write_text("max 100000\n")
+                self.assertIsNone(_get_cpu_quota())
+
+                cpu_max.write_text("150000 100000\n")
+                self.assertEqual(2, _get_cpu_quota())
+
+                cpu_max.write_text("50000 100000\n")
+                self.assertEqual(1, _get_cpu_quota())
+
+    @patch('gobcore.utils.multiprocessing')
+    @patch('gobcore.utils.ProcessPoolExecutor')
+    def test_process_pool(self, mock_executor, mock_multiprocessing):
+        mock_multiprocessing.get_all_start_methods.return_value = ['fork', 'spawn', 'forkserver']
+        self.assertEqual(mock_executor.return_value, process_pool(2))
+        mock_multiprocessing.get_context.assert_called_with('forkserver')
+        mock_executor.assert_called_with(max_workers=2, mp_context=mock_multiprocessing.get_context.return_value)
+
+        mock_multiprocessing.get_all_start_methods.return_value = ['spawn']
+        process_pool(2)
+        mock_multiprocessing.get_context.assert_called_with('spawn')
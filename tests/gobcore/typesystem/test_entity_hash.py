@@ -0,0 +1,135 @@
+import datetime
+import decimal
+import unittest
+from unittest import mock
+from unittest.mock import patch
+
+from gobcore.secure.crypto import read_protect, read_unprotect, encrypt, _encrypt_deterministic
+from gobcore.secure.cryptos.aes import AESCrypto
+from gobcore.typesystem.entity_hash import EntityHasher
+
+
+class TestEntityHasher(unittest.TestCase):
+
+    def setUp(self):
+        self.fields = {
+            'identificatie': {'type': 'GOB.String'},
+            'nummer': {'type': 'GOB.Integer'},
+            'bedrag': {'type': 'GOB.Decimal', 'precision': 2},
+            'datum': {'type': 'GOB.Date'},
+            'ligt_in': {'type': 'GOB.Reference', 'ref': 'a:b'},
+            'data': {'type': 'GOB.JSON'},
+        }
+        self.entity = {
+            'identificatie': 'abc',
+            'nummer': 12,
+            'bedrag': 1.5,
+            'datum': '2020-01-02',
+            'ligt_in': {'bronwaarde': 'x'},
+            'data': {'b': 1, 'a': [1, 2]},
+        }
+        self.hasher = EntityHasher(self.fields)
+
+    def test_stable(self):
+        # The hashes may only change with a new HASH_VERSION
+        self.assertEqual('64082f153b0bb525d2ca21ab97385bf4', self.hasher.hash(self.entity))
+        self.assertEqual('6ce172a23cbf2fe81b91e560ad938b4a', self.hasher.hash({}))
+        self.assertEqual('2e95b718ebfd57bfd7bfd91596b7774b', EntityHasher({}).hash({}))
+
+    def test_canonical(self):
+        expected = self.hasher.hash(self.entity)
+
+        # Field order, raw value types and JSON key order do not matter
+        entity = {
+            'data': {'a': [1, 2], 'b': 1},
+            'ligt_in': {'bronwaarde': 'x', 'id': '1', 'volgnummer': 2},
+            'datum': datetime.date(2020, 1, 2),
+            'bedrag': decimal.Decimal('1.50'),
+            'nummer': '12',
+            'identificatie': 'abc',
+            'not a field': 'any value',
+        }
+        self.assertEqual(expected, self.hasher.hash(entity))
+
+        # Missing fields are None values
+        self.assertEqual(self.hasher.hash({'identificatie': 'abc'}),
+                         self.hasher.hash({'identificatie': 'abc', 'nummer': None}))
+
+    def test_different(self):
+        expected = self.hasher.hash(self.entity)
+        for name, value in [
+            ('identificatie', 'abd'),
+            ('identificatie', None),
+            ('identificatie', ''),
+            ('nummer', 13),
+            ('bedrag', 1.51),
+            ('datum', '2020-01-03'),
+            ('ligt_in', {'bronwaarde': 'y'}),
+            ('data', {'b': 1}),
+        ]:
+            self.assertNotEqual(expected, self.hasher.hash({**self.entity, name: value}), name)
+
+        # Values are not mixed up with field names
+        hasher = EntityHasher({'a': {'type': 'GOB.String'}, 'b': {'type': 'GOB.String'}})
+        self.assertNotEqual(hasher.hash({'a': 'x', 'b': None}), hasher.hash({'a': None, 'b': 'x'}))
+        self.assertNotEqual(hasher.hash({'a': 'xb', 'b': None}), hasher.hash({'a': 'x', 'b': 'b'}))
+
+    def test_hash_batch(self):
+        entities = [
+            self.entity,
+            {},
+            {**self.entity, 'nummer': '12'},
+            {**self.entity, 'identificatie': True},
+            {**self.entity, 'data': {'a': []}},
+            self.entity,
+        ]
+        self.assertEqual([self.hasher.hash(entity) for entity in entities], self.hasher.hash_batch(entities))
+        self.assertEqual([], self.hasher.hash_batch([]))
+        self.assertEqual([EntityHasher({}).hash({})] * 2, EntityHasher({}).hash_batch(iter([{}, {}])))
+
+    def _use_password(self, password):
+        # Use a new key, forget the encryptions with any previous key
+        AESCrypto._ciphers = None
+        _encrypt_deterministic.cache_clear()
+
+        def getenv(name, *args):
+            return password if name == 'SECURE_PASSWORD' else name
+
+        return mock.patch('gobcore.secure.cryptos.config.os.getenv', getenv)
+
+    def tearDown(self):
+        AESCrypto._ciphers = None
+        _encrypt_deterministic.cache_clear()
+
+    def test_secure(self):
+        hasher = EntityHasher({'bsn': {'type': 'GOB.SecureString', 'level': 5}})
+        with self._use_password('password'):
+            expected = hasher.hash({'bsn': '123'})
+
+            # Secure values are hashed by their encrypted value, protected values remain protected
+            protected = read_protect('123')
+            self.assertEqual(expected, hasher.hash({'bsn': protected}))
+            self.assertEqual('123', read_unprotect(protected))
+
+            self.assertEqual(expected, hasher.hash({'bsn': encrypt('123', level=5)}))
+            self.assertEqual(expected, hasher.hash({'bsn': encrypt('123', level=4)}))
+            self.assertNotEqual(expected, hasher.hash({'bsn': '124'}))
+            self.assertEqual(hasher.hash({}), hasher.hash({'bsn': encrypt(None, level=5)}))
+
+            # Level 4 values are not decrypted
+            with mock.patch('gobcore.typesystem.entity_hash.decrypt') as mock_decrypt:
+                self.assertEqual(expected, hasher.hash({'bsn': encrypt('123', level=4)}))
+                mock_decrypt.assert_not_called()
+
+            # The plain value is not hashed
+            self.assertNotEqual(expected, EntityHasher({'bsn': {'type': 'GOB.String'}}).hash({'bsn': '123'}))
+
+        # The hash depends on the secure key
+        with self._use_password('other password'):
+            self.assertNotEqual(expected, hasher.hash({'bsn': '123'}))
+
+    @patch('gobcore.typesystem.entity_hash.GOBModel')
+    def test_for_collection(self, mock_model):
+        mock_model.return_value = {'cat': {'collections': {'col': {'fields': self.fields}}}}
+        hasher = EntityHasher.for_collection('cat', 'col')
+        self.assertEqual(self.hasher.hash(self.entity), hasher.hash(self.entity))
@@ -1,11 +1,15 @@
 import unittest
 from unittest.mock import MagicMock, patch
+import json
 from json import JSONDecodeError
 
 import geoalchemy2
+from geoalchemy2.shape import from_shape
+from geomet import wkt
+from shapely.geometry import GeometryCollection, LineString, MultiPoint, MultiPolygon, Point as ShapelyPoint
 
 from gobcore.typesystem import _gob_types_dict, get_gob_type, is_gob_geo_type
-from gobcore.typesystem.gob_geotypes import GEOType, Point, Polygon, Geometry, GobTypeJSONEncoder
+from gobcore.typesystem.gob_geotypes import GEOType, Point, Polygon, Geometry, GobTypeJSONEncoder, _format_coordinate
 from gobcore.exceptions import GOBException
 
 
@@ -224,3 +228,44 @@ class TestGeometry(unittest.TestCase):
             geometry_type="GEOMETRY",
             srid=28992
         )
+
+
+class TestGeometryWKT(unittest.TestCase):
+
+    def test_from_db_value(self):
+        coordinates = [(120000.1234567, 480000.0005), (-0.0015, 2.5), (1e-07, 1e17), (3, 4)]
+        shapes = [
+            ShapelyPoint(coordinates[0]),
+            ShapelyPoint(),
+            LineString(coordinates),
+            MultiPolygon([(coordinates, [coordinates[1:]]), (coordinates[:3], [])]),
+            MultiPoint(coordinates),
+            GeometryCollection([ShapelyPoint(coordinates[0]), LineString(coordinates)]),
+        ]
+        for shape in shapes:
+            for precision in [0, 3, 7]:
+                expected = wkt.dumps(wkt.loads(shape.wkt), decimals=precision)
+                value = Geometry.from_value(from_shape(shape, srid=28992), precision=precision)
+                self.assertEqual(str(value), expected)
+                self.assertEqual(value.json, json.dumps(wkt.loads(expected)))
+
+    def test_format_coordinate(self):
+        # The coordinates of a plain WKT are formatted without geomet, pinned to the output of geomet 1.0.0
+        cases = [
+            (120000.1234567, 3, '120000.123'),
+            (480000.0005, 3, '480000.001'),
+            (-0.0015, 3, '-0.002'),
+            (-0.0004, 3, '-0.000'),
+            (3.0, 3, '3.000'),
+            (0.1, 1, '0.1'),
+            (1e-07, 7, '0.0000001'),
+            (1e-07, 3, '0.000'),
+            (1e17, 3, '100000000000000000.000'),
+            (2.5, 0, '2'),
+            (-2.5, 0, '-2'),
+            (123.456, 0, '123'),
+        ]
+        for value, decimals, expected in cases:
+            self.assertEqual(expected, _format_coordinate(value, decimals))
+            self.assertEqual(f"POINT ({expected} {expected})",
+                             wkt.dumps({'type': 'Point', 'coordinates': [value, value]}, decimals=decimals))
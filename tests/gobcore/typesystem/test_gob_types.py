@@ -7,7 +7,7 @@ from unittest import mock
 
 from gobcore.exceptions import GOBException, GOBTypeException
 from gobcore.typesystem import _gob_types, get_gob_type, is_gob_json_type
-from gobcore.typesystem.gob_types import JSON, Boolean, Date, GOBType, Decimal
+from gobcore.typesystem.gob_types import JSON, Boolean, Date, DateTime, GOBType, Decimal, _get_datetime_parser
 from tests.gobcore import fixtures
 
 
@@ -309,6 +309,24 @@ class TestGobTypes(unittest.TestCase):
         self.assertEqual([{"a": 1}, {"b": 2}], GobType.get_value(GobType('[{"a": 1}, {"b": 2}]')))
         self.assertEqual(None, GobType.get_value(GobType(None)))
 
+    def test_json_canonical(self):
+        GobType = get_gob_type("GOB.JSON")
+
+        for value in [
+            {"b": [1, 2.5, None], "a": {"d": True, "c": "é"}},
+            [{"b": 1, "a": 2}, (1, 2)],
+            # Values that change when dumped to JSON
+            {1: "a", "2": "b"},
+            {"a": 2 ** 70},
+        ]:
+            self.assertEqual(GobType.from_value(value).json,
+                             json.dumps(json.loads(json.dumps(value)), sort_keys=True))
+
+        gob_type = GobType.from_value({"b": 1, "a": 2})
+        self.assertEqual(gob_type._get_parsed(), {"a": 2, "b": 1})
+        self.assertIs(gob_type._get_parsed(), gob_type._get_parsed())
+        self.assertIsNone(GobType(None)._get_parsed())
+
     def test_reference(self):
         GobType = get_gob_type("GOB.Reference")
         self.assertEqual(GobType.name, "Reference")
@@ -326,6 +344,21 @@ class TestGobTypes(unittest.TestCase):
         self.assertTrue(GobType.from_value(v1) != GobType.from_value(None))
         self.assertTrue(GobType.from_value(None) != GobType.from_value(v1))
 
+        # The filtered value is computed once
+        self.assertIs(v1._get_filtered(), v1._get_filtered())
+        self.assertEqual(v2._get_filtered(), {"bronwaarde": "123456"})
+
+        # Equal references have equal canonical strings
+        self.assertEqual(v1.canonical, v2.canonical)
+        self.assertEqual('{"bronwaarde": "123456"}', v2.canonical)
+        self.assertIsNone(GobType.from_value(None).canonical)
+
+        many = get_gob_type("GOB.ManyReference").from_value([{"bronwaarde": "1", "id": "1"}])
+        self.assertEqual('[{"bronwaarde": "1"}]', many.canonical)
+
+        # Compare with another JSON type
+        self.assertEqual(v1, get_gob_type("GOB.JSON").from_value('{"bronwaarde": "123456", "id": "1"}'))
+
     def test_many_reference(self):
         GobType = get_gob_type("GOB.ManyReference")
         self.assertEqual(GobType.name, "ManyReference")
@@ -343,6 +376,9 @@ class TestGobTypes(unittest.TestCase):
         self.assertTrue(GobType.from_value(v1) != GobType.from_value(None))
         self.assertTrue(GobType.from_value(None) != GobType.from_value(v1))
 
+        self.assertEqual(v2._get_filtered(), [{"bronwaarde": "123456"}, {"bronwaarde": "654321"}])
+        self.assertEqual(v1, get_gob_type("GOB.JSON").from_value([{"bronwaarde": "123456"}, {"bronwaarde": "654321"}]))
+
     def test_incomplete_date(self):
         GobType = get_gob_type("GOB.IncompleteDate")
         self.assertEqual(GobType.name, "IncompleteDate")
@@ -467,6 +503,46 @@ class TestDate(unittest.TestCase):
 
         self.assertIsNone(date.to_value)
 
+    def test_datetime_parser(self):
+        values = {
+            "%Y-%m-%d": ["2016-05-04", "0016-05-04", "2016-5-4", "2016-02-30", "2016-05-04 ", "2016-05-0x"],
+            "%Y-%m-%dT%H:%M:%S.%f": ["2016-05-04T12:13:14.123456", "2016-05-04T12:13:14.12345",
+                                     "2016-05-04T24:00:00.000000", "2016-05-04T12:13:14.123456+01:00"],
+            "%Y%m%d": ["20160504", "2016054", "2016 0504", "20161304", "２０１６0504"],
+            "%d-%m-%Y %H:%M": ["04-05-2016 12:13", "4-5-2016 1:2", "04-05-2016\t12:13"],
+            "%Y-%m-%d %H:%M:%S.%f": ["2016-05-04 12:13:14.1", "2016-05-04 12:13:60.1"],
+            "%H:%M": ["12:13"],
+            "%d %b %Y": ["04 May 2016", "04 xxx 2016"],
+        }
+        for fmt, fmt_values in values.items():
+            parse = _get_datetime_parser(fmt)
+            for value in fmt_values:
+                try:
+                    expected = datetime.strptime(value, fmt)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        parse(value)
+                else:
+                    self.assertEqual(parse(value), expected)
+
+    def test_parsed_value(self):
+        gob_date = Date.from_value("4-5-2016", format="%d-%m-%Y")
+        self.assertEqual(str(gob_date), "2016-05-04")
+        self.assertEqual(gob_date.to_db, datetime(2016, 5, 4))
+        self.assertEqual(gob_date.to_value, date(2016, 5, 4))
+
+        gob_date = Date("0016-05-04")
+        self.assertEqual(gob_date.to_db, datetime(16, 5, 4))
+        self.assertEqual(Date.from_value(gob_date.to_value).to_db, datetime(16, 5, 4))
+
+        date_time = DateTime.from_value(datetime(2016, 5, 4, 12, 13))
+        self.assertEqual(str(date_time), "2016-05-04T12:13:00.000000")
+        self.assertEqual(date_time.to_value, datetime(2016, 5, 4, 12, 13))
+        self.assertEqual(DateTime("2016-05-04T12:13:00.000001").to_db, datetime(2016, 5, 4, 12, 13, 0, 1))
+
+        with self.assertRaises(GOBTypeException):
+            DateTime.from_value("2016-05-04T12:13")
+
 class TestJSON(unittest.TestCase):
 
     def test_to_value_string_none(self):
@@ -505,3 +581,63 @@ class TestDecimal(unittest.TestCase):
 
         # Reset
         Decimal.sql_type = prev_sql_type
+
+
+class TestFromValuesBatch(unittest.TestCase):
+
+    def assert_equal_to_scalar(self, gob_type, values, **kwargs):
+        for output in ["to_db", "to_value"]:
+            expected = [getattr(gob_type.from_value(value, **kwargs), output) for value in values]
+            result = gob_type.from_values_batch(values, output=output, **kwargs)
+            self.assertEqual(result, expected, f"{gob_type.name} {output}")
+            self.assertEqual([type(value) for value in result], [type(value) for value in expected])
+
+    def test_equal_to_scalar(self):
+        testcases = [
+            ("GOB.String", ["a", 1, 1.0, True, None, float('nan'), "a", decimal.Decimal("1.50")], {}),
+            ("GOB.Character", ["a", "b", None, "a"], {}),
+            ("GOB.Integer", ["1", 1, "nan", None, float('nan'), "-12", 1, decimal.Decimal(2)], {}),
+            ("GOB.BigInteger", ["12345678901234", None], {}),
+            ("GOB.Decimal", ["1,5", "2", 3.25, None, "1,5"], {'decimal_separator': ','}),
+            ("GOB.Decimal", ["1.5", "2", 3.25, None], {'precision': 2}),
+            ("GOB.Boolean", ["J", "N", "X", None, "J"], {'format': 'JN'}),
+            ("GOB.Boolean", [True, False, None, "true"], {}),
+            ("GOB.Date", ["20160504", "00010101", None, "20160504"], {'format': "%Y%m%d"}),
+            ("GOB.Date", ["2016-05-04", None], {}),
+            ("GOB.DateTime", ["2016-05-04T12:00:00", "2016-05-04T12:00:00.123456", None,
+                              datetime(2020, 1, 2, 3, 4, 5)], {}),
+            ("GOB.DateTime", ["04-05-2016 12:00", None], {'format': "%d-%m-%Y %H:%M"}),
+            ("GOB.IncompleteDate", ["2020-00-00", "2020-03-22", {'year': 2020, 'month': None, 'day': None}, None], {}),
+            ("GOB.JSON", [{'b': 1, 'a': [1, 2]}, '{"a": 1}', None], {}),
+        ]
+        for type_name, values, kwargs in testcases:
+            self.assert_equal_to_scalar(get_gob_type(type_name), values, **kwargs)
+
+    def test_numpy_and_pandas(self):
+        import numpy
+        import pandas
+
+        self.assert_equal_to_scalar(get_gob_type("GOB.Integer"), numpy.array([1, 2, 2, 3]))
+        self.assert_equal_to_scalar(get_gob_type("GOB.Decimal"), numpy.array([1.5, numpy.nan, 2.25]))
+        self.assert_equal_to_scalar(get_gob_type("GOB.String"), pandas.Series(["a", None, "b"]))
+
+    def test_shared_results(self):
+        # Immutable results are computed once per distinct value
+        with mock.patch.object(Date, "from_value", wraps=Date.from_value) as mock_from_value:
+            result = Date.from_values_batch(["2020-01-01", "2020-01-01", "2020-01-02"])
+            self.assertEqual(mock_from_value.call_count, 2)
+        self.assertEqual(result, [datetime(2020, 1, 1), datetime(2020, 1, 1), datetime(2020, 1, 2)])
+
+        # Mutable results are never shared
+        result = JSON.from_values_batch([{'a': 1}, {'a': 1}])
+        self.assertIsNot(result[0], result[1])
+
+        # Unhashable values
+        self.assertEqual(get_gob_type("GOB.String").from_values_batch([[1], [1]]), ["[1]", "[1]"])
+
+    def test_errors(self):
+        with self.assertRaises(GOBTypeException):
+            get_gob_type("GOB.Integer").from_values_batch(["1", "a"])
+
+        with self.assertRaises(GOBTypeException):
+            Date.from_values_batch(["2020-01-01"], output="json")
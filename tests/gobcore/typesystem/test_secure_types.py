@@ -4,7 +4,8 @@ from unittest import mock
 
 from gobcore.typesystem.gob_secure_types import SecureString, SecureDecimal, SecureDateTime, Secure, SecureDate, SecureIncompleteDate
 from gobcore.typesystem.gob_types import JSON, String
-from gobcore.secure.crypto import read_protect
+from gobcore.exceptions import GOBException
+from gobcore.secure.crypto import read_protect, decrypt, encrypt, _SafeStorage, _encrypt_deterministic
 from gobcore.secure.user import User
 from gobcore.secure.config import GOB_SECURE_ATTRS
 
@@ -37,6 +38,19 @@ class TestSecure(unittest.TestCase):
         sec_datetime = SecureDateTime.from_value(read_protect("2000-01-25T12:25:45.0"), level=5)
         self.assertTrue(isinstance(sec_datetime, SecureDateTime))
 
+    @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    @mock.patch('gobcore.secure.crypto._safe_storage', _SafeStorage())
+    @mock.patch('gobcore.secure.crypto._MAX_PROTECTED', 1)
+    def test_from_value_protected_store_full(self):
+        key = read_protect("secret")
+        with self.assertRaises(GOBException):
+            read_protect("other secret")
+
+        # The protected value has not been discarded, it is encrypted and not stored as its key
+        sec_string = SecureString.from_value(key, level=5)
+        self.assertTrue(isinstance(sec_string, SecureString))
+        self.assertEqual("secret", decrypt(str(sec_string)))
+
     @mock.patch("gobcore.typesystem.gob_secure_types.is_encrypted", lambda x: True)
     def test_from_value(self):
         res = self.MockChild.from_value('val', **{'kw': 'args'})
@@ -49,6 +63,21 @@ class TestSecure(unittest.TestCase):
         self.assertNotIsInstance(res, type(self.MockChild))
         self.assertIsInstance(res, type(MockBaseType()))
 
+    @mock.patch('gobcore.secure.cryptos.config.os.getenv', lambda s, *args: s)
+    def test_eq(self):
+        _encrypt_deterministic.cache_clear()
+        json_value = encrypt("value", 4)
+        _encrypt_deterministic.cache_clear()
+        with mock.patch('gobcore.secure.crypto._COMPACT_ENVELOPE', True):
+            compact_value = encrypt("value", 4)
+        _encrypt_deterministic.cache_clear()
+
+        # Stored values in the JSON envelope are not modified by values in the compact envelope
+        self.assertNotEqual(json_value, compact_value)
+        self.assertEqual(SecureString.from_value(json_value), SecureString.from_value(compact_value))
+        self.assertNotEqual(SecureString.from_value(json_value), SecureString.from_value(encrypt("other", 4)))
+        self.assertNotEqual(SecureString.from_value(json_value), String.from_value("value"))
+
     @mock.patch("gobcore.typesystem.gob_secure_types.is_encrypted", lambda x: True)
     def test_get_value(self):
         securetype = self.MockChild('value')
@@ -1,10 +1,19 @@
+import copy
+import datetime
+import pickle
 from unittest import TestCase
 from unittest.mock import patch
 
+import geoalchemy2
+
 from gobcore.typesystem import (
+    GEO,
     GOB,
+    LazyGOBType,
     _gob_types_dict,
     enhance_type_info,
+    get_db_converter,
+    get_field_spec,
     get_gob_type_from_info,
     get_modifications,
     get_value,
@@ -14,6 +23,16 @@ from gobcore.typesystem import (
 
 class TestTypesystem(TestCase):
 
+    def test_get_db_converter(self):
+        type_info = {'type': 'GOB.Decimal', 'precision': 2}
+        to_db = get_db_converter(type_info)
+        self.assertEqual(to_db('1.234'), GOB.Decimal.from_value('1.234', precision=2).to_db)
+        self.assertIsNone(to_db(None))
+        self.assertEqual(type_info['gob_type'], GOB.Decimal)
+
+        to_db = get_db_converter({'type': 'GOB.Integer'})
+        self.assertEqual(to_db('1'), 1)
+
     def test_get_modifications(self):
         """Test get_modifications with changed values."""
 
@@ -92,6 +111,24 @@ class TestTypesystem(TestCase):
 
         self.assertEqual([], get_modifications(entity, data, model))
 
+    def test_get_modifications_lazy(self):
+        """Test get_modifications converts changed values only."""
+        model = {
+            'field1': {'type': 'GOB.Boolean'},
+            'field2': {'type': 'GOB.Integer'},
+            'field3': {'type': 'GOB.Integer'},
+        }
+        entity = type('MockEntity', (object,), {'field1': True, 'field2': 1, 'field3': '2'})
+        data = {'field1': True, 'field2': 2, 'field3': 2}
+
+        with patch.object(GOB.Boolean, 'from_value', wraps=GOB.Boolean.from_value) as mock_from_value:
+            modifications = get_modifications(entity, data, model)
+            mock_from_value.assert_not_called()
+
+        self.assertEqual([(m['key'], m['old_value'], m['new_value']) for m in modifications], [('field2', '1', '2')])
+        self.assertIsInstance(modifications[0]['old_value'], GOB.Integer)
+        self.assertIsInstance(modifications[0]['new_value'], GOB.Integer)
+
     def test_get_value(self):
         entity = {
             'k1': type('MockGobType', (object,), {'to_value': 'k1value'}),
@@ -153,8 +190,148 @@ class TestTypesystem(TestCase):
         enhance_type_info(type_info)
         self.assertEqual(type_info['type']['code']['gob_type'], GOB.String)
 
+    def test_get_field_spec(self):
+        type_info = {'type': "GOB.Decimal", 'description': "Decimal", 'precision': 2}
+        field_spec = get_field_spec(type_info)
+        self.assertIsInstance(field_spec, GOB.FieldSpec)
+        self.assertEqual({**type_info, 'gob_type': GOB.Decimal}, field_spec)
+        self.assertNotIn('gob_type', type_info)
+        self.assertEqual({'precision': 2}, field_spec.kwargs)
+        self.assertEqual({'precision': 2}, GOB.get_kwargs_from_type_info(field_spec))
+        self.assertIsNot(field_spec.kwargs, GOB.get_kwargs_from_type_info(field_spec))
+
+        # Equal type info results in the same field spec
+        self.assertIs(field_spec, get_field_spec(dict(type_info)))
+        self.assertIs(field_spec, get_field_spec(field_spec))
+        self.assertIsNot(field_spec, get_field_spec({**type_info, 'precision': True}))
+
+        # Field specs are read-only, copies are regular dicts
+        with self.assertRaises(TypeError):
+            field_spec['precision'] = 3
+        with self.assertRaises(TypeError):
+            field_spec.update({'precision': 3})
+        enhance_type_info(field_spec)
+        self.assertEqual(type(copy.copy(field_spec)), dict)
+        self.assertEqual(type(copy.deepcopy(field_spec)), dict)
+        self.assertEqual(field_spec, copy.deepcopy(field_spec))
+
+        unpickled = pickle.loads(pickle.dumps(field_spec))
+        self.assertIsInstance(unpickled, GOB.FieldSpec)
+        self.assertEqual(field_spec, unpickled)
+        self.assertEqual({'precision': 2}, unpickled.kwargs)
+
+        # Nested type info is enhanced
+        field_spec = get_field_spec({'type': "GOB.JSON", 'attributes': {'code': {'type': "GOB.String"}}})
+        self.assertEqual(GOB.String, field_spec['attributes']['code']['gob_type'])
+
+        # Nested type info is read-only as well, copies are regular dicts and lists
+        type_info = {'type': "GOB.JSON", 'attributes': {'code': {'type': "GOB.String"}}, 'values': [{'a': 1}]}
+        field_spec = get_field_spec(type_info)
+        for mutate in [
+            lambda: field_spec['attributes'].update({'other': {}}),
+            lambda: field_spec['attributes']['code'].pop('type'),
+            lambda: field_spec['values'].append(2),
+            lambda: field_spec['values'].__setitem__(0, None),
+            lambda: field_spec['values'][0].__setitem__('a', 2),
+            lambda: field_spec.kwargs['attributes'].clear(),
+        ]:
+            with self.assertRaises(TypeError):
+                mutate()
+        enhance_type_info(field_spec['attributes'])
+
+        copied = copy.deepcopy(field_spec)
+        self.assertEqual(type(copied['attributes']['code']), dict)
+        self.assertEqual(type(copied['values']), list)
+        self.assertEqual(type(copied['values'][0]), dict)
+        self.assertEqual(field_spec, copied)
+        copied['values'].append(2)
+        self.assertEqual([{'a': 1}], field_spec['values'])
+
+        unpickled = pickle.loads(pickle.dumps(field_spec))
+        self.assertEqual(field_spec, unpickled)
+        with self.assertRaises(TypeError):
+            unpickled['attributes']['code']['type'] = "GOB.Integer"
+        self.assertEqual({'a': 1}, type_info['values'][0])
+
+        # Unknown types and unhashable type info are not interned
+        type_info = {'type': "GOB.Unknown"}
+        self.assertIs(type_info, get_field_spec(type_info))
+        type_info = {'type': "GOB.String", 'values': {1, 2}}
+        self.assertIs(type_info, get_field_spec(type_info))
+
     def test_gob_type_from_info(self):
         type_info = {
             'type': "GOB.String"
         }
         self.assertEqual(get_gob_type_from_info(type_info), GOB.String)
+
+    def test_lazy_gob_type(self):
+        value = LazyGOBType(GOB.Decimal, 1.2345, precision=2)
+        with patch.object(GOB.Decimal, 'from_value', wraps=GOB.Decimal.from_value) as mock_from_value:
+            self.assertEqual(value.raw, 1.2345)
+            mock_from_value.assert_not_called()
+
+            self.assertEqual(str(value), '1.23')
+            self.assertEqual(value.to_value, '1.23')
+            self.assertEqual(value.json, '"1.23"')
+            self.assertEqual(mock_from_value.call_count, 1)
+        self.assertEqual(value.to_db, GOB.Decimal.from_value(1.2345, precision=2).to_db)
+
+        self.assertEqual(value, GOB.Decimal.from_value('1.23'))
+        self.assertEqual(value, LazyGOBType(GOB.Decimal, '1.23'))
+        self.assertNotEqual(value, LazyGOBType(GOB.Decimal, '1.24'))
+        with self.assertRaises(TypeError):
+            hash(value)
+
+    def test_lazy_gob_type_raw_equality(self):
+        wkb = geoalchemy2.WKBElement(bytes.fromhex('010100000000000000000000400000000000000840'), srid=28992)
+        values = [
+            (GOB.String, 'a'),
+            (GOB.Integer, 1),
+            (GOB.Date, datetime.date(2020, 1, 2)),
+            (GOB.DateTime, datetime.datetime(2020, 1, 2, 3)),
+            (GEO.Geometry, wkb),
+        ]
+        for gob_type, raw in values:
+            with patch.object(gob_type, 'from_value') as mock_from_value:
+                self.assertEqual(LazyGOBType(gob_type, raw), LazyGOBType(gob_type, raw))
+                mock_from_value.assert_not_called()
+
+        wkb_copy = geoalchemy2.WKBElement(bytes(wkb.data), srid=28992)
+        with patch.object(GEO.Geometry, 'from_value') as mock_from_value:
+            self.assertEqual(LazyGOBType(GEO.Geometry, wkb), LazyGOBType(GEO.Geometry, wkb_copy))
+            mock_from_value.assert_not_called()
+        self.assertEqual(str(LazyGOBType(GEO.Geometry, wkb)), 'POINT (2.000 3.000)')
+
+        # Equal raw values that are converted to be compared
+        tz = datetime.timezone(datetime.timedelta(hours=1))
+        self.assertNotEqual(LazyGOBType(GOB.String, datetime.datetime(2020, 1, 1, 1, tzinfo=tz)),
+                            LazyGOBType(GOB.String, datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)))
+        self.assertNotEqual(LazyGOBType(GOB.String, 0.0), LazyGOBType(GOB.String, -0.0))
+        self.assertEqual(LazyGOBType(GOB.Integer, 1), LazyGOBType(GOB.Integer, '1'))
+        self.assertEqual(LazyGOBType(GOB.JSON, {'a': 1}), LazyGOBType(GOB.JSON, {'a': 1}))
+        self.assertNotEqual(LazyGOBType(GOB.Decimal, 1, precision=1), LazyGOBType(GOB.Decimal, 1, precision=2))
+
+    def test_lazy_gob_type_symmetric_equality(self):
+        values = [
+            (GOB.String, 'a'),
+            (GOB.String, None),
+            (GOB.Integer, 1),
+            (GOB.JSON, {'a': 1}),
+            (GOB.Reference, {'bronwaarde': '1'}),
+            (GOB.ManyReference, [{'bronwaarde': '1'}]),
+        ]
+        for gob_type, raw in values:
+            value = gob_type.from_value(raw)
+            lazy = LazyGOBType(gob_type, raw)
+            self.assertTrue(value == lazy, gob_type)
+            self.assertTrue(lazy == value, gob_type)
+            self.assertFalse(value != lazy, gob_type)
+            self.assertFalse(lazy != value, gob_type)
+
+        self.assertNotEqual(GOB.String.from_value('a'), LazyGOBType(GOB.String, 'b'))
+        self.assertNotEqual(LazyGOBType(GOB.String, 'b'), GOB.String.from_value('a'))
+        self.assertNotEqual(GOB.Reference.from_value({'bronwaarde': '1'}),
+                            LazyGOBType(GOB.Reference, {'bronwaarde': '2'}))
+        self.assertNotEqual(LazyGOBType(GOB.Reference, {'bronwaarde': '2'}),
+                            GOB.Reference.from_value({'bronwaarde': '1'}))